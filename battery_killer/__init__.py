@@ -1,5 +1,19 @@
-from .core import SystemStresser
-from .utils import get_cpu_temperature, create_ascii_graph
-
 __version__ = '1.0.0'
-__all__ = ['SystemStresser', 'get_cpu_temperature', 'create_ascii_graph']
+__all__ = ['SystemStresser', 'SensorHub', 'get_cpu_temperature', 'create_ascii_graph']
+
+# Submodules are imported on first attribute access so that importing the
+# package stays cheap and free of side effects.
+_LAZY_ATTRIBUTES = {
+    'SystemStresser': '.core',
+    'SensorHub': '.sensors',
+    'get_cpu_temperature': '.utils',
+    'create_ascii_graph': '.utils',
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
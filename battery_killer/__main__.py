@@ -0,0 +1,4 @@
+from .scripts.battery_killer import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import itertools
+import json
+import math
+import os
+import socket
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PATH = os.path.expanduser('~/.config/battery_killer/profiles.json')
+
+# Kernel mixes tried for the CPU stress processes
+KERNEL_MIXES = {
+    'full': ['math', 'crypto', 'loops', 'memory'],
+    'fp': ['math', 'loops'],
+    'crypto': ['crypto'],
+    'crypto+fp': ['math', 'crypto', 'loops'],
+}
+
+def default_candidates():
+    """Get the search grid of process counts, threads per kernel and kernel mixes."""
+    return [
+        {'processes_per_core': processes, 'kernel_threads': threads, 'cpu_kernels': KERNEL_MIXES[mix], 'mix': mix}
+        for processes, threads, mix in itertools.product((1, 2, 4), (1, 2), KERNEL_MIXES)
+    ]
+
+def load_profiles(path=PROFILE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_profile(host=None, path=PROFILE_PATH):
+    """Get the saved tuning profile for a host (default: this one), or None."""
+    return load_profiles(path).get(host or socket.gethostname())
+
+def save_profile(profile, host=None, path=PROFILE_PATH):
+    """Save the tuning profile for a host alongside the other hosts' profiles."""
+    profiles = load_profiles(path)
+    profiles[host or socket.gethostname()] = profile
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(profiles, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+class AutoTuner:
+    """Search worker counts and kernel mixes for the most power (or throughput) with successive halving."""
+    def __init__(self, stresser, budget=600, candidates=None, objective=None, warmup=3.0, interval=1.0,
+                 min_trial=5.0):
+        self.stresser = stresser
+        self.budget = budget  # Seconds for the whole search
+        self.candidates = candidates or default_candidates()
+        self.objective = objective  # 'power' or 'throughput', None = power when a sensor exists
+        self.warmup = warmup  # Seconds discarded at the start of each trial
+        self.interval = interval
+        self.min_trial = min_trial  # Shortest measured trial in seconds
+        self.trials = []
+
+    def detect_objective(self):
+        power_stats = self.stresser.sensors.read('power', 'autotune')
+        return 'power' if power_stats and 'cpu_power' in power_stats else 'throughput'
+
+    def run_trial(self, candidate, duration):
+        """Run one candidate's CPU workers for warmup + duration seconds and measure them."""
+        # Only the CPU workers, so GPU, I/O and memory load don't blur the comparison
+        self.stresser.config.update({k: v for k, v in candidate.items() if k != 'mix'})
+        self.stresser.config['cpu_only'] = True
+        self.stresser.start_stress_tasks()
+        try:
+            time.sleep(self.warmup)
+            self.stresser.get_system_stats('autotune')  # Opens the measurement window
+            start_ops = {kind: total['ops'] for kind, total in self.stresser.workload_totals.items()}
+            start = time.time()
+            powers = []
+            max_temp = None
+            while time.time() - start < duration:
+                time.sleep(self.interval)
+                stats = self.stresser.get_system_stats('autotune')
+                if 'cpu_power' in stats:
+                    powers.append(stats['cpu_power'])
+                if 'cpu_temp' in stats:
+                    max_temp = max(max_temp or stats['cpu_temp'], stats['cpu_temp'])
+                    if stats['cpu_temp'] > self.stresser.config['max_temp_celsius']:
+                        logger.warning(f"Trial stopped early at {stats['cpu_temp']}°C")
+                        break
+            elapsed = time.time() - start
+        finally:
+            self.stresser.stop_stress_tasks()
+
+        # Kinds left over from earlier trials made no progress in this one
+        rates = {
+            kind: (total['ops'] - start_ops.get(kind, 0)) / elapsed
+            for kind, total in self.stresser.workload_totals.items()
+            if total['ops'] > start_ops.get(kind, 0)
+        }
+        trial = {
+            'candidate': candidate,
+            'duration': elapsed,
+            'power': sum(powers) / len(powers) if powers else None,
+            'rates': rates,
+            'max_temp': max_temp,
+        }
+        self.trials.append(trial)
+        return trial
+
+    def score_round(self, trials):
+        """Score a round of trials on the objective, higher is better."""
+        if self.objective == 'power':
+            return [trial['power'] or 0.0 for trial in trials]
+        best = {}
+        for trial in trials:
+            for kind, rate in trial['rates'].items():
+                best[kind] = max(best.get(kind, 0.0), rate)
+        return [sum(rate / best[kind] for kind, rate in trial['rates'].items()) / len(trial['rates'])
+                if trial['rates'] else 0.0 for trial in trials]
+
+    def run(self):
+        """Run the search and return the best profile."""
+        if self.objective is None:
+            self.objective = self.detect_objective()
+        survivors = list(self.candidates)
+        rounds = max(1, math.ceil(math.log2(len(survivors))))
+        round_budget = self.budget / rounds
+        deadline = time.time() + self.budget
+        logger.info(f"Autotuning {len(survivors)} candidates in {rounds} rounds on {self.objective}")
+
+        best = None
+        for round_number in range(rounds):
+            duration = max(self.min_trial, round_budget / len(survivors) - self.warmup)
+            trials = []
+            for candidate in survivors:
+                # Cap the trial by what is left of the budget, always measuring at least one candidate
+                remaining = deadline - time.time() - self.warmup
+                if remaining < 1.0 and (trials or best):
+                    logger.warning(f"Autotune budget spent, {len(survivors) - len(trials)} candidates "
+                                   f"left untested in round {round_number + 1}")
+                    break
+                trial_duration = max(1.0, min(duration, remaining))
+                logger.info(f"Round {round_number + 1}: {candidate['processes_per_core']} processes/core, "
+                            f"{candidate['kernel_threads']} threads/kernel, {candidate['mix']} mix for {trial_duration:.0f}s")
+                trials.append(self.run_trial(candidate, trial_duration))
+            if not trials:
+                break
+            scores = self.score_round(trials)
+            ranked = sorted(zip(scores, range(len(trials))), reverse=True)
+            for score, index in ranked:
+                trials[index]['score'] = score
+            best = trials[ranked[0][1]]
+            survivors = [survivors[index] for _, index in ranked[:max(1, len(ranked) // 2)]]
+            if len(survivors) == 1 or time.time() >= deadline - self.warmup - 1.0:
+                break
+
+        return {
+            'processes_per_core': best['candidate']['processes_per_core'],
+            'kernel_threads': best['candidate']['kernel_threads'],
+            'cpu_kernels': best['candidate']['cpu_kernels'],
+            'mix': best['candidate']['mix'],
+            'objective': self.objective,
+            'score': best['score'],
+            'power': best['power'],
+            'num_cores': self.stresser.config['num_cores'],
+            'tuned_at': time.time(),
+        }
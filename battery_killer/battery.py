@@ -0,0 +1,113 @@
+import threading
+import time
+import logging
+from collections import namedtuple
+import psutil
+from .energy import RaplReader, DEFAULT_POWERCAP_ROOT
+
+logger = logging.getLogger(__name__)
+
+# Same fields as psutil.sensors_battery()
+sbattery = namedtuple('sbattery', ['percent', 'secsleft', 'power_plugged'])
+
+# Single Li-ion cell open-circuit voltage by state of charge (0-1)
+DEFAULT_VOLTAGE_CURVE = ((0.0, 3.0), (0.05, 3.45), (0.1, 3.6), (0.3, 3.7), (0.6, 3.8), (0.9, 4.05), (1.0, 4.2))
+
+SECONDS_PER_MONTH = 30 * 24 * 3600
+
+def curve_voltage(curve, soc):
+    """Interpolate the voltage at a state of charge."""
+    if soc <= curve[0][0]:
+        return curve[0][1]
+    for (soc0, v0), (soc1, v1) in zip(curve, curve[1:]):
+        if soc <= soc1:
+            return v0 + (v1 - v0) * (soc - soc0) / (soc1 - soc0)
+    return curve[-1][1]
+
+def curve_energy(curve, soc):
+    """Integrate the voltage from empty up to a state of charge (volts x charge fraction)."""
+    energy = 0.0
+    for (soc0, v0), (soc1, v1) in zip(curve, curve[1:]):
+        if soc <= soc0:
+            break
+        top = min(soc, soc1)
+        energy += (v0 + curve_voltage(curve, top)) / 2 * (top - soc0)
+    return energy
+
+class VirtualBattery:
+    """Simulated battery pack drained by the power the machine actually uses."""
+    def __init__(self, capacity_wh=50.0, voltage_curve=DEFAULT_VOLTAGE_CURVE, self_discharge=0.02, time_scale=1.0,
+                 idle_watts=5.0, max_watts=45.0, start_percent=100.0, powercap_root=DEFAULT_POWERCAP_ROOT):
+        self.capacity_wh = capacity_wh
+        self.voltage_curve = sorted(voltage_curve)
+        self.self_discharge = self_discharge  # Fraction of capacity lost per 30 days
+        self.time_scale = time_scale  # Seconds of drain per real second
+        self.idle_watts = idle_watts
+        self.max_watts = max_watts
+        # Charge that yields capacity_wh when discharged along the voltage curve
+        self.capacity_ah = capacity_wh / curve_energy(self.voltage_curve, 1.0)
+        self.charge_ah = self.capacity_ah * start_percent / 100
+        self.drained_wh = 0.0
+        self.virtual_time = 0.0
+        self.watts = 0.0
+        self.lock = threading.Lock()
+
+        self.rapl = RaplReader(powercap_root)
+        if self.rapl.available:
+            self.rapl.read()
+        self.last_cpu_times = psutil.cpu_times()
+        self.last_time = time.monotonic()
+
+    @property
+    def source(self):
+        return 'rapl' if self.rapl.available else 'cpu model'
+
+    def measure_power(self):
+        """Get the average system watts since the previous measurement."""
+        cpu_times = psutil.cpu_times()
+        total = sum(cpu_times) - sum(self.last_cpu_times)
+        idle = (cpu_times.idle + getattr(cpu_times, 'iowait', 0)) - \
+            (self.last_cpu_times.idle + getattr(self.last_cpu_times, 'iowait', 0))
+        self.last_cpu_times = cpu_times
+        if self.rapl.available:
+            power = self.rapl.read()
+            if 'psys' in power:
+                return power['psys']
+            if 'package' in power:
+                return power['package'] + power.get('dram', 0.0)
+        utilization = 1 - idle / total if total > 0 else 0.0
+        return self.idle_watts + (self.max_watts - self.idle_watts) * min(max(utilization, 0.0), 1.0)
+
+    @property
+    def soc(self):
+        return self.charge_ah / self.capacity_ah
+
+    def read(self):
+        """Drain the pack up to now and report it like psutil.sensors_battery()."""
+        with self.lock:
+            now = time.monotonic()
+            elapsed = (now - self.last_time) * self.time_scale
+            self.last_time = now
+            self.watts = self.measure_power()
+
+            voltage = curve_voltage(self.voltage_curve, self.soc)
+            drained_ah = self.watts * elapsed / 3600 / voltage
+            drained_ah += self.capacity_ah * self.self_discharge * elapsed / SECONDS_PER_MONTH
+            self.charge_ah = max(0.0, self.charge_ah - drained_ah)
+            self.drained_wh += self.watts * elapsed / 3600
+            self.virtual_time += elapsed
+
+            remaining_wh = curve_energy(self.voltage_curve, self.soc) * self.capacity_ah
+            secsleft = int(remaining_wh / self.watts * 3600) if self.watts > 0 else psutil.POWER_TIME_UNKNOWN
+            return sbattery(round(self.soc * 100, 2), secsleft, False)
+
+    def get_stats(self):
+        """Get the energy drained and the virtual time it took."""
+        with self.lock:
+            return {
+                'percent': self.soc * 100,
+                'drained_wh': self.drained_wh,
+                'virtual_time': self.virtual_time,
+                'avg_watts': self.drained_wh * 3600 / self.virtual_time if self.virtual_time else 0.0,
+                'source': self.source,
+            }
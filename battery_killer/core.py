@@ -1,25 +1,189 @@
 import subprocess
+import signal
+import sys
 import time
 import psutil
 import logging
 import os
-from collections import deque
-from .utils import get_cpu_temperature, create_ascii_graph
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('battery_killer.log')
-    ]
-)
+import json
+import glob
+from .utils import (create_ascii_graph, get_base_cpu_frequencies, get_schedstat, parse_memory_target,
+                    format_time_delta, get_numa_nodes, get_numa_pages)
+
 logger = logging.getLogger(__name__)
 
+# PSI line used per resource: CPU pressure is expected while stressing, so
+# only cpu 'some' is meaningful; memory and io use 'full' (everything stalled)
+PSI_METRICS = {'cpu': 'some', 'memory': 'full', 'io': 'full'}
+
+# Stall percentage that throttles each workload kind, 0 = off
+DEFAULT_PSI_LIMITS = {'cpu': 0, 'memory': 10.0, 'io': 30.0}
+
+# Worker scripts throttled when a resource is under pressure
+PSI_WORKERS = {
+    'cpu': ('intense_stress_cpu.py',),
+    'memory': ('intense_stress_mem.py', 'intense_stress_cpu.py'),
+    'io': ('intense_stress_io.py',),
+}
+
+# Seconds a new worker gets to install its SIGUSR1 handler, whose default action is to terminate
+SIGNAL_GRACE_PERIOD = 5
+
+# Built-in kernels run by each CPU stress process
+CPU_KERNELS = ('math', 'crypto', 'loops', 'memory')
+
+# Application kernels available to the CPU workers
+APP_KERNELS = ('zlib', 'lzma', 'json', 'regex', 'sort')
+
+# Shared by the generated stress scripts: workers count the work they complete
+# and periodically publish the counters to the supervisor's stats directory.
+WORKER_STATS_CODE = """
+import os
+import json
+import mmap
+import signal
+import threading
+import time
+
+WORKER_CONFIG = json.loads(os.environ.get('BATTERY_KILLER_WORKER_CONFIG', '{}'))
+_counters = {}
+_latency = {}
+_counters_lock = threading.Lock()
+_thread_cpu = threading.local()
+
+def record(kind, ops=1, nbytes=0):
+    \"\"\"Count completed work and the thread CPU time spent on it\"\"\"
+    now = time.thread_time()
+    cpu = now - getattr(_thread_cpu, 'last', 0.0)
+    _thread_cpu.last = now
+    with _counters_lock:
+        counter = _counters.setdefault(kind, [0, 0, 0.0])
+        counter[0] += ops
+        counter[1] += nbytes
+        counter[2] += cpu
+
+def record_latency(kind, seconds):
+    \"\"\"Count an operation latency in the kind's log-linear microsecond histogram\"\"\"
+    # Same buckets as battery_killer.latency: exact below 64 us, then 32 per power of two
+    value = int(seconds * 1e6)
+    if value < 64:
+        index = max(value, 0)
+    else:
+        shift = value.bit_length() - 6
+        index = 64 + (shift - 1) * 32 + (value >> shift) - 32
+    with _counters_lock:
+        histogram = _latency.setdefault(kind, {})
+        histogram[index] = histogram.get(index, 0) + 1
+
+def timed(kind, func, *args, nbytes=0):
+    \"\"\"Run one operation, recording it and its latency\"\"\"
+    start = time.perf_counter()
+    result = func(*args)
+    record_latency(kind, time.perf_counter() - start)
+    record(kind, nbytes=nbytes)
+    return result
+
+def scratch_path(name):
+    \"\"\"Get a per-process directory under the supervisor's scratch dir (removed on shutdown)\"\"\"
+    scratch_dir = WORKER_CONFIG.get('scratch_dir')
+    if not scratch_dir:
+        import tempfile
+        return tempfile.mkdtemp(prefix=f'battery_killer_{name}_')
+    path = os.path.join(scratch_dir, str(os.getpid()), name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def stats_reporter(interval=1.0):
+    \"\"\"Publish work counters for the supervisor\"\"\"
+    stats_dir = WORKER_CONFIG.get('stats_dir')
+    if not stats_dir:
+        return
+    path = os.path.join(stats_dir, f'{os.getpid()}.json')
+    while True:
+        time.sleep(interval)
+        with _counters_lock:
+            counters = {kind: {'ops': c[0], 'bytes': c[1], 'cpu': c[2]} for kind, c in _counters.items()}
+            latency = {kind: dict(histogram) for kind, histogram in _latency.items()}
+        try:
+            with open(path + '.tmp', 'w') as f:
+                json.dump({'time': time.time(), 'counters': counters, 'latency': latency}, f)
+            os.replace(path + '.tmp', path)  # Atomic so readers never see partial files
+        except OSError:
+            pass
+
+def start_stats_reporter():
+    threading.Thread(target=stats_reporter, daemon=True).start()
+
+def apply_sched_policy():
+    \"\"\"Lower this worker's CPU (and optionally I/O) priority for co-tenant runs\"\"\"
+    # Set before any thread starts so every thread and child inherits it
+    policy = WORKER_CONFIG.get('sched_policy')
+    nice = WORKER_CONFIG.get('nice', 19)
+    if policy == 'idle':
+        try:
+            os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        except (AttributeError, OSError):
+            policy, nice = 'nice', 19  # No SCHED_IDLE on this platform, lowest nice is closest
+    if policy == 'nice':
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+    if WORKER_CONFIG.get('io_idle'):
+        try:
+            import psutil
+            psutil.Process().ionice(psutil.IOPRIO_CLASS_IDLE)
+        except Exception:
+            pass  # No I/O priority classes on this platform
+
+def bind_numa_node():
+    \"\"\"Run on the NUMA node's CPUs so first-touched memory lands on that node, or on a chosen one\"\"\"
+    # Set before any thread starts or allocates, like the scheduling policy
+    cpus = WORKER_CONFIG.get('numa_cpus')
+    if cpus:
+        try:
+            os.sched_setaffinity(0, cpus)
+        except (AttributeError, OSError):
+            pass
+    mem_node = WORKER_CONFIG.get('numa_mem_node')
+    if mem_node is not None:
+        # No set_mempolicy in the os module: MPOL_BIND through the raw syscall
+        try:
+            import ctypes
+            import platform
+            number = {'x86_64': 238, 'aarch64': 237}[platform.machine()]
+            mask = ctypes.c_ulong(1 << mem_node)
+            ctypes.CDLL(None, use_errno=True).syscall(number, 2, ctypes.byref(mask), ctypes.sizeof(mask) * 8 + 1)
+        except Exception:
+            pass  # Not Linux, or an architecture without a known syscall number
+
+def map_region(size):
+    \"\"\"Map an anonymous region with the requested transparent huge page advice\"\"\"
+    region = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+    advice = {'huge': getattr(mmap, 'MADV_HUGEPAGE', None),
+              'nohuge': getattr(mmap, 'MADV_NOHUGEPAGE', None)}.get(WORKER_CONFIG.get('mem_hugepages'))
+    if advice is not None:
+        try:
+            region.madvise(advice)
+        except OSError:
+            pass
+    return region
+
+apply_sched_policy()
+bind_numa_node()
+
+# Set by the supervisor (SIGUSR1) when memory stalls show up in PSI
+memory_pressure = threading.Event()
+try:
+    signal.signal(signal.SIGUSR1, lambda signum, frame: memory_pressure.set())
+except (AttributeError, ValueError):
+    pass
+"""
+
 class SystemStresser:
     def __init__(self, config=None):
-        self.config = config or {
+        # Caller settings override the defaults, so older configs keep working
+        self.config = {
             'min_battery': 5,
             'check_interval': 10,
             'num_cores': psutil.cpu_count(),
@@ -27,65 +191,485 @@ class SystemStresser:
             'gpu_test_path': '',
             'monitor_temp': True,
             'max_temp_celsius': 90,
-            'history_points': 60  # Keep 60 data points for graphs
+            'history_points': 60,  # Points rendered per graph (terminal width)
+            'graph_window': 0,  # Seconds of history graphed, 0 = whole run
+            'graph_downsampler': 'lttb',  # 'lttb' or 'minmax'
+            'throttle_freq_ratio': 0.8,  # Busy cores below 80% of base (or peak busy) clock count as throttled
+            'processes_per_core': 2,  # CPU stress processes started per core
+            'cpu_list': None,  # CPUs the CPU stress processes are pinned to (num_cores of them), None = unpinned
+            'cpu_only': False,  # Start only the CPU stress processes (scaling sweeps)
+            'cpu_kernels': list(CPU_KERNELS),  # Threads started in each CPU stress process
+            'kernel_threads': 1,  # Threads started per CPU kernel in each process
+            'hash_algorithms': ['sha256', 'sha512', 'blake2b', 'sha3_256'],
+            'hash_buffer_size': 1024 * 1024,  # 4 KiB - 16 MiB per hash update
+            'app_kernels': [],  # Any of zlib, lzma, json, regex, sort
+            'mem_target': 0,  # Bytes (or '60%' of RAM) held by the memory capacity worker, 0 = disabled
+            'mem_touch_rate': 0,  # MB/s of pages touched, 0 = unlimited
+            'mem_hugepages': None,  # 'huge' or 'nohuge' to madvise transparent huge pages (memory and NumPy buffers)
+            'numa_nodes': None,  # NUMA nodes memory-heavy workers are bound to, round-robin, None = unbound
+            'numa_mem_node': None,  # Node their memory is bound to instead of the local one (remote on purpose)
+            'mem_swap_backoff': 256 * 1024 * 1024,  # Release memory once swap grows this much
+            'metadata_threads': 0,  # Threads running create/stat/rename/readdir/unlink storms, 0 = disabled
+            'metadata_files': 256,  # Small files per metadata thread directory
+            'metadata_file_size': 4096,  # Bytes written to each metadata file
+            'net_connections': 0,  # Connections per traffic type (TCP bulk, TCP request/response, UDP), 0 = disabled
+            'net_host': '127.0.0.1',  # Address the network servers bind to (loopback or a chosen interface)
+            'net_message_size': 64,  # Bytes per request/response message
+            'cache_workers': 0,  # Pinned processes writing shared cache lines, 0 = disabled
+            'cache_modes': ['true', 'false', 'padded'],  # Sharing modes cycled through in lockstep
+            'cache_phase': 5,  # Seconds spent in each sharing mode
+            'sensor_ttls': {},  # Per-sensor sampling period overrides in seconds
+            'powercap_root': '/sys/class/powercap',  # RAPL energy counters
+            'virtual_battery': False,  # Simulate a battery pack drained by measured energy (no battery needed)
+            'vbat_capacity_wh': 50.0,  # Virtual pack capacity in Wh
+            'vbat_time_scale': 1.0,  # Virtual seconds drained per real second
+            'vbat_self_discharge': 0.02,  # Fraction of capacity self-discharged per 30 days
+            'vbat_idle_watts': 5.0,  # System watts at idle, used without RAPL
+            'vbat_max_watts': 45.0,  # System watts at full CPU load, used without RAPL
+            'cotenant': None,  # 'idle' (SCHED_IDLE) or 'nice' to run workers below other work
+            'cotenant_nice': 19,  # Nice value used by the 'nice' co-tenant mode
+            'io_idle': False,  # Run the I/O worker in the idle I/O priority class
+            'latency_probe': False,  # Measure wakeup latency while stressing, like cyclictest
+            'latency_interval': 0.001,  # Seconds the latency probe sleeps between wakeups
+            'psi_limits': dict(DEFAULT_PSI_LIMITS),  # PSI stall % that throttles each workload kind
+            'steady_window': 120,  # Seconds of temperature, power and throughput judged for steady state
+            'steady_drift': 0.03,  # Largest fitted drift across the window, relative to the mean
+            'steady_cv': 0.1,  # Largest standard deviation over the window, relative to the mean
+            'shutdown_timeout': 5,  # Seconds workers get to exit before SIGKILL
+            'heartbeat_timeout': 15,  # Seconds without a worker heartbeat before it is considered hung
+            'max_worker_restarts': 5  # Restarts allowed per worker slot
         }
+        self.config.update(config or {})
         self.cpu_processes = []
         self.gpu_proc = None
+        self.mem_proc = None
+        self.latency_probe = None
+        self.cache_segment = None
+        self.virtual_battery = None
+        self.numa_spawned = 0  # Round-robin position over the configured NUMA nodes
+        self.numa_placement = {}  # Latest local/remote resident bytes per bound node
+        self.last_numa_sample = None
+        self.tracer = None  # TraceWriter while a Chrome trace is being recorded
+        self.worker_specs = {}
+        self.worker_restarts = 0
+        
+        # PSI backpressure: paused worker pids per resource (none for memory) and episode counts
+        self.backpressure = {}
+        self.backpressure_events = {}
+        
+        # Shared, cached sensor access for every consumer, created on first use
+        self._sensors = None
+        
+        # Initialize multi-resolution history tracking
+        from .history import RollupHistory
+        from .summary import RunSummary
+        self.temp_history = RollupHistory()
+        self.cpu_history = RollupHistory()
+        self.battery_history = RollupHistory()
+        self.memory_history = RollupHistory()
+        self.freq_history = RollupHistory()
+        self.throttle_history = RollupHistory()
+        self.run_summary = RunSummary()  # Streaming end-of-run percentiles
+        self.steady_summary = RunSummary()  # The same, over steady-state samples only
+        self.steady = None  # SteadyStateDetector, created on the first sample
         
-        # Initialize history tracking
-        self.temp_history = deque(maxlen=self.config['history_points'])
-        self.cpu_history = deque(maxlen=self.config['history_points'])
-        self.battery_history = deque(maxlen=self.config['history_points'])
-        self.memory_history = deque(maxlen=self.config['history_points'])
+        # Throttling state
+        # Reference clocks: base frequency where cpufreq exposes it, otherwise each
+        # core's highest clock seen while busy (psutil's max is single-core turbo)
+        self.base_cpu_freqs = get_base_cpu_frequencies()
+        self.peak_cpu_freqs = {}
+        self.last_throttle_counts = None
+        self.throttling = False
+        self.throttle_episodes = 0
         
-    def get_system_stats(self):
+        # Workload throughput published by the stress workers
+        self.stats_dir = None
+        self.scratch_dir = None  # Files created by the I/O workloads
+        self.worker_counters = {}
+        self.workload_totals = {}
+        self.workload_stats = {}
+        self.last_workload_sample = None
+        self.workload_deltas = {}
+        self.worker_latency = {}
+        self.workload_latency = {}  # Per-kind latency histograms, {bucket index: count}
+        
+        # Worker run and runqueue wait time from /proc/<pid>/task/*/schedstat
+        self.last_schedstat = {}
+        self.last_sched_sample = None
+        self.sched_totals = {'run': 0.0, 'wait': 0.0, 'busy': 0.0}
+        self.sched_stats = {}
+        
+        # Energy attribution across workload kinds
+        self.last_energy_sample = None
+        self.last_busy_cpu = None
+        self.unattributed_joules = 0.0
+        
+    @property
+    def sensors(self):
+        """Get the sensor hub, importing the sensor backends on first use."""
+        if self._sensors is None:
+            from .sensors import SensorHub
+            self._sensors = SensorHub(self.config['sensor_ttls'], self.config['powercap_root'])
+        return self._sensors
+        
+    def get_system_stats(self, consumer='stats'):
         """Get current system statistics."""
         # Calculate disk usage percentage
-        disk_usage = psutil.disk_usage('/')
+        disk_usage = self.sensors.read('disk', consumer)
         disk_usage_percent = (disk_usage.used / disk_usage.total) * 100
         
         stats = {
-            'cpu_percent': psutil.cpu_percent(interval=1, percpu=True),
-            'memory_percent': psutil.virtual_memory().percent,
-            'battery': psutil.sensors_battery(),
+            'cpu_percent': self.sensors.read('cpu', consumer),
+            'memory_percent': self.sensors.read('memory', consumer).percent,
+            'battery': self.sensors.read('battery', consumer),
             'disk_usage': disk_usage_percent,
         }
         
         # Get CPU temperature
-        temp = get_cpu_temperature()
+        temp = self.sensors.read('temperature', consumer)
         if temp is not None:
             stats['cpu_temp'] = temp
+        
+        # Get fan speed and power
+        fan_speed = self.sensors.read('fan', consumer)
+        if fan_speed is not None:
+            stats['fan_speed'] = fan_speed
+        power_stats = self.sensors.read('power', consumer)
+        if power_stats:
+            stats.update(power_stats)
+        
+        # Get per-core frequency and throttle counters
+        cpu_freq = self.sensors.read('cpu_freq', consumer)
+        if cpu_freq:
+            stats['cpu_freq'] = cpu_freq
+        pressure = self.sensors.read('pressure', consumer)
+        if pressure:
+            stats['pressure'] = pressure
+        throttle_counts = self.sensors.read('throttle', consumer)
+        if throttle_counts:
+            stats['throttle_counts'] = throttle_counts
+        self.update_throttle_state(stats)
+        
+        # Get workload throughput from the stress workers
+        stats['workloads'] = self.get_workload_stats()
+        self.attribute_energy(stats)
+        stats['scheduling'] = self.get_scheduling_stats()
+        
+        # numa_maps walks every mapping, so sample placement less often
+        if self.config['numa_nodes'] and (self.last_numa_sample is None or time.time() - self.last_numa_sample >= 30):
+            self.numa_placement = self.get_numa_placement() or self.numa_placement
+            self.last_numa_sample = time.time()
+        if self.latency_probe:
+            stats['latency'] = self.latency_probe.get_stats()
             
         # Update history
         self.temp_history.append(stats.get('cpu_temp', 0))
         self.cpu_history.append(sum(stats['cpu_percent']) / len(stats['cpu_percent']))
-        self.battery_history.append(stats['battery'].percent)
+        if stats['battery'] is not None:
+            self.battery_history.append(stats['battery'].percent)
         self.memory_history.append(stats['memory_percent'])
+        if cpu_freq:
+            self.freq_history.append(sum(cpu_freq) / len(cpu_freq))
+        self.throttle_history.append(stats['throttle_events'])
+        
+        # Warm-up samples are kept out of the steady-state statistics
+        if self.steady is None:
+            from .steady import SteadyStateDetector
+            self.steady = SteadyStateDetector(self.config['steady_window'], self.config['steady_drift'],
+                                              self.config['steady_cv'])
+        stats['steady'] = self.steady.update(stats)
+        self.run_summary.update(stats)
+        if stats['steady']:
+            self.steady_summary.update(stats)
+        else:
+            self.steady_summary.skip()
+        if self.tracer:
+            self.trace_counters(stats)
         
         return stats
 
+    def use_virtual_battery(self):
+        """Replace the battery sensor with a simulated pack drained by measured energy."""
+        from .battery import VirtualBattery  # Only needed without a real battery
+        self.virtual_battery = VirtualBattery(capacity_wh=self.config['vbat_capacity_wh'],
+                                              self_discharge=self.config['vbat_self_discharge'],
+                                              time_scale=self.config['vbat_time_scale'],
+                                              idle_watts=self.config['vbat_idle_watts'],
+                                              max_watts=self.config['vbat_max_watts'],
+                                              powercap_root=self.config['powercap_root'])
+        # Sample as often in virtual time as the real battery sensor would be
+        ttl = self.sensors.sensors['battery'].ttl / max(self.config['vbat_time_scale'], 1.0)
+        self.sensors.register('battery', self.virtual_battery.read, ttl)
+        logger.info(f"Using a {self.config['vbat_capacity_wh']} Wh virtual battery drained by "
+                    f"{self.virtual_battery.source} power at {self.config['vbat_time_scale']}x time")
+    
+    def open_trace(self, path):
+        """Record a Chrome trace-event timeline of the run to path."""
+        from .trace import TraceWriter  # Only needed when tracing
+        self.tracer = TraceWriter(path)
+        self.sensors.tracer = self.tracer
+        logger.info(f"Recording trace events to {path}")
+
+    def close_trace(self):
+        if self.tracer:
+            self.tracer.close()
+        self.tracer = None
+        self.sensors.tracer = None
+
+    def trace_counters(self, stats):
+        """Add the CPU, temperature and power samples to the trace's counter tracks."""
+        self.tracer.counter('cpu %', {'avg': sum(stats['cpu_percent']) / len(stats['cpu_percent'])})
+        if 'cpu_temp' in stats:
+            self.tracer.counter('temperature °C', {'cpu': stats['cpu_temp']})
+        if stats.get('rapl_power'):
+            self.tracer.counter('power W', dict(stats['rapl_power']))
+        elif 'cpu_power' in stats:
+            self.tracer.counter('power W', {'cpu': stats['cpu_power']})
+        if stats['battery'] is not None:
+            self.tracer.counter('battery %', {'battery': stats['battery'].percent})
+
+    def update_throttle_state(self, stats):
+        """Detect thermal throttling from throttle counters and clock drops."""
+        # New throttle events since the previous sample
+        events = 0
+        counts = stats.get('throttle_counts')
+        if counts and self.last_throttle_counts:
+            events = sum(max(0, counts[k] - self.last_throttle_counts.get(k, counts[k])) for k in counts)
+        if counts:
+            self.last_throttle_counts = counts
+        stats['throttle_events'] = events
+        
+        # Busy cores running well below their reference clock are clock-limited
+        clock_limited = []
+        for core, (usage, freq) in enumerate(zip(stats['cpu_percent'], stats.get('cpu_freq') or [])):
+            if usage < 90:
+                continue
+            if self.base_cpu_freqs and core < len(self.base_cpu_freqs):
+                reference = self.base_cpu_freqs[core]
+            else:
+                reference = self.peak_cpu_freqs[core] = max(self.peak_cpu_freqs.get(core, 0), freq)
+            if freq < reference * self.config['throttle_freq_ratio']:
+                clock_limited.append(core)
+        stats['clock_limited_cores'] = clock_limited
+        
+        throttling = events > 0 or bool(clock_limited)
+        if throttling and not self.throttling:
+            self.throttle_episodes += 1
+            logger.warning(f"Throttling detected: {events} throttle events, "
+                           f"{len(clock_limited)} busy cores below "
+                           f"{self.config['throttle_freq_ratio'] * 100:.0f}% of base/peak clock")
+        elif self.throttling and not throttling:
+            logger.info("Throttling episode ended")
+        self.throttling = throttling
+        stats['throttling'] = throttling
+
+    def get_workload_stats(self):
+        """Aggregate the throughput counters published by the stress workers."""
+        if not self.stats_dir:
+            self.workload_deltas = {}
+            return self.workload_stats
+        
+        now = time.time()
+        deltas = {}
+        for path in glob.glob(os.path.join(self.stats_dir, '*.json')):
+            try:
+                with open(path) as f:
+                    worker_stats = json.load(f)
+                counters = worker_stats['counters']
+            except Exception as e:
+                logger.debug(f"Could not read worker stats {path}: {e}")
+                continue
+            
+            # Latency histograms are cumulative per worker too
+            previous_latency = self.worker_latency.get(path, {})
+            for kind, histogram in worker_stats.get('latency', {}).items():
+                total = self.workload_latency.setdefault(kind, {})
+                last = previous_latency.get(kind, {})
+                for index, count in histogram.items():
+                    total[int(index)] = total.get(int(index), 0) + count - last.get(index, 0)
+            self.worker_latency[path] = worker_stats.get('latency', {})
+            
+            # Counters are cumulative per worker, so only add what changed
+            previous = self.worker_counters.get(path, {})
+            for kind, counter in counters.items():
+                last = previous.get(kind, {'ops': 0, 'bytes': 0, 'cpu': 0.0})
+                delta = deltas.setdefault(kind, {'ops': 0, 'bytes': 0, 'cpu': 0.0})
+                for key in delta:
+                    delta[key] += counter[key] - last[key]
+            self.worker_counters[path] = counters
+        
+        for kind, delta in deltas.items():
+            total = self.workload_totals.setdefault(kind, {'ops': 0, 'bytes': 0, 'cpu': 0.0, 'joules': 0.0})
+            for key in delta:
+                total[key] += delta[key]
+        self.workload_deltas = deltas
+        
+        if self.last_workload_sample is not None and now > self.last_workload_sample:
+            elapsed = now - self.last_workload_sample
+            self.workload_stats = {
+                kind: {
+                    'ops': total['ops'],
+                    'bytes': total['bytes'],
+                    'cpu': total['cpu'],
+                    'ops_per_sec': deltas.get(kind, {'ops': 0})['ops'] / elapsed,
+                    'mb_per_sec': deltas.get(kind, {'bytes': 0})['bytes'] / elapsed / (1024 * 1024),
+                }
+                for kind, total in self.workload_totals.items()
+            }
+            from .latency import histogram_percentile
+            for kind, histogram in self.workload_latency.items():
+                if kind in self.workload_stats:
+                    self.workload_stats[kind]['latency'] = {
+                        'p50': histogram_percentile(histogram, 50),
+                        'p99': histogram_percentile(histogram, 99),
+                        'p99.9': histogram_percentile(histogram, 99.9),
+                    }
+        self.last_workload_sample = now
+        return self.workload_stats
+
+    def get_scheduling_stats(self):
+        """Measure the CPU the workers absorbed and the time they waited to run."""
+        now = time.time()
+        cpu_times = psutil.cpu_times()
+        busy = sum(cpu_times) - cpu_times.idle
+        
+        schedstat = {}
+        for proc in self.all_workers():
+            try:
+                pids = [proc.pid] + [child.pid for child in psutil.Process(proc.pid).children(recursive=True)]
+            except psutil.Error:
+                continue
+            for pid in pids:
+                sample = get_schedstat(pid)
+                if sample:
+                    schedstat[pid] = sample
+        
+        # Counters are cumulative per process, so only add what changed
+        run = wait = 0.0
+        for pid, (pid_run, pid_wait) in schedstat.items():
+            last_run, last_wait = self.last_schedstat.get(pid, (0.0, 0.0))
+            run += pid_run - last_run
+            wait += pid_wait - last_wait
+        self.last_schedstat = schedstat
+        
+        if self.last_sched_sample is not None and schedstat:
+            elapsed = now - self.last_sched_sample[0]
+            busy_delta = busy - self.last_sched_sample[1]
+            self.sched_totals['run'] += run
+            self.sched_totals['wait'] += wait
+            self.sched_totals['busy'] += busy_delta
+            capacity = elapsed * psutil.cpu_count()
+            self.sched_stats = {
+                'absorbed_cpu_percent': run / capacity * 100,
+                'foreground_cpu_percent': max(0.0, busy_delta - run) / capacity * 100,
+                'wait_percent': wait / (run + wait) * 100 if run + wait else 0.0,
+            }
+        self.last_sched_sample = (now, busy)
+        return self.sched_stats
+
+    def attribute_energy(self, stats):
+        """Split the energy used since the last sample across workload kinds by CPU time."""
+        now = time.time()
+        cpu_times = psutil.cpu_times()
+        busy_cpu = sum(cpu_times) - cpu_times.idle
+        if self.last_energy_sample is not None and 'cpu_power' in stats:
+            joules = stats['cpu_power'] * (now - self.last_energy_sample)
+            # Work that doesn't report CPU time (and other processes) keeps its share
+            cpu = {kind: delta['cpu'] for kind, delta in self.workload_deltas.items()}
+            total_cpu = max(sum(cpu.values()), busy_cpu - self.last_busy_cpu)
+            attributed = 0.0
+            if total_cpu > 0:
+                for kind, cpu_time in cpu.items():
+                    share = joules * cpu_time / total_cpu
+                    self.workload_totals[kind]['joules'] += share
+                    attributed += share
+            self.unattributed_joules += joules - attributed
+        self.last_energy_sample = now
+        self.last_busy_cpu = busy_cpu
+        
+        for kind, workload in stats['workloads'].items():
+            total = self.workload_totals[kind]
+            workload['joules'] = total['joules']
+            workload['joules_per_op'] = total['joules'] / total['ops'] if total['ops'] else None
+
+    def worker_env(self, **worker_config):
+        """Build the environment for a stress worker process."""
+        import tempfile
+        if not self.stats_dir:
+            self.stats_dir = tempfile.mkdtemp(prefix='battery_killer_stats_')
+        if not self.scratch_dir:
+            self.scratch_dir = tempfile.mkdtemp(prefix='battery_killer_scratch_')
+        worker_config['stats_dir'] = self.stats_dir
+        worker_config['scratch_dir'] = self.scratch_dir
+        if self.config['cotenant']:
+            worker_config['sched_policy'] = self.config['cotenant']
+            worker_config['nice'] = self.config['cotenant_nice']
+        if worker_config.get('numa_node') is not None:
+            worker_config['numa_cpus'] = get_numa_nodes().get(worker_config['numa_node'], [])
+            worker_config['numa_mem_node'] = self.config['numa_mem_node']
+        env = os.environ.copy()
+        env['BATTERY_KILLER_WORKER_CONFIG'] = json.dumps(worker_config)
+        return env
+
+    def next_numa_node(self):
+        """Get the NUMA node for the next memory-heavy worker, or None when unbound."""
+        nodes = self.config['numa_nodes']
+        if not nodes:
+            return None
+        node = nodes[self.numa_spawned % len(nodes)]
+        self.numa_spawned += 1
+        return node
+    
+    def get_numa_placement(self):
+        """Get NUMA-bound workers' resident memory on their own node versus other nodes."""
+        placement = {}
+        for proc in self.all_workers():
+            spec = self.worker_specs.get(proc.pid)
+            if not spec or not spec['env']:
+                continue
+            node = json.loads(spec['env'].get('BATTERY_KILLER_WORKER_CONFIG', '{}')).get('numa_node')
+            if node is None:
+                continue
+            pages = get_numa_pages(proc.pid)
+            usage = placement.setdefault(node, {'workers': 0, 'local': 0, 'remote': 0})
+            usage['workers'] += 1
+            usage['local'] += pages.get(node, 0)
+            usage['remote'] += sum(size for other, size in pages.items() if other != node)
+        return placement
+    
     def create_graph(self, data, title, height=10):
-        """Create ASCII graph from data."""
-        if not data:
+        """Create ASCII graph from a rollup history."""
+        points = data.series(self.config['graph_window'])
+        if not points:
             return ""
         
-        # Convert deque to list and ensure we have float values
-        data_list = [float(x) if x is not None else 0.0 for x in list(data)]
+        # Downsample to the graph width so rendering cost doesn't grow with the window
+        width = self.config['history_points']
+        from .history import DOWNSAMPLERS
+        downsample = DOWNSAMPLERS[self.config['graph_downsampler']]
+        data_list = [float(p[1]) for p in downsample(points, width)]
         
-        if not data_list or all(x == 0 for x in data_list):
+        if all(x == 0 for x in data_list):
             return f"\n{title}\nNo data yet..."
         
         try:
-            graph = f"\n{title}\n"
-            graph += create_ascii_graph(data_list, height)
-            return graph
+            return "\n" + create_ascii_graph(data_list, title, width=width, height=height)
         except Exception as e:
             logger.error(f"Failed to create graph for {title}: {e}")
             return f"\n{title}\nGraph generation failed"
 
-    def log_system_stats(self):
-        """Log current system statistics."""
-        stats = self.get_system_stats()
+    def history_range(self, data, positive=False):
+        """Get the (min, max) of a history over the graph window, None if it has no nonzero data."""
+        points = data.series(self.config['graph_window'])
+        lows = [p[2] for p in points if p[2] > 0 or not positive]
+        if not lows or not any(p[3] for p in points):
+            return None
+        return min(lows), max(p[3] for p in points)
+    
+    def log_system_stats(self, stats=None):
+        """Log current system statistics, sampling them unless a sample is given."""
+        if stats is None:
+            stats = self.get_system_stats('dashboard')
         battery = stats['battery']
         
         # Clear screen and move cursor to top
@@ -97,72 +681,156 @@ class SystemStresser:
         print("=" * 80)
         
         # Current values
-        print(f"Battery: {battery.percent}% {'[Charging]' if battery.power_plugged else '[Discharging]'}")
-        print(f"Time remaining: {int(battery.secsleft/60)} minutes" if battery.secsleft > 0 else "Time remaining: Unknown")
+        if battery is not None:
+            print(f"Battery: {battery.percent}% {'[Charging]' if battery.power_plugged else '[Discharging]'}")
+            print(f"Time remaining: {int(battery.secsleft/60)} minutes" if battery.secsleft > 0 else "Time remaining: Unknown")
+        else:
+            print("Battery: N/A")
         
         if 'cpu_temp' in stats:
             print(f"\nCPU Temperature: {stats['cpu_temp']:.1f}°C")
         
         print("\nCPU Usage:")
         total_cpu = 0
+        cpu_freq = stats.get('cpu_freq', [])
         for i, usage in enumerate(stats['cpu_percent']):
-            print(f"Core {i}: {usage:>5.1f}%")
+            freq_txt = f" @ {cpu_freq[i]:>6.0f} MHz" if i < len(cpu_freq) else ""
+            limited_txt = " [CLOCK-LIMITED]" if i in stats['clock_limited_cores'] else ""
+            print(f"Core {i}: {usage:>5.1f}%{freq_txt}{limited_txt}")
             total_cpu += usage
         print(f"Average CPU: {total_cpu/len(stats['cpu_percent']):>5.1f}%")
         
+        if stats['throttling']:
+            print(f"\n*** THROTTLING: {stats['throttle_events']} new throttle events, "
+                  f"{len(stats['clock_limited_cores'])} clock-limited cores ***")
+        if 'throttle_counts' in stats:
+            counts = ", ".join(f"{k}: {v}" for k, v in stats['throttle_counts'].items())
+            print(f"Throttle Counters: {counts} (episodes this run: {self.throttle_episodes})")
+        steady = self.steady.get_state()
+        if steady['steady']:
+            print(f"Thermal State: steady (warm-up took {format_time_delta(steady['warmup'])}, "
+                  f"{steady['change_points']} change points)")
+        else:
+            print(f"Thermal State: {'settling' if steady['warmup'] is not None else 'warming up'}")
+        
+        if stats.get('rapl_power'):
+            domains = ", ".join(f"{domain} {watts:.1f} W" for domain, watts in sorted(stats['rapl_power'].items()))
+            print(f"RAPL Power: {domains}")
+        
+        if stats['scheduling']:
+            scheduling = stats['scheduling']
+            mode_txt = f" [{self.config['cotenant']} co-tenant]" if self.config['cotenant'] else ""
+            print(f"Workers: {scheduling['absorbed_cpu_percent']:.1f}% CPU absorbed, "
+                  f"{scheduling['foreground_cpu_percent']:.1f}% foreground, "
+                  f"{scheduling['wait_percent']:.1f}% of runnable time waiting{mode_txt}")
+        
+        if stats.get('latency'):
+            latency = stats['latency']
+            print(f"Wakeup Latency: p50 {latency['p50']} us, p99 {latency['p99']} us, "
+                  f"p99.9 {latency['p99.9']} us, max {latency['max']:.0f} us ({latency['samples']} wakeups)")
+        
+        if 'pressure' in stats:
+            stalls = ", ".join(f"{resource} {PSI_METRICS[resource]} {stalls[PSI_METRICS[resource]]:.1f}%"
+                               for resource, stalls in stats['pressure'].items() if PSI_METRICS[resource] in stalls)
+            paused_txt = f" [THROTTLED: {', '.join(stats['backpressure'])}]" if stats.get('backpressure') else ""
+            print(f"Pressure Stalls: {stalls}{paused_txt}")
+        
         print(f"\nMemory Usage: {stats['memory_percent']:.1f}%")
         
         # Graphs section
-        print("\nHistorical Data (Last {} readings)".format(self.config['history_points']))
+        window = self.config['graph_window']
+        if not window and self.cpu_history.first_timestamp:
+            window = time.time() - self.cpu_history.first_timestamp
+        print(f"\nHistorical Data (Last {format_time_delta(window)})")
         print("-" * 80)
         
-        # Temperature graph
-        if any(self.temp_history):
-            temp_min = min(x for x in self.temp_history if x is not None and x > 0)
-            temp_max = max(x for x in self.temp_history if x is not None)
-            print(f"Temperature Range: {temp_min:.1f}°C - {temp_max:.1f}°C")
+        # Temperature graph (0 marks samples without a sensor reading)
+        temp_range = self.history_range(self.temp_history, positive=True)
+        if temp_range:
+            print(f"Temperature Range: {temp_range[0]:.1f}°C - {temp_range[1]:.1f}°C")
         print(self.create_graph(self.temp_history, "CPU Temperature (°C)"))
         
         # CPU Usage graph
-        if any(self.cpu_history):
-            cpu_min = min(self.cpu_history)
-            cpu_max = max(self.cpu_history)
-            print(f"CPU Usage Range: {cpu_min:.1f}% - {cpu_max:.1f}%")
+        cpu_range = self.history_range(self.cpu_history)
+        if cpu_range:
+            print(f"CPU Usage Range: {cpu_range[0]:.1f}% - {cpu_range[1]:.1f}%")
         print(self.create_graph(self.cpu_history, "Average CPU Usage (%)"))
         
         # Battery graph
-        if any(self.battery_history):
-            bat_min = min(self.battery_history)
-            bat_max = max(self.battery_history)
-            print(f"Battery Range: {bat_min:.1f}% - {bat_max:.1f}%")
+        bat_range = self.history_range(self.battery_history)
+        if bat_range:
+            print(f"Battery Range: {bat_range[0]:.1f}% - {bat_range[1]:.1f}%")
         print(self.create_graph(self.battery_history, "Battery Level (%)"))
         
         # Memory graph
-        if any(self.memory_history):
-            mem_min = min(self.memory_history)
-            mem_max = max(self.memory_history)
-            print(f"Memory Range: {mem_min:.1f}% - {mem_max:.1f}%")
+        mem_range = self.history_range(self.memory_history)
+        if mem_range:
+            print(f"Memory Range: {mem_range[0]:.1f}% - {mem_range[1]:.1f}%")
         print(self.create_graph(self.memory_history, "Memory Usage (%)"))
         
+        # Frequency graph
+        freq_range = self.history_range(self.freq_history)
+        if freq_range:
+            print(f"Frequency Range: {freq_range[0]:.0f} MHz - {freq_range[1]:.0f} MHz")
+        print(self.create_graph(self.freq_history, "Average CPU Frequency (MHz)"))
+        
+        # Throttle events graph
+        throttle_events = self.throttle_history.total(self.config['graph_window'])
+        if throttle_events:
+            print(f"Throttle Events: {throttle_events:.0f} in the last {format_time_delta(window)}")
+            print(self.create_graph(self.throttle_history, "Throttle Events per Sample"))
+        
+        # Workload throughput
+        if stats['workloads']:
+            print("\nWorkload Throughput:")
+            print("-" * 80)
+            for kind, workload in sorted(stats['workloads'].items()):
+                line = f"{kind:<12s} {workload['mb_per_sec']:>10.1f} MB/s {workload['ops_per_sec']:>12.1f} ops/s"
+                if kind.startswith('cache_') and workload['cpu']:
+                    # Modes take turns, so compare them per CPU-second spent in each
+                    line += f" {workload['ops'] / workload['cpu'] / 1e6:>6.1f} Mops/CPU-s"
+                if kind.startswith('net_'):
+                    line += f" {workload['mb_per_sec'] * 8 * 1024 * 1024 / 1e9:>6.2f} Gbit/s"
+                if workload['joules']:
+                    line += f" {workload['joules']:>10.1f} J"
+                    if workload['joules_per_op'] is not None:
+                        line += f" {workload['joules_per_op'] * 1000:>10.3f} mJ/op"
+                print(line)
+                if 'latency' in workload:
+                    latency = workload['latency']
+                    print(f"{'':<12s} latency p50 {latency['p50']} us, p99 {latency['p99']} us, "
+                          f"p99.9 {latency['p99.9']} us")
+        
         # System Info
         print("\nSystem Information:")
         print("-" * 80)
         print(f"CPU Cores: {psutil.cpu_count()} (Physical: {psutil.cpu_count(logical=False)})")
         print(f"Total Memory: {psutil.virtual_memory().total / (1024**3):.1f} GB")
-        print(f"Swap Usage: {psutil.swap_memory().percent}%")
+        print(f"Swap Usage: {self.sensors.read('swap', 'dashboard').percent}%")
+        hub_stats = self.sensors.get_stats()
+        sensor_reads = sum(sensor['reads'] for sensor in hub_stats['sensors'].values())
+        saved_reads = sum(consumer['saved'] for consumer in hub_stats['consumers'].values())
+        print(f"Sensor Reads: {sensor_reads} ({saved_reads} saved by caching)")
         
         # Active processes
         print("\nActive Stress Processes:")
         print("-" * 80)
         print(f"CPU Processes: {len(self.cpu_processes)}")
         print(f"GPU Process: {'Active' if self.gpu_proc else 'Inactive'}")
+        if self.mem_proc:
+            try:
+                rss = psutil.Process(self.mem_proc.pid).memory_info().rss
+                target = parse_memory_target(self.config['mem_target'])
+                print(f"Memory Process RSS: {rss / (1024**3):.1f} GB / {target / (1024**3):.1f} GB target")
+            except psutil.Error:
+                print("Memory Process: Exited")
         
         print("\nPress Ctrl+C to stop")
         print("=" * 80)
 
     def check_temperature(self):
         """Check if system temperature is within safe limits."""
-        temp = get_cpu_temperature()
+        temp = self.sensors.read('temperature', 'thermal')
         if temp is not None and temp > self.config['max_temp_celsius']:
             logger.warning(f"Temperature too high: {temp}°C")
             return False
@@ -173,13 +841,16 @@ class SystemStresser:
         logger.info(f"Starting INTENSE stress test with {self.config['num_cores']} CPU cores")
         
         # INTENSE CPU stress: Multiple stress patterns per core
-        intense_cpu_stress_code = """
+        intense_cpu_stress_code = WORKER_STATS_CODE + """
 import multiprocessing
 import threading
 import math
 import random
 import hashlib
 import time
+import zlib
+import lzma
+import re
 
 def cpu_intensive_math():
     \"\"\"Intensive mathematical operations\"\"\"
@@ -196,16 +867,18 @@ def cpu_intensive_math():
             for j in range(2, int(math.sqrt(n)) + 1):
                 if n % j == 0:
                     break
+        record('math')
 
-def cpu_intensive_crypto():
+def cpu_intensive_crypto(algorithm):
     \"\"\"Intensive cryptographic operations\"\"\"
+    # Hash large buffers so hashlib releases the GIL and threads run in parallel
+    buffer_size = min(max(WORKER_CONFIG.get('hash_buffer_size', 1024 * 1024), 4 * 1024), 16 * 1024 * 1024)
+    data = memoryview(os.urandom(buffer_size))
     while True:
-        # Hash computations (CPU intensive)
-        data = str(random.random() * 1000000).encode()
-        for _ in range(10000):
-            data = hashlib.sha256(data).digest()
-            data = hashlib.md5(data).digest()
-            data = hashlib.sha1(data).digest()
+        digest = hashlib.new(algorithm)
+        digest.update(data)
+        digest.digest()
+        record(algorithm, nbytes=buffer_size)
 
 def cpu_intensive_loops():
     \"\"\"Intensive nested loops\"\"\"
@@ -216,6 +889,7 @@ def cpu_intensive_loops():
             for j in range(1000):
                 total += (i * j) ** 0.5
                 total = total % 1000000
+        record('loops')
 
 def memory_intensive():
     \"\"\"Memory allocation and operations\"\"\"
@@ -230,39 +904,142 @@ def memory_intensive():
             # Mathematical operations on arrays
             result = sum(x ** 2 for x in arr[:10000])
             arrays.append(arr[:1000])  # Keep some data in memory
+            nbytes = len(arr) * 8 * 3  # Pointer array written, sorted and reversed
             
             # Limit memory usage to prevent system crash
             if len(arrays) > 50:
                 arrays = arrays[-25:]  # Keep only recent arrays
+            if memory_pressure.is_set():
+                memory_pressure.clear()
+                arrays = []  # Shed before the OOM killer gets involved
+            record('memory', nbytes=nbytes)
         except MemoryError:
             arrays = arrays[-10:]  # Reduce memory if needed
 
+def build_corpus(size=1024 * 1024, seed=42):
+    \"\"\"Build a synthetic service-log corpus shared by the application kernels\"\"\"
+    rng = random.Random(seed)
+    words = ['GET', 'POST', 'user', 'order', 'cart', 'checkout', 'payment', 'session',
+             'timeout', 'retry', 'cache', 'miss', 'hit', 'error', 'warning', 'ok']
+    records = []
+    total = 0
+    while total < size:
+        record = {
+            'id': rng.randrange(10**9),
+            'ts': 1700000000 + rng.randrange(10**6),
+            'level': rng.choice(['INFO', 'WARN', 'ERROR']),
+            'path': '/' + '/'.join(rng.choice(words) for _ in range(3)),
+            'latency_ms': round(rng.expovariate(0.05), 3),
+            'client': f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}",
+            'message': ' '.join(rng.choice(words) for _ in range(rng.randrange(5, 20))),
+        }
+        records.append(record)
+        total += len(record['message']) + 96
+    text = '\\n'.join(json.dumps(r) for r in records).encode()
+    return records, text
+
+def app_zlib(text):
+    \"\"\"zlib compress/decompress round trips\"\"\"
+    while True:
+        zlib.decompress(zlib.compress(text, 6))
+        record('zlib', nbytes=len(text))
+
+def app_lzma(text):
+    \"\"\"lzma compress/decompress round trips\"\"\"
+    chunk = text[:256 * 1024]  # lzma is slow, keep iterations short
+    while True:
+        lzma.decompress(lzma.compress(chunk, preset=1))
+        record('lzma', nbytes=len(chunk))
+
+def app_json(records):
+    \"\"\"JSON encode/decode of service records\"\"\"
+    while True:
+        encoded = json.dumps(records)
+        json.loads(encoded)
+        record('json', ops=len(records), nbytes=len(encoded))
+
+def app_regex(text):
+    \"\"\"Regex scanning for errors, client addresses and slow requests\"\"\"
+    patterns = [
+        re.compile(rb'"level": "ERROR".*?"path": "([^"]+)"'),
+        re.compile(rb'\\b10\\.\\d{1,3}\\.\\d{1,3}\\.\\d{1,3}\\b'),
+        re.compile(rb'"latency_ms": (\\d{3,}\\.\\d+)'),
+    ]
+    while True:
+        matches = 0
+        for pattern in patterns:
+            matches += sum(1 for _ in pattern.finditer(text))
+        record('regex', ops=matches, nbytes=len(text) * len(patterns))
+
+def app_sort(records):
+    \"\"\"Large multi-key sorts of service records\"\"\"
+    latencies = [r['latency_ms'] for r in records]
+    while True:
+        sorted(records, key=lambda r: (r['level'], r['path'], -r['latency_ms']))
+        sorted(latencies * 8)
+        record('sort', ops=len(records) + len(latencies) * 8)
+
+APP_KERNELS = {
+    'zlib': (app_zlib, 'text'),
+    'lzma': (app_lzma, 'text'),
+    'json': (app_json, 'records'),
+    'regex': (app_regex, 'text'),
+    'sort': (app_sort, 'records'),
+}
+
 def stress_cpu_core():
     \"\"\"Main stress function combining all intensive operations\"\"\"
+    # Pinned by scaling sweeps over CPU lists
+    cpu = WORKER_CONFIG.get('cpu')
+    if cpu is not None:
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except (AttributeError, OSError):
+            pass  # No affinity control on this platform
+    
     # Start multiple threads per core for maximum intensity
     threads = []
+    cpu_kernels = WORKER_CONFIG.get('cpu_kernels', ['math', 'crypto', 'loops', 'memory'])
     
-    # Math thread
-    t1 = threading.Thread(target=cpu_intensive_math, daemon=True)
-    threads.append(t1)
-    
-    # Crypto thread  
-    t2 = threading.Thread(target=cpu_intensive_crypto, daemon=True)
-    threads.append(t2)
-    
-    # Loops thread
-    t3 = threading.Thread(target=cpu_intensive_loops, daemon=True)
-    threads.append(t3)
+    for _ in range(WORKER_CONFIG.get('kernel_threads', 1)):
+        # Math thread
+        if 'math' in cpu_kernels:
+            t1 = threading.Thread(target=cpu_intensive_math, daemon=True)
+            threads.append(t1)
+        
+        # Crypto threads, one per hash algorithm
+        if 'crypto' in cpu_kernels:
+            for algorithm in WORKER_CONFIG.get('hash_algorithms', ['sha256', 'sha512', 'blake2b', 'sha3_256']):
+                t2 = threading.Thread(target=cpu_intensive_crypto, args=(algorithm,), daemon=True)
+                threads.append(t2)
+        
+        # Loops thread
+        if 'loops' in cpu_kernels:
+            t3 = threading.Thread(target=cpu_intensive_loops, daemon=True)
+            threads.append(t3)
+        
+        # Memory thread
+        if 'memory' in cpu_kernels:
+            t4 = threading.Thread(target=memory_intensive, daemon=True)
+            threads.append(t4)
     
-    # Memory thread
-    t4 = threading.Thread(target=memory_intensive, daemon=True)
-    threads.append(t4)
+    # Application kernels over a shared preallocated corpus
+    app_kernels = WORKER_CONFIG.get('app_kernels', [])
+    if app_kernels:
+        records, text = build_corpus()
+        corpus = {'records': records, 'text': text}
+        for name in app_kernels:
+            kernel, data = APP_KERNELS[name]
+            threads.append(threading.Thread(target=kernel, args=(corpus[data],), daemon=True))
     
     # Start all threads
     for t in threads:
         t.start()
+    start_stats_reporter()
     
-    # Keep main thread busy too
+    # Keep main thread busy too (FP work, so only in mixes that include math)
+    while 'math' not in cpu_kernels:
+        time.sleep(1)
     while True:
         x = random.random() * 1000
         for _ in range(100000):
@@ -279,27 +1056,53 @@ if __name__ == '__main__':
             f.write(intense_cpu_stress_code)
         
         # Start multiple CPU stress processes per core for maximum intensity
-        processes_per_core = 2  # Run 2 processes per core for extra intensity
-        total_processes = self.config['num_cores'] * processes_per_core
+        processes_per_core = self.config['processes_per_core']
+        cpu_list = self.config['cpu_list']
+        total_processes = (len(cpu_list) if cpu_list else self.config['num_cores']) * processes_per_core
         
         logger.info(f"Starting {total_processes} intense CPU stress processes ({processes_per_core} per core)")
         
         for i in range(total_processes):
-            proc = subprocess.Popen(['python3', 'intense_stress_cpu.py'],
-                                stdout=subprocess.DEVNULL,
-                                stderr=subprocess.DEVNULL)
+            proc = self._spawn_worker('intense_stress_cpu.py',
+                                      env=self.worker_env(
+                                          hash_algorithms=self.config['hash_algorithms'],
+                                          hash_buffer_size=self.config['hash_buffer_size'],
+                                          app_kernels=self.config['app_kernels'],
+                                          cpu_kernels=self.config['cpu_kernels'],
+                                          kernel_threads=self.config['kernel_threads'],
+                                          cpu=cpu_list[i % len(cpu_list)] if cpu_list else None,
+                                          numa_node=None if cpu_list else self.next_numa_node()))
             self.cpu_processes.append(proc)
             logger.debug(f"Started intense CPU stress process {proc.pid}")
         
         # GPU stress using Metal Performance Shaders (macOS GPU acceleration)
-        self._start_gpu_stress()
+        # and I/O stress for additional battery drain, unless only measuring CPU
+        if not self.config['cpu_only']:
+            self._start_gpu_stress()
+            self._start_io_stress()
+        
+        # Memory capacity pressure when a target RSS is configured
+        if self.config['mem_target']:
+            self._start_memory_stress()
         
-        # I/O stress for additional battery drain
-        self._start_io_stress()
+        # Loopback network traffic when connections are configured
+        if self.config['net_connections']:
+            self._start_network_stress()
+        
+        # Cross-core cache line sharing when coherence workers are configured
+        if self.config['cache_workers']:
+            self._start_cache_stress()
+
+        # Wakeup latency probe, measured only while the stress is running
+        if self.config['latency_probe']:
+            if self.latency_probe is None:
+                from .latency import LatencyProbe
+                self.latency_probe = LatencyProbe(self.config['latency_interval'])
+            self.latency_probe.start()
 
     def _start_gpu_stress(self):
         """Start GPU stress using Metal compute shaders and other GPU-intensive tasks."""
-        gpu_stress_code = """
+        gpu_stress_code = WORKER_STATS_CODE + """
 import subprocess
 import threading
 import time
@@ -364,14 +1167,19 @@ def gpu_memory_stress():
         # Try to allocate and use GPU memory
         import numpy as np
         arrays = []
+        rng = np.random.default_rng()
+        # One buffer, first-touched by this (NUMA-bound) worker and optionally on huge pages
+        buffer = map_region(1000 * 1000 * 4)
+        arr = np.frombuffer(buffer, dtype=np.float32).reshape(1000, 1000)
         while True:
             try:
-                # Create large arrays for GPU-like operations
-                arr = np.random.random((1000, 1000)).astype(np.float32)
+                # Fill the buffer in place for GPU-like operations
+                rng.random(out=arr, dtype=np.float32)
                 # Matrix operations (can use GPU acceleration)
                 result = np.dot(arr, arr.T)
                 result = np.fft.fft2(result)
                 arrays.append(result[:100, :100])  # Keep some data
+                record('gpu_memory', nbytes=arr.nbytes + result.nbytes)
                 
                 if len(arrays) > 20:
                     arrays = arrays[-10:]
@@ -405,9 +1213,14 @@ if __name__ == '__main__':
     
     for t in threads:
         t.start()
+    start_stats_reporter()
     
     # Keep main thread busy
     metal_compute_stress()
+    
+    # Keep main thread alive so the stress threads keep running
+    while True:
+        time.sleep(1)
 """
         
         try:
@@ -415,25 +1228,25 @@ if __name__ == '__main__':
                 f.write(gpu_stress_code)
             
             # Start GPU stress process
-            self.gpu_proc = subprocess.Popen(['python3', 'intense_stress_gpu.py'],
-                                           stdout=subprocess.DEVNULL,
-                                           stderr=subprocess.DEVNULL)
+            self.gpu_proc = self._spawn_worker('intense_stress_gpu.py',
+                                               env=self.worker_env(mem_hugepages=self.config['mem_hugepages'],
+                                                                   numa_node=self.next_numa_node()))
             logger.info("Started intense GPU stress test")
         except Exception as e:
             logger.warning(f"Could not start GPU stress test: {e}")
 
     def _start_io_stress(self):
         """Start I/O stress for additional battery drain."""
-        io_stress_code = """
+        io_stress_code = WORKER_STATS_CODE + """
 import threading
 import time
 import random
 import os
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 def disk_write_stress():
     \"\"\"Intensive disk write operations\"\"\"
-    temp_dir = tempfile.mkdtemp()
+    temp_dir = scratch_path('disk_write')
     file_count = 0
     
     while True:
@@ -446,6 +1259,7 @@ def disk_write_stress():
                 f.write(data)
                 f.flush()
                 os.fsync(f.fileno())  # Force write to disk
+            record('disk_write', nbytes=len(data))
             
             file_count += 1
             
@@ -474,12 +1288,42 @@ def disk_read_stress():
                             chunk = f.read(1024 * 1024)  # 1MB chunks
                             if not chunk:
                                 break
+                            record('disk_read', nbytes=len(chunk))
                 except:
                     pass
         except:
             time.sleep(0.1)
 
+def write_file(path, payload):
+    with open(path, 'wb') as f:
+        f.write(payload)
 
+def list_dir(path):
+    with os.scandir(path) as entries:
+        return sum(1 for _ in entries)
+
+def metadata_stress(root):
+    \"\"\"Create/stat/rename/readdir/unlink storms over a directory of small files\"\"\"
+    os.makedirs(root, exist_ok=True)
+    payload = os.urandom(WORKER_CONFIG.get('metadata_file_size', 4096))
+    names = [os.path.join(root, f'file_{i}') for i in range(WORKER_CONFIG.get('metadata_files', 256))]
+    while True:
+        try:
+            for name in names:
+                timed('meta_create', write_file, name, payload, nbytes=len(payload))
+                timed('meta_stat', os.stat, name)
+                timed('meta_rename', os.rename, name, name + '.renamed')
+            timed('meta_readdir', list_dir, root)
+            for name in names:
+                timed('meta_unlink', os.unlink, name + '.renamed')
+        except OSError:
+            # Disk full or a half-finished cycle: start again from an empty directory
+            for entry in os.listdir(root):
+                try:
+                    os.unlink(os.path.join(root, entry))
+                except OSError:
+                    pass
+            time.sleep(0.1)
 
 if __name__ == '__main__':
     # Start I/O stress threads
@@ -496,6 +1340,15 @@ if __name__ == '__main__':
     for t in threads:
         t.start()
     
+    # Metadata storms, one directory tree per pool thread
+    metadata_threads = WORKER_CONFIG.get('metadata_threads', 0)
+    if metadata_threads:
+        metadata_root = scratch_path('metadata')
+        pool = ThreadPoolExecutor(max_workers=metadata_threads, thread_name_prefix='metadata')
+        for i in range(metadata_threads):
+            pool.submit(metadata_stress, os.path.join(metadata_root, f'tree_{i}'))
+    start_stats_reporter()
+    
     # Keep main thread alive
     while True:
         time.sleep(1)
@@ -506,41 +1359,503 @@ if __name__ == '__main__':
                 f.write(io_stress_code)
             
             # Start I/O stress process
-            io_proc = subprocess.Popen(['python3', 'intense_stress_io.py'],
-                                     stdout=subprocess.DEVNULL,
-                                     stderr=subprocess.DEVNULL)
+            io_proc = self._spawn_worker('intense_stress_io.py',
+                                        env=self.worker_env(io_idle=self.config['io_idle'],
+                                                            metadata_threads=self.config['metadata_threads'],
+                                                            metadata_files=self.config['metadata_files'],
+                                                            metadata_file_size=self.config['metadata_file_size']))
             self.cpu_processes.append(io_proc)  # Add to processes list for cleanup
             logger.info("Started intense I/O stress test")
         except Exception as e:
             logger.warning(f"Could not start I/O stress test: {e}")
 
+    def _start_memory_stress(self):
+        """Start memory capacity stress holding a target RSS in anonymous mmap regions."""
+        memory_stress_code = WORKER_STATS_CODE + """
+import mmap
+import psutil
+
+PAGE_SIZE = mmap.PAGESIZE
+REGION_SIZE = 64 * 1024 * 1024
+
+def swap_used():
+    try:
+        return psutil.swap_memory().used
+    except Exception:
+        return 0
+
+def memory_capacity_stress():
+    \"\"\"Reserve the target capacity and keep touching every page\"\"\"
+    target = WORKER_CONFIG.get('mem_target', 0) // PAGE_SIZE * PAGE_SIZE
+    touch_rate = WORKER_CONFIG.get('mem_touch_rate', 0) * 1024 * 1024  # bytes/s, 0 = unlimited
+    swap_backoff = WORKER_CONFIG.get('mem_swap_backoff', 256 * 1024 * 1024)
+    regions = []
+    reserved = 0
+    swap_baseline = swap_used()
+    value = 0
+    
+    while True:
+        # Grow one region per sweep until the target is reserved
+        if reserved < target:
+            size = min(REGION_SIZE, target - reserved)
+            try:
+                regions.append(map_region(size))
+                reserved += size
+            except (OSError, MemoryError):
+                target = reserved
+        
+        # Touch every page, rate limited per region
+        value = (value + 1) % 256
+        for region in regions:
+            start = time.time()
+            pages = (len(region) + PAGE_SIZE - 1) // PAGE_SIZE
+            region[::PAGE_SIZE] = bytes([value]) * pages
+            record('mem_touch', ops=pages, nbytes=len(region))
+            if touch_rate:
+                time.sleep(max(0, len(region) / touch_rate - (time.time() - start)))
+        if not regions:
+            time.sleep(1)
+        
+        # Back off before the system starts swapping us out or stalling on memory
+        shed = memory_pressure.is_set()
+        memory_pressure.clear()
+        if (shed or swap_used() - swap_baseline > swap_backoff) and regions:
+            region = regions.pop()
+            reserved -= len(region)
+            target = reserved
+            record('mem_backoff', nbytes=len(region))
+            region.close()
+            time.sleep(1)
+            swap_baseline = swap_used()
+
+if __name__ == '__main__':
+    start_stats_reporter()
+    memory_capacity_stress()
+"""
+        
+        try:
+            mem_target = parse_memory_target(self.config['mem_target'])
+            with open('intense_stress_mem.py', 'w') as f:
+                f.write(memory_stress_code)
+            
+            # Start memory stress process
+            self.mem_proc = self._spawn_worker('intense_stress_mem.py',
+                                               env=self.worker_env(
+                                                   mem_target=mem_target,
+                                                   mem_touch_rate=self.config['mem_touch_rate'],
+                                                   mem_hugepages=self.config['mem_hugepages'],
+                                                   mem_swap_backoff=self.config['mem_swap_backoff'],
+                                                   numa_node=self.next_numa_node()))
+            self.cpu_processes.append(self.mem_proc)  # Add to processes list for cleanup
+            logger.info(f"Started memory capacity stress test targeting {mem_target / (1024**3):.1f} GB")
+        except Exception as e:
+            logger.warning(f"Could not start memory stress test: {e}")
+
+    def _start_network_stress(self):
+        """Start loopback (or chosen interface) TCP and UDP network stress."""
+        network_stress_code = WORKER_STATS_CODE + """
+import asyncio
+import socket
+
+HOST = WORKER_CONFIG.get('net_host', '127.0.0.1')
+CONNECTIONS = WORKER_CONFIG.get('net_connections', 8)
+MESSAGE_SIZE = WORKER_CONFIG.get('net_message_size', 64)
+BULK_SIZE = WORKER_CONFIG.get('net_bulk_size', 16 * 1024 * 1024)
+RECORD_BYTES = 8 * 1024 * 1024  # Batch bulk byte counts to keep record() off the hot path
+
+def listen(kind):
+    family = socket.AF_INET6 if ':' in HOST else socket.AF_INET
+    sock = socket.socket(family, kind)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((HOST, 0))
+    if kind == socket.SOCK_STREAM:
+        sock.listen(CONNECTIONS * 2)
+    sock.setblocking(False)
+    return sock
+
+async def connect(address):
+    sock = socket.socket(socket.AF_INET6 if ':' in HOST else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, address)
+    return sock
+
+async def accept_loop(server, handler):
+    loop = asyncio.get_running_loop()
+    while True:
+        conn, _ = await loop.sock_accept(server)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn.setblocking(False)
+        loop.create_task(handler(conn))
+
+async def bulk_sender(conn, payload):
+    \"\"\"Stream the payload file with zero-copy sendfile until the client goes away\"\"\"
+    loop = asyncio.get_running_loop()
+    with conn:
+        try:
+            while True:
+                await loop.sock_sendfile(conn, payload, 0)
+        except (ConnectionError, OSError):
+            pass
+
+async def bulk_receiver(address):
+    loop = asyncio.get_running_loop()
+    sock = await connect(address)
+    buffer = bytearray(1024 * 1024)  # Reused for every read
+    received = 0
+    with sock:
+        while True:
+            n = await loop.sock_recv_into(sock, buffer)
+            if not n:
+                break
+            received += n
+            if received >= RECORD_BYTES:
+                record('net_bulk', nbytes=received)
+                received = 0
+
+async def recv_exactly(loop, sock, view):
+    got = 0
+    while got < len(view):
+        n = await loop.sock_recv_into(sock, view[got:])
+        if not n:
+            raise ConnectionError('connection closed')
+        got += n
+
+async def echo_handler(conn):
+    \"\"\"Answer fixed-size request messages from a reused buffer\"\"\"
+    loop = asyncio.get_running_loop()
+    view = memoryview(bytearray(MESSAGE_SIZE))
+    with conn:
+        try:
+            while True:
+                await recv_exactly(loop, conn, view)
+                await loop.sock_sendall(conn, view)
+        except (ConnectionError, OSError):
+            pass
+
+async def rpc_client(address):
+    \"\"\"Small-message request/response traffic, timing every round trip\"\"\"
+    loop = asyncio.get_running_loop()
+    sock = await connect(address)
+    request = os.urandom(MESSAGE_SIZE)
+    view = memoryview(bytearray(MESSAGE_SIZE))
+    with sock:
+        while True:
+            start = time.perf_counter()
+            await loop.sock_sendall(sock, request)
+            await recv_exactly(loop, sock, view)
+            record_latency('net_rpc', time.perf_counter() - start)
+            record('net_rpc', nbytes=2 * MESSAGE_SIZE)
+
+class UdpEcho(asyncio.DatagramProtocol):
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.transport.sendto(data, addr)
+
+class UdpClient(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.reply = None
+
+    def datagram_received(self, data, addr):
+        if self.reply and not self.reply.done():
+            self.reply.set_result(data)
+
+async def udp_client(address):
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(UdpClient, remote_addr=address)
+    message = os.urandom(MESSAGE_SIZE)
+    while True:
+        protocol.reply = loop.create_future()
+        start = time.perf_counter()
+        transport.sendto(message)
+        try:
+            await asyncio.wait_for(protocol.reply, 1.0)
+        except asyncio.TimeoutError:
+            record('net_udp_lost')
+            continue
+        record_latency('net_udp', time.perf_counter() - start)
+        record('net_udp', nbytes=2 * MESSAGE_SIZE)
+
+async def network_stress():
+    \"\"\"Run TCP bulk, TCP request/response and UDP echo servers and clients\"\"\"
+    loop = asyncio.get_running_loop()
+    
+    # sendfile needs a real file; the page cache keeps it hot
+    payload_path = os.path.join(scratch_path('net'), 'payload.bin')
+    with open(payload_path, 'wb') as f:
+        f.write(os.urandom(BULK_SIZE))
+    payload = open(payload_path, 'rb')
+    
+    bulk_server = listen(socket.SOCK_STREAM)
+    echo_server = listen(socket.SOCK_STREAM)
+    udp_server = listen(socket.SOCK_DGRAM)
+    await loop.create_datagram_endpoint(UdpEcho, sock=udp_server)
+    
+    tasks = [
+        loop.create_task(accept_loop(bulk_server, lambda conn: bulk_sender(conn, payload))),
+        loop.create_task(accept_loop(echo_server, echo_handler)),
+    ]
+    for _ in range(CONNECTIONS):
+        tasks.append(loop.create_task(bulk_receiver(bulk_server.getsockname())))
+        tasks.append(loop.create_task(rpc_client(echo_server.getsockname())))
+        tasks.append(loop.create_task(udp_client(udp_server.getsockname())))
+    await asyncio.gather(*tasks)
+
+if __name__ == '__main__':
+    start_stats_reporter()
+    asyncio.run(network_stress())
+"""
+        
+        try:
+            with open('intense_stress_net.py', 'w') as f:
+                f.write(network_stress_code)
+            
+            # Start network stress process
+            net_proc = self._spawn_worker('intense_stress_net.py',
+                                          env=self.worker_env(
+                                              net_host=self.config['net_host'],
+                                              net_connections=self.config['net_connections'],
+                                              net_message_size=self.config['net_message_size']))
+            self.cpu_processes.append(net_proc)  # Add to processes list for cleanup
+            logger.info(f"Started network stress test with {self.config['net_connections']} connections "
+                        f"per traffic type on {self.config['net_host']}")
+        except Exception as e:
+            logger.warning(f"Could not start network stress test: {e}")
+
+    def _start_cache_stress(self):
+        """Start pinned workers hammering shared cache lines in a shared memory segment."""
+        cache_stress_code = WORKER_STATS_CODE + """
+from multiprocessing import shared_memory
+
+LINE_WORDS = 8  # 64-byte cache line of 8-byte words
+PADDED_WORDS = 16  # 128 bytes apart, clear of the adjacent-line prefetcher
+
+def attach(name):
+    \"\"\"Attach to the supervisor's segment without letting our resource tracker unlink it\"\"\"
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+def pin(slot):
+    try:
+        cores = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cores[slot % len(cores)]})
+    except (AttributeError, OSError):
+        pass  # No affinity control on this platform
+
+def coherence_stress():
+    \"\"\"Write shared, falsely shared or padded cache lines, switching mode in lockstep\"\"\"
+    slot = WORKER_CONFIG['cache_slot']
+    modes = WORKER_CONFIG.get('cache_modes', ['true', 'false', 'padded'])
+    phase = WORKER_CONFIG.get('cache_phase', 5)
+    pin(slot)
+    shm = attach(WORKER_CONFIG['cache_segment'])
+    words = shm.buf.cast('Q')
+    offsets = {
+        'true': 0,  # Every worker increments the same word
+        'false': LINE_WORDS + slot % LINE_WORDS,  # Own word, shared line
+        'padded': 2 * LINE_WORDS + slot * PADDED_WORDS,  # Own line
+    }
+    
+    while True:
+        # Wall-clock phases keep every worker in the same mode at the same time
+        phase_number = int(time.time() / phase)
+        mode = modes[phase_number % len(modes)]
+        index = offsets[mode]
+        phase_end = (phase_number + 1) * phase
+        while time.time() < phase_end:
+            for _ in range(10000):
+                words[index] += 1
+            record(f'cache_{mode}', ops=10000)
+
+if __name__ == '__main__':
+    start_stats_reporter()
+    coherence_stress()
+"""
+        
+        try:
+            from multiprocessing import shared_memory
+            workers = self.config['cache_workers']
+            # Line 0: true sharing, line 1: false sharing, then one 128-byte block per worker
+            self.cache_segment = shared_memory.SharedMemory(create=True, size=128 + workers * 128)
+            with open('intense_stress_cache.py', 'w') as f:
+                f.write(cache_stress_code)
+            
+            for slot in range(workers):
+                proc = self._spawn_worker('intense_stress_cache.py',
+                                          env=self.worker_env(
+                                              cache_slot=slot,
+                                              cache_segment=self.cache_segment.name,
+                                              cache_modes=self.config['cache_modes'],
+                                              cache_phase=self.config['cache_phase']))
+                self.cpu_processes.append(proc)  # Add to processes list for cleanup
+            logger.info(f"Started {workers} cache coherence stress workers ({', '.join(self.config['cache_modes'])})")
+        except Exception as e:
+            logger.warning(f"Could not start cache coherence stress test: {e}")
+    
+    def _spawn_worker(self, script, env=None):
+        """Start a stress worker script in its own process group."""
+        # A new session makes the worker a process group leader, so children
+        # it starts (ffmpeg, yes) are signalled and reaped along with it.
+        # Workers run on this interpreter, so they see the same packages.
+        proc = subprocess.Popen([sys.executable, script],
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL,
+                                env=env,
+                                start_new_session=True)
+        self.worker_specs[proc.pid] = {'script': script, 'env': env, 'started': time.time(), 'restarts': 0}
+        logger.debug(f"Started {script} worker {proc.pid}")
+        if self.tracer:
+            self.tracer.instant('spawn', track=f'{script} {proc.pid}', cat='worker')
+        return proc
+
+    def trace_worker_exit(self, proc, spec):
+        """Record a reaped worker's lifetime on its trace track."""
+        if self.tracer and spec:
+            self.tracer.complete(spec['script'], spec['started'], track=f"{spec['script']} {proc.pid}",
+                                 cat='worker', args={'exit_code': proc.returncode, 'restarts': spec['restarts']})
+
+    def _stop_workers(self, workers, timeout):
+        """Terminate worker process groups, killing any still alive at the deadline."""
+        for proc in workers:
+            try:
+                os.killpg(proc.pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+        
+        deadline = time.monotonic() + timeout
+        for proc in workers:
+            try:
+                proc.wait(timeout=max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Worker {proc.pid} did not exit within {timeout}s, killing it")
+            # Always SIGKILL the group to sweep up orphaned grandchildren
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            try:
+                proc.wait(timeout=1)
+                logger.debug(f"Reaped stress process {proc.pid}")
+            except subprocess.TimeoutExpired:
+                logger.error(f"Failed to reap process {proc.pid}")
+
+    def all_workers(self):
+        """Get every running stress worker process."""
+        return self.cpu_processes + ([self.gpu_proc] if self.gpu_proc else [])
+
+    def find_dead_workers(self):
+        """Get workers that have exited (poll() also reaps them)."""
+        return [proc for proc in self.all_workers() if proc.poll() is not None]
+
+    def find_hung_workers(self, timeout):
+        """Get workers whose stats heartbeat is older than timeout seconds."""
+        now = time.time()
+        hung = []
+        for proc in self.all_workers():
+            spec = self.worker_specs.get(proc.pid)
+            if spec is None or proc.poll() is not None or not self.stats_dir:
+                continue
+            if any(proc.pid in pids for pids in self.backpressure.values()):
+                continue  # Stopped by backpressure, so it can't heartbeat
+            try:
+                last_beat = os.path.getmtime(os.path.join(self.stats_dir, f'{proc.pid}.json'))
+            except OSError:
+                last_beat = spec['started']  # No heartbeat yet, allow start-up time
+            if now - last_beat > timeout:
+                hung.append(proc)
+        return hung
+
+    def restart_worker(self, proc):
+        """Replace a dead or hung worker with a fresh one from the same script."""
+        spec = self.worker_specs.pop(proc.pid, None)
+        if proc.poll() is None:
+            self._stop_workers([proc], self.config['shutdown_timeout'])
+        else:
+            # Sweep anything the dead worker left behind in its group
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        self.trace_worker_exit(proc, spec)
+        
+        if spec is None or spec['restarts'] >= self.config['max_worker_restarts']:
+            logger.error(f"Worker {proc.pid} exceeded {self.config['max_worker_restarts']} restarts, not restarting")
+            new_proc = None
+        else:
+            new_proc = self._spawn_worker(spec['script'], spec['env'])
+            self.worker_specs[new_proc.pid]['restarts'] = spec['restarts'] + 1
+            self.worker_restarts += 1
+            logger.warning(f"Restarted {spec['script']} worker {proc.pid} as {new_proc.pid} "
+                           f"(exit code {proc.returncode})")
+        
+        if proc is self.gpu_proc:
+            self.gpu_proc = new_proc
+        else:
+            index = self.cpu_processes.index(proc)
+            if new_proc:
+                self.cpu_processes[index] = new_proc
+            else:
+                del self.cpu_processes[index]
+            if proc is self.mem_proc:
+                self.mem_proc = new_proc
+        return new_proc
+
     def stop_stress_tasks(self):
         """Stop all stress tasks and clean up temporary files."""
+        import shutil
         logger.info("Stopping all intense stress tasks")
         
-        # Kill all CPU and I/O stress processes
-        for proc in self.cpu_processes:
-            try:
-                proc.kill()
-                logger.debug(f"Killed stress process {proc.pid}")
-            except Exception as e:
-                logger.error(f"Failed to kill process {proc.pid}: {e}")
-        self.cpu_processes.clear()
+        # Stopped workers would only act on SIGTERM once continued
+        for resource in list(self.backpressure):
+            self.release_backpressure(resource)
         
-        # Kill GPU stress process if it exists
+        # Terminate and reap every worker process group within the shutdown timeout
+        workers = self.all_workers()
+        self._stop_workers(workers, self.config['shutdown_timeout'])
+        for proc in workers:
+            self.trace_worker_exit(proc, self.worker_specs.pop(proc.pid, None))
+        self.cpu_processes.clear()
+        self.mem_proc = None
         if self.gpu_proc:
-            try:
-                self.gpu_proc.kill()
-                logger.info("Killed GPU stress process")
-            except Exception as e:
-                logger.error(f"Failed to kill GPU process: {e}")
-            self.gpu_proc = None
+            logger.info("Killed GPU stress process")
+        self.gpu_proc = None
+        if self.latency_probe:
+            self.latency_probe.stop()
+        
+        # Collect the final worker counters and remove the stats directory
+        if self.stats_dir:
+            self.get_workload_stats()
+            shutil.rmtree(self.stats_dir, ignore_errors=True)
+            self.stats_dir = None
+            self.worker_counters.clear()
+            self.worker_latency.clear()
+        
+        # The cache coherence segment outlives its workers, so release it here
+        if self.cache_segment:
+            self.cache_segment.close()
+            self.cache_segment.unlink()
+            self.cache_segment = None
+        
+        # Workers may be killed mid-write, so the supervisor owns their files
+        if self.scratch_dir:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+            self.scratch_dir = None
         
         # Clean up temporary stress files
         temp_files = [
             'intense_stress_cpu.py',
             'intense_stress_gpu.py', 
             'intense_stress_io.py',
+            'intense_stress_mem.py',
+            'intense_stress_net.py',
+            'intense_stress_cache.py',
             'stress_cpu.py'  # Legacy file
         ]
         
@@ -552,16 +1867,89 @@ if __name__ == '__main__':
             except Exception as e:
                 logger.warning(f"Could not remove temporary file {temp_file}: {e}")
 
+    def apply_backpressure(self, stats):
+        """Throttle the workload kinds whose PSI stall percentage is over its limit."""
+        pressure = stats.get('pressure', {})
+        for resource, limit in self.config['psi_limits'].items():
+            stall = pressure.get(resource, {}).get(PSI_METRICS[resource])
+            if not limit or stall is None:
+                continue
+            if stall > limit:
+                if resource == 'memory':
+                    # Stopping a worker doesn't give memory back, so keep asking them to shed it
+                    self.signal_workers(PSI_WORKERS[resource], signal.SIGUSR1, min_age=SIGNAL_GRACE_PERIOD)
+                if resource in self.backpressure:
+                    continue
+                if resource == 'memory':
+                    logger.warning(f"memory pressure {stall:.1f}% over {limit}%, asking memory workers to shed memory")
+                    self.backpressure[resource] = []
+                else:
+                    logger.warning(f"{resource} pressure {stall:.1f}% over {limit}%, pausing {resource} workers")
+                    self.backpressure[resource] = self.signal_workers(PSI_WORKERS[resource], signal.SIGSTOP, group=True)
+                if self.tracer:
+                    self.tracer.instant(f'{resource} backpressure', cat='pressure',
+                                        args={'stall': stall, 'limit': limit})
+                self.backpressure_events[resource] = self.backpressure_events.get(resource, 0) + 1
+            elif resource in self.backpressure and stall < limit / 2:
+                logger.info(f"{resource} pressure down to {stall:.1f}%, resuming {resource} workers")
+                self.release_backpressure(resource)
+                if self.tracer:
+                    self.tracer.instant(f'{resource} released', cat='pressure', args={'stall': stall})
+        stats['backpressure'] = sorted(self.backpressure)
+
+    def release_backpressure(self, resource):
+        """Continue the workers paused for a resource."""
+        for pid in self.backpressure.pop(resource, []):
+            try:
+                os.killpg(pid, signal.SIGCONT)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    def signal_workers(self, scripts, sig, group=False, min_age=0):
+        """Send a signal to the running workers started from the given scripts at least min_age seconds ago."""
+        pids = []
+        now = time.time()
+        for proc in self.all_workers():
+            spec = self.worker_specs.get(proc.pid, {})
+            if spec.get('script') not in scripts or now - spec.get('started', 0) < min_age:
+                continue
+            try:
+                if group:
+                    os.killpg(proc.pid, sig)
+                else:
+                    os.kill(proc.pid, sig)
+                pids.append(proc.pid)
+            except (ProcessLookupError, PermissionError):
+                pass
+        return pids
+
+    def battery_stop_condition(self, stats):
+        """Get the reason to stop draining the battery, if any."""
+        battery = self.sensors.read('battery', 'supervisor')
+        if battery is None:
+            return 'battery unavailable'
+        if battery.power_plugged:
+            return f"charger plugged in at {battery.percent}%"
+        if battery.percent <= self.config['min_battery']:
+            return f"battery at {battery.percent}%"
+        return None
+
     def run(self):
         """Main stress test loop."""
+        # asyncio is only needed once the supervisor runs
+        import asyncio
+        from .supervisor import AsyncSupervisor
+        
         logger.info("Starting battery drain script. Unplug charger to begin stress tasks.")
         logger.info(f"Configuration: {self.config}")
+        if self.config['virtual_battery'] and self.virtual_battery is None:
+            self.use_virtual_battery()
         
         try:
             while True:
-                battery = psutil.sensors_battery()
+                battery = self.sensors.read('battery', 'supervisor')
                 if battery is None:
-                    logger.error("Battery status unavailable. Exiting.")
+                    logger.error("Battery status unavailable (set virtual_battery on machines without one). Exiting.")
                     break
                 
                 self.log_system_stats()
@@ -569,22 +1957,17 @@ if __name__ == '__main__':
                 # Run stress tasks when unplugged and battery > min_battery
                 if not battery.power_plugged and battery.percent > self.config['min_battery']:
                     logger.info(f"Battery at {battery.percent}%. Starting stress tasks...")
-                    self.start_stress_tasks()
                     
-                    # Keep running until plugged in or battery drops below minimum
-                    while True:
-                        battery = psutil.sensors_battery()
-                        self.log_system_stats()
-                        
-                        if (battery.power_plugged or 
-                            battery.percent <= self.config['min_battery'] or 
-                            (self.config['monitor_temp'] and not self.check_temperature())):
-                            
-                            logger.info(f"Stopping condition met. Battery: {battery.percent}%")
-                            self.stop_stress_tasks()
-                            break
-                            
-                        time.sleep(self.config['check_interval'])
+                    # Keep running until plugged in or battery drops below minimum;
+                    # the supervisor pauses for temperature and restarts dead workers
+                    supervisor = AsyncSupervisor(self,
+                                                 interval=self.config['check_interval'],
+                                                 render=lambda stats, state: self.log_system_stats(stats),
+                                                 stop_condition=self.battery_stop_condition)
+                    reason = asyncio.run(supervisor.run())
+                    logger.info(f"Stopping condition met: {reason}")
+                    if reason in ('interrupted', 'error'):
+                        break
                 else:
                     if battery.power_plugged:
                         logger.info(f"Charger plugged in. Battery at {battery.percent}%")
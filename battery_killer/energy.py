@@ -0,0 +1,70 @@
+import glob
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POWERCAP_ROOT = '/sys/class/powercap'
+
+class RaplReader:
+    """Read average power per RAPL domain from the Linux powercap energy counters."""
+    def __init__(self, root=DEFAULT_POWERCAP_ROOT):
+        self.root = root
+        self.zones = self.discover()
+        self.last_energy = {}
+        self.last_time = None
+        self.total_joules = {}
+
+    def discover(self):
+        """Find readable RAPL zones as (path, domain, max_energy_range_uj)."""
+        zones = []
+        for path in sorted(glob.glob(os.path.join(self.root, 'intel-rapl:*'))):
+            try:
+                with open(os.path.join(path, 'name')) as f:
+                    name = f.read().strip()
+                with open(os.path.join(path, 'max_energy_range_uj')) as f:
+                    max_range = int(f.read().strip())
+                with open(os.path.join(path, 'energy_uj')) as f:
+                    int(f.read().strip())
+            except (OSError, ValueError) as e:
+                logger.debug(f"Skipping RAPL zone {path}: {e}")
+                continue
+            # package-0, package-1, ... are all the package domain
+            domain = 'package' if name.startswith('package') else name
+            zones.append((path, domain, max_range))
+        return zones
+
+    @property
+    def available(self):
+        return bool(self.zones)
+
+    def read(self):
+        """Get average watts per domain since the previous read (empty on the first read)."""
+        now = time.monotonic()
+        energy = {}
+        for path, domain, max_range in self.zones:
+            try:
+                with open(os.path.join(path, 'energy_uj')) as f:
+                    energy[path] = (domain, max_range, int(f.read().strip()))
+            except (OSError, ValueError) as e:
+                logger.debug(f"Could not read {path}/energy_uj: {e}")
+
+        power = {}
+        if self.last_time is not None and now > self.last_time:
+            elapsed = now - self.last_time
+            joules = {}
+            for path, (domain, max_range, value) in energy.items():
+                if path not in self.last_energy:
+                    continue
+                delta = value - self.last_energy[path]
+                if delta < 0:
+                    delta += max_range  # Counter wrapped around
+                joules[domain] = joules.get(domain, 0.0) + delta / 1e6
+            for domain, value in joules.items():
+                self.total_joules[domain] = self.total_joules.get(domain, 0.0) + value
+                power[domain] = value / elapsed
+
+        self.last_energy = {path: value for path, (_, _, value) in energy.items()}
+        self.last_time = now
+        return power
@@ -0,0 +1,265 @@
+import asyncio
+import json
+import math
+import signal
+import struct
+import time
+import logging
+from .supervisor import AsyncSupervisor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 7878
+
+# Frame: message type, payload length, payload
+FRAME_HEADER = struct.Struct('!BI')
+MSG_CONFIG = 1     # JSON: {'config': {...}, 'schedule': [{'duration': s, 'cores': n}, ...]}
+MSG_START = 2      # START_TIME: shared wall-clock start timestamp
+MSG_STARTED = 3    # START_TIME: when the agent actually started
+MSG_TELEMETRY = 4  # TELEMETRY snapshot
+MSG_STOP = 5       # Empty
+MSG_DONE = 6       # JSON: the agent's supervisor summary
+
+START_TIME = struct.Struct('!d')
+# time, avg CPU %, temp °C, power W, battery %, MB/s, ops/s, worker count, paused flag
+TELEMETRY = struct.Struct('!dffffffHB')
+
+def encode_frame(msg_type, payload=b''):
+    return FRAME_HEADER.pack(msg_type, len(payload)) + payload
+
+async def read_frame(reader):
+    """Read one frame, raising asyncio.IncompleteReadError when the peer disconnects."""
+    msg_type, length = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    payload = await reader.readexactly(length) if length else b''
+    return msg_type, payload
+
+def encode_telemetry(stats, workers, paused):
+    """Pack a stats dict into a compact telemetry frame (NaN marks missing sensors)."""
+    battery = stats.get('battery')
+    workloads = stats.get('workloads', {})
+    return encode_frame(MSG_TELEMETRY, TELEMETRY.pack(
+        time.time(),
+        sum(stats['cpu_percent']) / len(stats['cpu_percent']),
+        stats.get('cpu_temp', math.nan),
+        stats.get('cpu_power', math.nan),
+        battery.percent if battery else math.nan,
+        sum(w['mb_per_sec'] for w in workloads.values()),
+        sum(w['ops_per_sec'] for w in workloads.values()),
+        workers,
+        paused,
+    ))
+
+def decode_telemetry(payload):
+    fields = TELEMETRY.unpack(payload)
+    keys = ('time', 'cpu_percent', 'cpu_temp', 'power', 'battery_percent', 'mb_per_sec', 'ops_per_sec',
+            'workers', 'paused')
+    return dict(zip(keys, fields))
+
+def parse_schedule(text):
+    """Parse a load schedule such as '60:2,300:8,60:0' into steps of (seconds, cores)."""
+    steps = []
+    for step in filter(None, (s.strip() for s in text.split(','))):
+        duration, cores = step.split(':')
+        steps.append({'duration': float(duration), 'cores': int(cores)})
+        if steps[-1]['duration'] < 0 or steps[-1]['cores'] < 0:
+            raise ValueError(f"negative schedule step: {step}")
+    return steps
+
+class FleetAgent:
+    """Serve a SystemStresser to a fleet controller over TCP."""
+    def __init__(self, stresser, host='0.0.0.0', port=DEFAULT_PORT, interval=2.0):
+        self.stresser = stresser
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.schedule = []
+        self.supervisor = None
+        self.run_task = None
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle_controller, self.host, self.port)
+        logger.info(f"Fleet agent listening on {self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    async def handle_controller(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        logger.info(f"Controller connected from {peer}")
+        try:
+            while True:
+                msg_type, payload = await read_frame(reader)
+                if msg_type == MSG_CONFIG:
+                    message = json.loads(payload)
+                    self.stresser.config.update(message['config'])
+                    self.schedule = message['schedule']
+                    logger.info(f"Received config {message['config']} and {len(self.schedule)} schedule steps")
+                elif msg_type == MSG_START and self.run_task is None:
+                    (start_at,) = START_TIME.unpack(payload)
+                    self.run_task = asyncio.create_task(self.run_schedule(start_at, writer))
+                elif msg_type == MSG_STOP:
+                    self.stop()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.info(f"Controller {peer} disconnected")
+        finally:
+            self.stop()
+            if self.run_task:
+                await asyncio.gather(self.run_task, return_exceptions=True)
+                self.run_task = None
+            writer.close()
+
+    def stop(self):
+        if self.supervisor:
+            self.supervisor.stop('controller')
+        if self.run_task and not self.supervisor:
+            self.run_task.cancel()
+
+    async def run_schedule(self, start_at, writer):
+        """Wait for the shared start time, then step through the load schedule."""
+        await asyncio.sleep(max(0, start_at - time.time()))
+        writer.write(encode_frame(MSG_STARTED, START_TIME.pack(time.time())))
+
+        def send_telemetry(stats, state):
+            if not writer.is_closing():
+                writer.write(encode_telemetry(stats, len(self.stresser.all_workers()), state == 'paused'))
+
+        summary = {'worker_restarts': 0, 'thermal_pauses': 0, 'paused_time': 0.0}
+        for step in self.schedule or [{'duration': 0}]:
+            cores = step.get('cores')  # None keeps the agent's configured core count
+            if cores == 0:
+                await asyncio.sleep(step['duration'])  # Idle hold
+                continue
+            if cores:
+                self.stresser.config['num_cores'] = cores
+            self.supervisor = AsyncSupervisor(self.stresser, interval=self.interval,
+                                              duration=step['duration'], render=send_telemetry)
+            reason = await self.supervisor.run()
+            step_summary = self.supervisor.get_summary()
+            self.supervisor = None
+            for key in summary:
+                summary[key] += step_summary[key]
+            if reason != 'duration':
+                break
+
+        if not writer.is_closing():
+            writer.write(encode_frame(MSG_DONE, json.dumps(summary).encode()))
+            await writer.drain()
+
+class FleetController:
+    """Drive a fleet of agents through the same config and load schedule."""
+    def __init__(self, agents, config=None, schedule=None, start_delay=3.0, render=None):
+        self.agents = agents  # List of (host, port)
+        self.config = config or {}
+        self.schedule = schedule or []
+        self.start_delay = start_delay  # Time for the START message to reach every agent
+        self.render = render  # Called with the fleet snapshot on every telemetry frame
+
+        self.start_at = None
+        self.start_times = {}
+        self.latest = {}
+        self.totals = {}
+        self.summaries = {}
+        self.writers = []
+
+    async def run(self):
+        connections = await asyncio.gather(*(asyncio.open_connection(host, port) for host, port in self.agents))
+        self.writers = [writer for _, writer in connections]
+
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGINT, self.stop)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass
+
+        message = json.dumps({'config': self.config, 'schedule': self.schedule}).encode()
+        for writer in self.writers:
+            writer.write(encode_frame(MSG_CONFIG, message))
+
+        # Agents start on a shared timestamp rather than on message arrival
+        self.start_at = time.time() + self.start_delay
+        for writer in self.writers:
+            writer.write(encode_frame(MSG_START, START_TIME.pack(self.start_at)))
+        await asyncio.gather(*(writer.drain() for writer in self.writers))
+        logger.info(f"Starting {len(self.agents)} agents at {self.start_at:.3f}")
+
+        try:
+            await asyncio.gather(*(self.collect(self.agent_name(i), reader)
+                                   for i, (reader, _) in enumerate(connections)))
+        finally:
+            for writer in self.writers:
+                writer.close()
+        return self.get_summary()
+
+    def agent_name(self, index):
+        host, port = self.agents[index]
+        return f"{host}:{port}"
+
+    def stop(self):
+        """Tell every agent to stop; agents answer with their summaries."""
+        for writer in self.writers:
+            if not writer.is_closing():
+                writer.write(encode_frame(MSG_STOP))
+
+    async def collect(self, agent, reader):
+        """Read one agent's stream until it reports done or disconnects."""
+        try:
+            while True:
+                msg_type, payload = await read_frame(reader)
+                if msg_type == MSG_STARTED:
+                    (self.start_times[agent],) = START_TIME.unpack(payload)
+                elif msg_type == MSG_TELEMETRY:
+                    snapshot = decode_telemetry(payload)
+                    self.latest[agent] = snapshot
+                    total = self.totals.setdefault(agent, {'samples': 0, 'mb_per_sec': 0.0,
+                                                           'ops_per_sec': 0.0, 'power': 0.0, 'power_samples': 0})
+                    total['samples'] += 1
+                    total['mb_per_sec'] += snapshot['mb_per_sec']
+                    total['ops_per_sec'] += snapshot['ops_per_sec']
+                    if not math.isnan(snapshot['power']):
+                        total['power'] += snapshot['power']
+                        total['power_samples'] += 1
+                    if self.render:
+                        self.render(self.fleet_snapshot())
+                elif msg_type == MSG_DONE:
+                    self.summaries[agent] = json.loads(payload)
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.warning(f"Agent {agent} disconnected")
+        finally:
+            if agent in self.start_times and agent not in self.totals:
+                logger.warning(f"Agent {agent} started but sent no telemetry")
+
+    def fleet_snapshot(self):
+        """Aggregate the latest snapshot of every agent."""
+        snapshots = list(self.latest.values())
+        powers = [s['power'] for s in snapshots if not math.isnan(s['power'])]
+        temps = [s['cpu_temp'] for s in snapshots if not math.isnan(s['cpu_temp'])]
+        return {
+            'agents': len(snapshots),
+            'cpu_percent': sum(s['cpu_percent'] for s in snapshots) / len(snapshots) if snapshots else 0.0,
+            'max_temp': max(temps) if temps else None,
+            'power': sum(powers) if powers else None,
+            'mb_per_sec': sum(s['mb_per_sec'] for s in snapshots),
+            'ops_per_sec': sum(s['ops_per_sec'] for s in snapshots),
+            'workers': sum(s['workers'] for s in snapshots),
+            'paused': sum(s['paused'] for s in snapshots),
+        }
+
+    def get_summary(self):
+        """Get start spread, mean fleet throughput and power over the run."""
+        starts = list(self.start_times.values())
+        means = [
+            {key: total[key] / total['samples'] for key in ('mb_per_sec', 'ops_per_sec')}
+            for total in self.totals.values() if total['samples']
+        ]
+        powers = [total['power'] / total['power_samples'] for total in self.totals.values() if total['power_samples']]
+        return {
+            'agents': len(self.agents),
+            'started': len(starts),
+            'silent': sorted(agent for agent in self.start_times if agent not in self.totals),  # Started, no telemetry
+            'start_spread_ms': (max(starts) - min(starts)) * 1000 if starts else None,
+            'start_offset_ms': (max(starts) - self.start_at) * 1000 if starts else None,
+            'mb_per_sec': sum(m['mb_per_sec'] for m in means),
+            'ops_per_sec': sum(m['ops_per_sec'] for m in means),
+            'power': sum(powers) if powers else None,
+            'worker_restarts': sum(s['worker_restarts'] for s in self.summaries.values()),
+        }
@@ -0,0 +1,111 @@
+import time
+from collections import deque
+
+# (bucket width in seconds, buckets kept): 1 h of 1 s, 6 h of 10 s, 24 h of 1 min, 7 days of 10 min
+DEFAULT_TIERS = ((1, 3600), (10, 2160), (60, 1440), (600, 1008))
+
+class RollupHistory:
+    """RRD-style multi-resolution history of a single metric."""
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = [(width, deque(maxlen=capacity)) for width, capacity in tiers]  # Buckets are [start, min, max, sum, count]
+        self.first_timestamp = None
+        self.last_value = None
+
+    def append(self, value, timestamp=None):
+        """Add a sample to every tier."""
+        if value is None:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_value = value
+
+        for width, buckets in self.tiers:
+            start = timestamp - timestamp % width
+            if buckets and buckets[-1][0] == start:
+                bucket = buckets[-1]
+                bucket[1] = min(bucket[1], value)
+                bucket[2] = max(bucket[2], value)
+                bucket[3] += value
+                bucket[4] += 1
+            else:
+                buckets.append([start, value, value, value, 1])
+
+    def window_buckets(self, window=0, now=None):
+        """Get the buckets covering the last window seconds (0 = all) from the finest tier that spans it."""
+        if self.first_timestamp is None:
+            return []
+        now = time.time() if now is None else now
+        span = window or (now - self.first_timestamp)
+        for width, buckets in self.tiers:
+            if width * buckets.maxlen >= span:
+                break
+        cutoff = now - span
+        return [b for b in buckets if b[0] + width > cutoff]
+
+    def series(self, window=0, now=None):
+        """Get (start, mean, min, max) points covering the last window seconds."""
+        return [(b[0], b[3] / b[4], b[1], b[2]) for b in self.window_buckets(window, now)]
+
+    def total(self, window=0, now=None):
+        """Get the sum of the samples in the last window seconds."""
+        return sum(b[3] for b in self.window_buckets(window, now))
+
+    def __iter__(self):
+        return (b[3] / b[4] for b in self.tiers[0][1])
+
+    def __len__(self):
+        return len(self.tiers[0][1])
+
+def lttb(points, threshold):
+    """Downsample (x, y, ...) points on their y value with largest-triangle-three-buckets."""
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, len(points))
+        next_bucket = points[next_start:next_end]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+
+        # Keep the point in this bucket forming the largest triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = points[a][:2]
+        best_area = -1
+        for j in range(start, end):
+            x, y = points[j][:2]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+def minmax_downsample(points, threshold):
+    """Downsample (x, y) or (x, mean, min, max) points to (x, y) keeping each bucket's min and max in time order."""
+    rollup = bool(points) and len(points[0]) > 2
+    if threshold < 2 or (threshold >= len(points) and not rollup):
+        return list(points)
+
+    sampled = []
+    buckets = min(threshold // 2, len(points))
+    bucket_size = len(points) / buckets
+    for i in range(buckets):
+        bucket = points[int(i * bucket_size):int((i + 1) * bucket_size)]
+        if not bucket:
+            continue
+        # Rollup points carry their own extremes, so spikes inside a coarse bucket survive
+        low = min(((p[0], p[2] if rollup else p[1]) for p in bucket), key=lambda p: p[1])
+        high = max(((p[0], p[3] if rollup else p[1]) for p in bucket), key=lambda p: p[1])
+        sampled.extend(sorted({low, high}))
+    return sampled
+
+DOWNSAMPLERS = {'lttb': lttb, 'minmax': minmax_downsample}
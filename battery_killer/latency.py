@@ -0,0 +1,103 @@
+import signal
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Log-linear histogram: exact microseconds below 64 us, then 32 sub-buckets
+# per power of two (about 3% resolution) up to 2^32 us
+SUB_BUCKETS = 32
+NUM_BUCKETS = 2 * SUB_BUCKETS + SUB_BUCKETS * 26
+
+def bucket_index(value_us):
+    """Map a latency in microseconds to its histogram bucket."""
+    value_us = int(value_us)
+    if value_us < 2 * SUB_BUCKETS:
+        return max(value_us, 0)
+    shift = value_us.bit_length() - 6
+    return min(2 * SUB_BUCKETS + (shift - 1) * SUB_BUCKETS + (value_us >> shift) - SUB_BUCKETS, NUM_BUCKETS - 1)
+
+def bucket_value(index):
+    """Get the lowest latency in microseconds that falls in a bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = (index - 2 * SUB_BUCKETS) // SUB_BUCKETS + 1
+    return ((index - 2 * SUB_BUCKETS) % SUB_BUCKETS + SUB_BUCKETS) << shift
+
+def histogram_percentile(histogram, p):
+    """Get the p-th percentile in microseconds from a {bucket index: count} histogram."""
+    samples = sum(histogram.values())
+    rank = samples * p / 100
+    seen = 0
+    for index in sorted(histogram):
+        seen += histogram[index]
+        if seen >= rank and histogram[index]:
+            return bucket_value(index)
+    return 0
+
+def probe_loop(histogram, totals, interval, stopped):
+    """Sleep for interval, timestamp each wakeup and count how late it was."""
+    # Ctrl+C reaches the whole terminal process group; the supervisor stops the probe through stopped
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    next_wakeup = time.monotonic()
+    while not stopped.is_set():
+        next_wakeup += interval
+        delay = next_wakeup - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        now = time.monotonic()
+        latency_us = (now - next_wakeup) * 1e6
+        histogram[bucket_index(latency_us)] += 1
+        totals[0] += 1
+        totals[1] += latency_us
+        totals[2] = max(totals[2], latency_us)
+        if now - next_wakeup > interval:
+            next_wakeup = now  # Don't fire a burst of catch-up wakeups after a long stall
+
+class LatencyProbe:
+    """cyclictest-style wakeup latency probe running in its own process."""
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        import multiprocessing  # Only needed when the probe is enabled
+        ctx = multiprocessing.get_context('spawn')
+        self.ctx = ctx
+        # Single writer, so no locking; readers may see a sample mid-update
+        self.histogram = ctx.Array('Q', NUM_BUCKETS, lock=False)
+        self.totals = ctx.Array('d', 3, lock=False)  # samples, sum of latencies (us), max (us)
+        self.stopped = ctx.Event()
+        self.proc = None
+
+    def start(self):
+        if self.proc and self.proc.is_alive():
+            return
+        self.stopped.clear()
+        self.proc = self.ctx.Process(target=probe_loop, name='battery-killer-latency-probe',
+                                     args=(self.histogram, self.totals, self.interval, self.stopped),
+                                     daemon=True)
+        self.proc.start()
+        logger.info(f"Started latency probe {self.proc.pid} with a {self.interval * 1e6:.0f} us interval")
+
+    def stop(self):
+        if not self.proc:
+            return
+        self.stopped.set()
+        self.proc.join(timeout=2)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join()
+        self.proc = None
+
+    def get_stats(self):
+        """Get the wakeup latency percentiles in microseconds."""
+        histogram = {index: count for index, count in enumerate(self.histogram) if count}
+        samples = sum(histogram.values())
+        if not samples:
+            return {}
+        return {
+            'samples': samples,
+            'mean': self.totals[1] / self.totals[0] if self.totals[0] else 0.0,
+            'p50': histogram_percentile(histogram, 50),
+            'p99': histogram_percentile(histogram, 99),
+            'p99.9': histogram_percentile(histogram, 99.9),
+            'max': self.totals[2],
+        }
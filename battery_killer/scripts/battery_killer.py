@@ -1,28 +1,27 @@
 #!/usr/bin/env python3
-import sys
-import os
 import time
 import argparse
-import signal
+import json
 import logging
+import os
+import psutil
 
-# Add the parent directory to the Python path so we can import battery_killer modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-
-from battery_killer.core import SystemStresser
-from battery_killer.utils import format_time_delta, format_bytes
+from battery_killer.core import SystemStresser, APP_KERNELS, PSI_METRICS, DEFAULT_PSI_LIMITS
+from battery_killer.utils import (format_time_delta, format_bytes, parse_size, parse_memory_target, parse_cpu_list,
+                                  get_numa_nodes)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-def signal_handler(sig, frame):
-    """Handle Ctrl+C gracefully"""
-    print("\nExiting gracefully...")
-    stresser.stop_stress_tasks()
-    sys.exit(0)
+def configure_logging(log_file, verbose=False):
+    """Log to the console and, unless disabled, to a log file."""
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
 
 def print_stats_line(stats, start_time, show_header=False):
     """Print a clean, formatted line of stats"""
@@ -66,15 +65,122 @@ def print_stats_line(stats, start_time, show_header=False):
     # Format disk and network I/O
     disk_txt = f"{stats['disk_usage']:.1f}%"
     
+    # Average frequency, flagged with '!' while throttling
+    freq_txt = "N/A"
+    if stats.get('cpu_freq'):
+        freq_txt = f"{sum(stats['cpu_freq']) / len(stats['cpu_freq']):.0f}MHz"
+    if stats.get('throttling'):
+        freq_txt += "!"
+    
+    # Memory and I/O full stall percentages, flagged with '!' while backpressure is on
+    psi_txt = "N/A"
+    pressure = stats.get('pressure', {})
+    if 'memory' in pressure and 'io' in pressure:
+        psi_txt = f"{pressure['memory'].get('full', 0):.0f}/{pressure['io'].get('full', 0):.0f}%"
+    if stats.get('backpressure'):
+        psi_txt += "!"
+    
     # Clear the line and print new stats
     if show_header:
-        print("\nTIME     | CPU     | TEMP    | MEM     | BATTERY      | FAN      | POWER   | DISK")
-        print("---------|---------|---------|---------|--------------|----------|---------|--------")
+        print("\nTIME     | CPU     | FREQ     | TEMP    | MEM     | BATTERY      | FAN      | POWER   | DISK   | PSI M/IO")
+        print("---------|---------|----------|---------|---------|--------------|----------|---------|--------|---------")
+    
+    print(f"\r{format_time_delta(elapsed_time)} | {cpu_avg:6.1f}% | {freq_txt:8s} | {temp_txt:7s} | {memory_txt:7s} | {batt_txt:12s} | {fan_txt:8s} | {power_txt:7s} | {disk_txt:6s} | {psi_txt:8s}", end='')
+
+def run_agent(args, stresser):
+    """Serve this host's stresser to a fleet controller."""
+    import asyncio
+    from battery_killer.fleet import FleetAgent, DEFAULT_PORT
     
-    print(f"\r{format_time_delta(elapsed_time)} | {cpu_avg:6.1f}% | {temp_txt:7s} | {memory_txt:7s} | {batt_txt:12s} | {fan_txt:8s} | {power_txt:7s} | {disk_txt:6s}", end='')
+    port = args.agent or DEFAULT_PORT
+    print(f"Battery Killer - Fleet Agent on port {port}")
+    agent = FleetAgent(stresser, port=port, interval=args.interval)
+    try:
+        asyncio.run(agent.serve())
+    except KeyboardInterrupt:
+        print("\nAgent stopped.")
+    finally:
+        stresser.stop_stress_tasks()
+
+def run_fleet(args, overrides, agents, schedule):
+    """Drive a fleet of agents and print aggregated telemetry."""
+    import asyncio
+    from battery_killer.fleet import FleetController
+    
+    if not schedule and args.duration:
+        schedule = [{'duration': args.duration * 60}]
+    
+    def render(snapshot):
+        power_txt = f"{snapshot['power']:.1f}W" if snapshot['power'] is not None else "N/A"
+        temp_txt = f"{snapshot['max_temp']:.1f}°C" if snapshot['max_temp'] is not None else "N/A"
+        print(f"\rAgents: {snapshot['agents']} | CPU: {snapshot['cpu_percent']:5.1f}% | Max temp: {temp_txt} | "
+              f"Power: {power_txt} | {snapshot['mb_per_sec']:8.1f} MB/s | {snapshot['ops_per_sec']:10.1f} ops/s | "
+              f"Workers: {snapshot['workers']} ({snapshot['paused']} paused)", end='')
+    
+    print(f"Battery Killer - Fleet Controller for {len(agents)} agents")
+    controller = FleetController(agents, config=overrides, schedule=schedule, render=render)
+    summary = asyncio.run(controller.run())
+    
+    print("\n\nFleet Summary:")
+    print(f"  - Agents started: {summary['started']}/{summary['agents']}")
+    if summary['silent']:
+        print(f"  - Started without telemetry: {', '.join(summary['silent'])}")
+    if summary['start_spread_ms'] is not None:
+        print(f"  - Start time spread: {summary['start_spread_ms']:.1f} ms "
+              f"(last start {summary['start_offset_ms']:.1f} ms after target)")
+    print(f"  - Mean fleet throughput: {summary['mb_per_sec']:.1f} MB/s, {summary['ops_per_sec']:.1f} ops/s")
+    if summary['power'] is not None:
+        print(f"  - Mean fleet power: {summary['power']:.1f}W")
+    print(f"  - Worker restarts: {summary['worker_restarts']}")
+
+def run_autotune(args, stresser):
+    """Search for the best stress profile on this host and save it."""
+    from battery_killer.autotune import AutoTuner, save_profile, PROFILE_PATH
+    
+    tuner = AutoTuner(stresser, budget=args.autotune)
+    print(f"Autotuning for up to {format_time_delta(args.autotune)}...")
+    profile = tuner.run()
+    save_profile(profile)
+    
+    print("\nTrials:")
+    for trial in tuner.trials:
+        candidate = trial['candidate']
+        power_txt = f"{trial['power']:.1f}W" if trial['power'] is not None else "N/A"
+        score_txt = f"{trial['score']:.2f}" if 'score' in trial else "-"
+        print(f"  {candidate['processes_per_core']} proc/core  {candidate['kernel_threads']} thr/kernel  "
+              f"{candidate['mix']:<10s} {trial['duration']:>5.0f}s  power {power_txt:>7s}  score {score_txt}")
+    print(f"\nBest profile ({profile['objective']}): {profile['processes_per_core']} processes per core, "
+          f"{profile['kernel_threads']} threads per kernel, {profile['mix']} mix")
+    print(f"Saved to {PROFILE_PATH}, use it with --use-profile")
+
+def run_sweep(args, stresser, steps):
+    """Measure throughput and power scaling over worker counts or CPU lists."""
+    from battery_killer.sweep import ScalingSweep, write_csv
+    
+    sweep = ScalingSweep(stresser, steps=steps, settle=args.sweep_settle, measure=args.sweep_measure,
+                         interval=args.interval)
+    print(f"Scaling sweep over {len(sweep.steps)} steps on {psutil.cpu_count(logical=False)} physical / "
+          f"{psutil.cpu_count()} logical cores, {stresser.config['processes_per_core']} processes per core")
+    results = sweep.run()
+    
+    print(f"\n{'STEP':<12s} {'CPUS':>4s} {'WORKERS':>7s} {'OPS/S':>10s} {'OPS/WORKER':>10s} {'SPEEDUP':>7s} "
+          f"{'EFFIC':>6s} {'TEMP':>6s} {'POWER':>7s} {'OPS/J':>8s}")
+    for result in results:
+        temp_txt = f"{result['temp']:.1f}" if result['temp'] is not None else "N/A"
+        power_txt = f"{result['power']:.1f}W" if result['power'] is not None else "N/A"
+        per_joule_txt = f"{result['ops_per_joule']:.1f}" if result['ops_per_joule'] is not None else "N/A"
+        speedup_txt = f"{result['speedup']:.2f}" if result['speedup'] is not None else "N/A"
+        efficiency_txt = f"{result['efficiency'] * 100:.0f}%" if result['efficiency'] is not None else "N/A"
+        settled_txt = "" if result['settled'] else " (not settled)"
+        print(f"{result['step']:<12s} {result['cpus']:>4d} {result['workers']:>7d} {result['ops_per_sec']:>10.1f} "
+              f"{result['ops_per_worker']:>10.1f} {speedup_txt:>7s} {efficiency_txt:>6s} "
+              f"{temp_txt:>6s} {power_txt:>7s} {per_joule_txt:>8s}{settled_txt}")
+    if args.sweep_csv:
+        write_csv(results, args.sweep_csv)
+        print(f"\nWrote {args.sweep_csv}")
 
 def main():
-    parser = argparse.ArgumentParser(description='Battery Killer - INTENSE multi-component stress testing tool')
+    parser = argparse.ArgumentParser(prog='battery-killer', description='Battery Killer - INTENSE multi-component stress testing tool')
     parser.add_argument('--cores', type=int, default=None, 
                         help='Number of CPU cores to use (default: all physical cores)')
     parser.add_argument('--max-temp', type=int, default=90, 
@@ -83,25 +189,218 @@ def main():
                         help='Duration of stress test in minutes (default: 0 = run until stopped)')
     parser.add_argument('--interval', type=float, default=2.0,
                         help='Update interval in seconds (default: 2.0)')
+    parser.add_argument('--hash-algorithms', default='sha256,sha512,blake2b,sha3_256',
+                        help='Comma-separated hash algorithms for the crypto workload (default: sha256,sha512,blake2b,sha3_256)')
+    parser.add_argument('--hash-buffer', default='1M',
+                        help='Buffer size hashed per update, 4K-16M (default: 1M)')
+    parser.add_argument('--app-mix', default='',
+                        help=f"Comma-separated application kernels to run alongside the CPU stress ({','.join(APP_KERNELS)})")
+    parser.add_argument('--mem', default=None,
+                        help='Hold this much RAM in a memory capacity worker, e.g. 60%% or 24G (default: disabled)')
+    parser.add_argument('--mem-touch-rate', type=float, default=0,
+                        help='MB/s of held memory touched by the memory worker (default: 0 = unlimited)')
+    parser.add_argument('--mem-hugepages', choices=['huge', 'nohuge'], default=None,
+                        help='madvise the held memory and NumPy buffers with MADV_HUGEPAGE or MADV_NOHUGEPAGE')
+    parser.add_argument('--numa', default=None, nargs='?', const='all', metavar='NODES',
+                        help='Bind memory-heavy workers to NUMA nodes round-robin, e.g. 0 or 0-1 (default: all nodes)')
+    parser.add_argument('--numa-mem', type=int, default=None, metavar='NODE',
+                        help='Bind their memory to NODE instead of the local node, to measure remote access')
+    parser.add_argument('--metadata-threads', type=int, default=0,
+                        help='Threads running create/stat/rename/readdir/unlink storms in the I/O worker (default: 0 = off)')
+    parser.add_argument('--metadata-files', type=int, default=256,
+                        help='Small files per metadata thread directory (default: 256)')
+    parser.add_argument('--net', type=int, default=0, metavar='CONNECTIONS',
+                        help='Run TCP bulk (sendfile), TCP request/response and UDP traffic with CONNECTIONS each (default: 0 = off)')
+    parser.add_argument('--net-host', default='127.0.0.1',
+                        help='Address the network stress servers bind to (default: 127.0.0.1)')
+    parser.add_argument('--cache-workers', type=int, default=0,
+                        help='Pinned processes writing shared cache lines in a shared memory segment (default: 0 = off)')
+    parser.add_argument('--cache-modes', default='true,false,padded',
+                        help='Cache line sharing modes cycled through: true, false, padded (default: all)')
+    parser.add_argument('--cotenant', choices=['idle', 'nice'], default=None,
+                        help='Run workers below other work: SCHED_IDLE or a high nice value (default: normal priority)')
+    parser.add_argument('--nice', type=int, default=19,
+                        help='Nice value for --cotenant nice (default: 19)')
+    parser.add_argument('--io-idle', action='store_true',
+                        help='Run the I/O worker in the idle I/O priority class')
+    parser.add_argument('--psi-limits', default=None, metavar='RESOURCE=PERCENT,...',
+                        help='PSI stall %% that throttles each workload kind, 0 = off (default: cpu=0,memory=10,io=30)')
+    parser.add_argument('--latency-probe', type=int, nargs='?', const=1000, default=None, metavar='INTERVAL_US',
+                        help='Measure wakeup latency every INTERVAL_US microseconds while stressing (default: 1000)')
+    parser.add_argument('--autotune', type=int, nargs='?', const=600, default=None, metavar='SECONDS',
+                        help='Search worker counts and kernel mixes for the most power within SECONDS, '
+                             'save the best profile for this host and exit (default: 600)')
+    parser.add_argument('--sweep', default=None, nargs='?', const='', metavar='CORES,...',
+                        help='Measure throughput and power scaling over CPU worker counts, e.g. 1,2,4,8 '
+                             '(default: doubling up to all cores) and exit')
+    parser.add_argument('--sweep-cpus', default=None, metavar='CPULIST;...',
+                        help='Sweep over pinned CPU lists instead, e.g. "0;0,1;0,2;0-3" to compare SMT siblings')
+    parser.add_argument('--sweep-settle', type=int, default=120, metavar='SECONDS',
+                        help='Longest wait for steady state at each sweep step (default: 120)')
+    parser.add_argument('--sweep-measure', type=int, default=30, metavar='SECONDS',
+                        help='Seconds measured at each sweep step (default: 30)')
+    parser.add_argument('--sweep-csv', default=None, metavar='FILE',
+                        help='Write the scaling table as CSV to FILE')
+    parser.add_argument('--use-profile', action='store_true',
+                        help='Run with the profile saved by --autotune for this host')
+    parser.add_argument('--agent', type=int, nargs='?', const=0, default=None, metavar='PORT',
+                        help='Run as a fleet agent listening on PORT (default: 7878)')
+    parser.add_argument('--fleet', default=None, metavar='HOST:PORT,...',
+                        help='Run as fleet controller driving the given agents')
+    parser.add_argument('--schedule', default='',
+                        help='Fleet load schedule as seconds:cores steps, e.g. 60:2,300:8,60:0 (default: hold until stopped)')
+    parser.add_argument('--steady-window', type=int, default=120, metavar='SECONDS',
+                        help='Window over which temperature, power and throughput must be flat for steady state (default: 120)')
+    parser.add_argument('--steady-stop', type=float, default=None, metavar='MINUTES',
+                        help='End the run MINUTES after steady state is first reached')
+    parser.add_argument('--summary-json', default=None, metavar='FILE',
+                        help="Write the end-of-run summary as JSON to FILE, '-' for stdout")
+    parser.add_argument('--virtual-battery', type=float, nargs='?', const=50.0, default=None, metavar='WH',
+                        help='Drain a simulated WH battery pack (default: 50) by measured energy, for machines '
+                             'without a battery; the run ends when it is empty')
+    parser.add_argument('--vbat-scale', type=float, default=1.0, metavar='FACTOR',
+                        help='Virtual battery seconds drained per real second (default: 1)')
+    parser.add_argument('--trace', default=None, metavar='FILE',
+                        help='Record a Chrome trace-event timeline (chrome://tracing, Perfetto) to FILE')
+    parser.add_argument('--log-file', default='battery_killer.log',
+                        help="Log file path, '' to disable (default: battery_killer.log)")
     parser.add_argument('--verbose', '-v', action='store_true', 
                         help='Show verbose output')
     
     args = parser.parse_args()
     
-    if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+    # shake_* digests need a length, so only fixed-length algorithms can be streamed
+    import hashlib
+    hash_algorithms = sorted(a for a in hashlib.algorithms_available if not a.startswith('shake'))
+    unknown = [a for a in args.hash_algorithms.split(',') if a.strip() and a.strip() not in hash_algorithms]
+    if unknown:
+        parser.error(f"unsupported hash algorithms: {', '.join(unknown)} (choose from {', '.join(hash_algorithms)})")
+    try:
+        hash_buffer = parse_size(args.hash_buffer)
+    except ValueError:
+        parser.error(f"invalid --hash-buffer size: {args.hash_buffer}")
+    if not 4 * 1024 <= hash_buffer <= 16 * 1024 * 1024:
+        parser.error(f"--hash-buffer must be between 4K and 16M, got {args.hash_buffer}")
+    app_kernels = [k.strip() for k in args.app_mix.split(',') if k.strip()]
+    unknown = [k for k in app_kernels if k not in APP_KERNELS]
+    if unknown:
+        parser.error(f"unknown application kernels: {', '.join(unknown)}")
     
-    # Setup signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    unknown = [m for m in args.cache_modes.split(',') if m.strip() and m.strip() not in ('true', 'false', 'padded')]
+    if unknown:
+        parser.error(f"unknown cache sharing modes: {', '.join(unknown)}")
     
-    global stresser
-    stresser = SystemStresser()
+    configure_logging(args.log_file, args.verbose)
+    
+    # Co-tenant modes this platform can't provide (macOS has neither), agents check their own
+    if args.cotenant == 'idle' and not hasattr(os, 'SCHED_IDLE') and not args.fleet:
+        logger.warning("SCHED_IDLE is not available on this platform, using --cotenant nice 19 instead")
+        args.cotenant, args.nice = 'nice', 19
+    if args.io_idle and not hasattr(psutil, 'IOPRIO_CLASS_IDLE') and not args.fleet:
+        logger.warning("The idle I/O class is not available on this platform, ignoring --io-idle")
+        args.io_idle = False
     
-    # Configure stresser
+    # Configuration overrides, also pushed to agents in fleet mode
+    overrides = {
+        'max_temp_celsius': args.max_temp,
+        'hash_algorithms': [a.strip() for a in args.hash_algorithms.split(',') if a.strip()],
+        'hash_buffer_size': hash_buffer,
+        'app_kernels': app_kernels,
+        'mem_touch_rate': args.mem_touch_rate,
+        'mem_hugepages': args.mem_hugepages,
+        'metadata_threads': args.metadata_threads,
+        'metadata_files': args.metadata_files,
+        'net_connections': args.net,
+        'net_host': args.net_host,
+        'cache_workers': args.cache_workers,
+        'cache_modes': [m.strip() for m in args.cache_modes.split(',') if m.strip()],
+        'cotenant': args.cotenant,
+        'cotenant_nice': args.nice,
+        'io_idle': args.io_idle,
+        'steady_window': args.steady_window,
+        'numa_mem_node': args.numa_mem,
+    }
+    if args.numa:
+        nodes = get_numa_nodes()
+        try:
+            numa_nodes = sorted(nodes) if args.numa == 'all' else parse_cpu_list(args.numa)
+        except ValueError:
+            parser.error(f"invalid --numa nodes: {args.numa}")
+        unknown = [node for node in numa_nodes + [args.numa_mem] if node is not None and node not in nodes]
+        if unknown:
+            parser.error(f"unknown NUMA nodes: {', '.join(map(str, unknown))} (this host has {len(nodes)})")
+        overrides['numa_nodes'] = numa_nodes
+    if args.psi_limits:
+        try:
+            psi_limits = {resource.strip(): float(limit) for resource, limit in
+                          (item.split('=') for item in args.psi_limits.split(',') if item.strip())}
+        except ValueError:
+            parser.error(f"invalid --psi-limits: {args.psi_limits}")
+        unknown = [resource for resource in psi_limits if resource not in PSI_METRICS]
+        if unknown:
+            parser.error(f"unknown PSI resources: {', '.join(unknown)}")
+        overrides['psi_limits'] = {**DEFAULT_PSI_LIMITS, **psi_limits}
+    if args.latency_probe:
+        overrides['latency_probe'] = True
+        overrides['latency_interval'] = args.latency_probe / 1e6
     if args.cores:
-        stresser.config['num_cores'] = args.cores
-    stresser.config['max_temp_celsius'] = args.max_temp
+        overrides['num_cores'] = args.cores
+    if args.mem:
+        try:
+            parse_memory_target(args.mem)
+        except ValueError:
+            parser.error(f"invalid --mem target: {args.mem} (use a size such as 24G or a percentage such as 60%)")
+        overrides['mem_target'] = args.mem  # Percentages resolve against each host's RAM
+    
+    if args.fleet:
+        from battery_killer.fleet import parse_schedule
+        agents = []
+        for agent in filter(None, (a.strip() for a in args.fleet.split(','))):
+            host, _, port = agent.rpartition(':')
+            if not port.isdigit() or not 0 < int(port) < 65536:
+                parser.error(f"invalid --fleet agent: {agent} (use HOST:PORT)")
+            agents.append((host or 'localhost', int(port)))
+        if not agents:
+            parser.error("--fleet needs at least one HOST:PORT agent")
+        try:
+            schedule = parse_schedule(args.schedule)
+        except ValueError:
+            parser.error(f"invalid --schedule: {args.schedule} (use seconds:cores steps, e.g. 60:2,300:8,60:0)")
+        run_fleet(args, overrides, agents, schedule)
+        return
+    
+    stresser = SystemStresser()
+    stresser.config.update(overrides)
+    if args.virtual_battery:
+        stresser.config.update({'virtual_battery': True, 'vbat_capacity_wh': args.virtual_battery,
+                                'vbat_time_scale': args.vbat_scale})
+        stresser.use_virtual_battery()
+    
+    if args.autotune:
+        run_autotune(args, stresser)
+        return
+    
+    if args.sweep is not None or args.sweep_cpus:
+        try:
+            if args.sweep_cpus:
+                steps = [parse_cpu_list(cpus) for cpus in args.sweep_cpus.split(';') if cpus.strip()]
+            else:
+                steps = [int(cores) for cores in args.sweep.split(',') if cores.strip()]
+        except ValueError:
+            parser.error(f"invalid sweep steps: {args.sweep_cpus or args.sweep}")
+        run_sweep(args, stresser, steps)
+        return
+    
+    if args.use_profile:
+        from battery_killer.autotune import load_profile
+        profile = load_profile()
+        if profile is None:
+            parser.error("no saved profile for this host, run --autotune first")
+        stresser.config.update({key: profile[key] for key in ('processes_per_core', 'kernel_threads', 'cpu_kernels')})
+    
+    if args.agent is not None:
+        run_agent(args, stresser)
+        return
     
     print(f"Battery Killer - CLI Mode")
     print(f"Configuration:")
@@ -109,64 +408,187 @@ def main():
     print(f"  - Max Temperature: {stresser.config['max_temp_celsius']}°C")
     print(f"  - Duration: {'Until stopped' if args.duration == 0 else f'{args.duration} minutes'}")
     print(f"  - Update Interval: {args.interval} seconds")
+    print(f"  - Hash Workload: {', '.join(stresser.config['hash_algorithms'])} "
+          f"({format_bytes(stresser.config['hash_buffer_size'])} buffers)")
+    if app_kernels:
+        print(f"  - Application Kernels: {', '.join(app_kernels)}")
+    if stresser.config['mem_target']:
+        print(f"  - Memory Target: {format_bytes(parse_memory_target(stresser.config['mem_target']))}")
+    if args.latency_probe:
+        print(f"  - Latency Probe: every {args.latency_probe} us")
+    if args.metadata_threads:
+        print(f"  - Metadata Workload: {args.metadata_threads} threads x {args.metadata_files} files")
+    if args.net:
+        print(f"  - Network Workload: {args.net} connections per traffic type on {args.net_host}")
+    if args.numa:
+        memory_txt = f", memory on node {args.numa_mem}" if args.numa_mem is not None else ", local memory"
+        hugepages_txt = f", {args.mem_hugepages} pages" if args.mem_hugepages else ""
+        print(f"  - NUMA Placement: nodes {','.join(map(str, stresser.config['numa_nodes']))}{memory_txt}{hugepages_txt}")
+    if args.cache_workers:
+        print(f"  - Cache Coherence Workload: {args.cache_workers} pinned workers ({args.cache_modes})")
+    if args.cotenant:
+        policy = 'SCHED_IDLE' if args.cotenant == 'idle' else f'nice {args.nice}'
+        print(f"  - Co-tenant Mode: {policy}{', idle I/O class' if args.io_idle else ''}")
+    if args.virtual_battery:
+        print(f"  - Virtual Battery: {args.virtual_battery:g} Wh at {args.vbat_scale:g}x time "
+              f"({stresser.virtual_battery.source} power)")
+    if args.trace:
+        print(f"  - Trace: {args.trace}")
+        stresser.open_trace(args.trace)
     
     print("\nStarting stress test...")
-    stresser.start_stress_tasks()
+    import asyncio
+    from battery_killer.supervisor import AsyncSupervisor
+    
+    counter = 0
+    def render(stats, state):
+        nonlocal counter
+        if state == 'paused':
+            print(f"\rCooling down... Current temperature: {stats.get('cpu_temp', 0):.1f}°C", end='')
+            counter = 0  # Reprint header after temperature warning
+            return
+        # Print header every 20 lines
+        print_stats_line(stats, supervisor.start_time, counter % 20 == 0)
+        counter += 1
+    
+    def stop_condition(stats):
+        if args.steady_stop is not None:
+            warmup_end = stresser.steady.warmup_end
+            if warmup_end is not None and time.time() - warmup_end >= args.steady_stop * 60:
+                return 'steady'
+        if args.virtual_battery:
+            return stresser.battery_stop_condition(stats)
+        return None
     
+    supervisor = AsyncSupervisor(stresser, interval=args.interval, duration=args.duration * 60, render=render,
+                                 stop_condition=stop_condition)
+    start_time = time.time()
     try:
-        start_time = time.time()
-        counter = 0
-        
-        while True:
-            stats = stresser.get_system_stats()
-            
-            # Print header every 20 lines
-            show_header = (counter % 20 == 0)
-            print_stats_line(stats, start_time, show_header)
-            
-            counter += 1
-            
-            # Check for temperature limit
-            temp = stats.get('cpu_temp', -1)
-            if temp != -1 and temp > stresser.config['max_temp_celsius']:
-                print(f"\n\nTemperature too high: {temp:.1f}°C > {stresser.config['max_temp_celsius']}°C")
-                print("Pausing stress test to cool down...")
-                stresser.stop_stress_tasks()
-                
-                # Wait for cooling
-                while temp > stresser.config['max_temp_celsius'] - 5:
-                    time.sleep(5)
-                    stats = stresser.get_system_stats()
-                    temp = stats.get('cpu_temp', -1)
-                    if temp == -1:
-                        break
-                    print(f"\rCooling down... Current temperature: {temp:.1f}°C", end='')
-                
-                print(f"\nTemperature now {temp:.1f}°C, resuming stress test")
-                stresser.start_stress_tasks()
-                print_stats_line(stats, start_time, True)  # Reprint header after temperature warning
-            
-            # Check for duration limit
-            if args.duration > 0 and (time.time() - start_time) > args.duration * 60:
-                print(f"\n\nReached specified duration of {args.duration} minutes.")
-                break
-            
-            time.sleep(args.interval)
-            
+        asyncio.run(supervisor.run())
+        if supervisor.stop_reason == 'duration':
+            print(f"\n\nReached specified duration of {args.duration} minutes.")
+        elif supervisor.stop_reason == 'steady':
+            print(f"\n\nRan {args.steady_stop:g} minutes in steady state.")
+        elif supervisor.stop_reason and supervisor.stop_reason.startswith('battery'):
+            print(f"\n\nVirtual battery drained: {supervisor.stop_reason}.")
+        elif supervisor.stop_reason == 'interrupted':
+            print("\n\nTest interrupted by user.")
+        elif supervisor.stop_reason == 'error':
+            print("\n\nSupervisor failed, stress stopped (see the log).")
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user.")
     except Exception as e:
         logger.error(f"Error occurred: {e}")
     finally:
         stresser.stop_stress_tasks()
+        stresser.close_trace()
         print("\nStress test stopped.")
         
         # Print summary
         end_time = time.time()
         duration = end_time - start_time
+        summary = supervisor.get_summary()
         print("\nTest Summary:")
         print(f"  - Total duration: {format_time_delta(duration)}")
-        print(f"  - Test completed: {'Yes' if args.duration > 0 and duration >= args.duration * 60 else 'No (interrupted)'}")
+        completed = summary['stop_reason'] in ('duration', 'steady') or str(summary['stop_reason']).startswith('battery')
+        print(f"  - Test completed: {'Yes' if completed else 'No (interrupted)'}")
+        print(f"  - Worker restarts: {summary['worker_restarts']}")
+        print(f"  - Thermal pauses: {summary['thermal_pauses']} ({format_time_delta(summary['paused_time'])} paused)")
+        if summary['backpressure_events']:
+            events = ", ".join(f"{resource} {count}" for resource, count in sorted(summary['backpressure_events'].items()))
+            print(f"  - PSI backpressure events: {events}")
+        if 'thermal_latency_ms' in summary:
+            latency = summary['thermal_latency_ms']
+            print(f"  - Thermal event to throttle latency: {latency['avg']:.0f} ms avg, "
+                  f"{latency['min']:.0f}-{latency['max']:.0f} ms")
+        
+        # Percentiles from the streaming estimators, whatever the run length
+        from battery_killer.summary import format_summary_table
+        run_summary = stresser.run_summary.get_summary()
+        print(f"  - Time throttled: {format_time_delta(run_summary['throttled_time'])}")
+        if any(run_summary['metrics'].values()):
+            print("  - Sampled metrics:")
+            for line in format_summary_table(run_summary['metrics']):
+                print(f"      {line}")
+        
+        # The same metrics without the warm-up's boost and settling periods
+        steady_state = stresser.steady.get_state() if stresser.steady else None
+        steady_summary = stresser.steady_summary.get_summary()
+        if steady_state and steady_state['warmup'] is not None:
+            print(f"  - Warm-up: {format_time_delta(steady_state['warmup'])}, then "
+                  f"{format_time_delta(steady_state['steady_time'])} steady, "
+                  f"{steady_state['change_points']} change points")
+            if any(steady_summary['metrics'].values()):
+                print("  - Steady-state metrics:")
+                for line in format_summary_table(steady_summary['metrics']):
+                    print(f"      {line}")
+        else:
+            print("  - Steady state: not reached")
+        
+        # Sensor reads avoided by the shared cache, per consumer
+        for consumer, counts in stresser.sensors.get_stats()['consumers'].items():
+            logger.debug(f"Sensor consumer {consumer}: {counts['requests']} requests, {counts['saved']} served from cache")
+        
+        # Average workload throughput over the whole run
+        if stresser.workload_totals and duration > 0:
+            print("  - Workload throughput:")
+            for kind, total in sorted(stresser.workload_totals.items()):
+                print(f"      {kind:<12s} {total['bytes'] / duration / (1024 * 1024):>10.1f} MB/s "
+                      f"{total['ops'] / duration:>12.1f} ops/s")
+        
+        # Where the NUMA-bound workers' memory actually ended up
+        for node, usage in sorted(stresser.numa_placement.items()):
+            resident = usage['local'] + usage['remote']
+            local_share = usage['local'] / resident * 100 if resident else 0.0
+            print(f"  - NUMA node {node}: {usage['workers']} workers, {format_bytes(usage['local'])} local, "
+                  f"{format_bytes(usage['remote'])} remote ({local_share:.1f}% local)")
+        
+        # Wakeup latency seen by the probe while the stress was running
+        if stresser.latency_probe:
+            latency = stresser.latency_probe.get_stats()
+            if latency:
+                print(f"  - Wakeup latency ({latency['samples']} wakeups): p50 {latency['p50']} us, "
+                      f"p99 {latency['p99']} us, p99.9 {latency['p99.9']} us, max {latency['max']:.0f} us")
+        
+        # CPU soaked up by the workers versus everything else on the host
+        sched = stresser.sched_totals
+        if sched['busy'] > 0:
+            print(f"  - Worker CPU absorbed: {sched['run']:.0f} CPU-s "
+                  f"({sched['run'] / sched['busy'] * 100:.1f}% of busy CPU), "
+                  f"foreground: {max(0.0, sched['busy'] - sched['run']):.0f} CPU-s")
+            waiting = sched['wait'] / (sched['run'] + sched['wait']) * 100 if sched['run'] + sched['wait'] else 0.0
+            print(f"  - Worker run-queue wait: {sched['wait']:.1f} s ({waiting:.1f}% of runnable time)")
+        
+        # Drain time the virtual pack would have lasted in real time
+        if stresser.virtual_battery:
+            vbat = stresser.virtual_battery.get_stats()
+            print(f"  - Virtual battery: {vbat['drained_wh']:.2f} Wh drained in {format_time_delta(vbat['virtual_time'])} "
+                  f"virtual time at {vbat['avg_watts']:.1f} W avg, {vbat['percent']:.1f}% left")
+        
+        # Energy from the RAPL counters and its split across workloads
+        rapl_joules = stresser.sensors.rapl.total_joules
+        if rapl_joules:
+            domains = ", ".join(f"{domain} {joules:.0f} J" for domain, joules in sorted(rapl_joules.items()))
+            print(f"  - Energy: {domains}")
+            for kind, total in sorted(stresser.workload_totals.items()):
+                if total['joules']:
+                    per_op = f", {total['joules'] / total['ops'] * 1000:.3f} mJ/op" if total['ops'] else ""
+                    print(f"      {kind:<12s} {total['joules']:>10.1f} J{per_op}")
+            print(f"      {'other':<12s} {stresser.unattributed_joules:>10.1f} J")
+        
+        if args.summary_json:
+            report = {**summary, **run_summary, 'duration': duration, 'workloads': stresser.workload_totals,
+                      'energy_joules': stresser.sensors.rapl.total_joules, 'steady_state': steady_state,
+                      'steady_metrics': steady_summary['metrics']}
+            if stresser.virtual_battery:
+                report['virtual_battery'] = stresser.virtual_battery.get_stats()
+            if stresser.numa_placement:
+                report['numa_placement'] = stresser.numa_placement
+            if args.summary_json == '-':
+                print(json.dumps(report, indent=2))
+            else:
+                with open(args.summary_json, 'w') as f:
+                    json.dump(report, f, indent=2)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,138 @@
+import threading
+import time
+import logging
+import psutil
+from .utils import (get_cpu_temperature, get_fan_speed, get_power_stats, get_cpu_frequencies,
+                    get_throttle_counts, get_pressure)
+from .energy import RaplReader, DEFAULT_POWERCAP_ROOT
+
+logger = logging.getLogger(__name__)
+
+# Default sampling period (cache TTL) of each sensor in seconds
+DEFAULT_SENSOR_TTLS = {
+    'temperature': 2.0,
+    'fan': 5.0,
+    'power': 2.0,
+    'battery': 10.0,
+    'cpu': 1.0,
+    'cpu_freq': 1.0,
+    'throttle': 1.0,
+    'pressure': 1.0,
+    'memory': 1.0,
+    'swap': 5.0,
+    'disk': 30.0,
+}
+
+class Sensor:
+    """A single sensor with a TTL-cached last reading."""
+    def __init__(self, name, read, ttl):
+        self.name = name
+        self.read = read
+        self.ttl = ttl
+        self.value = None
+        self.timestamp = None
+        self.lock = threading.Lock()
+        self.reads = 0
+        self.cache_hits = 0
+        self.read_time = 0.0
+
+    def is_fresh(self, now):
+        return self.timestamp is not None and now - self.timestamp < self.ttl
+
+class SensorHub:
+    """Shared sensor access with per-sensor TTL caching and deduplicated reads."""
+    def __init__(self, ttls=None, powercap_root=DEFAULT_POWERCAP_ROOT):
+        self.sensors = {}
+        self.consumers = {}
+        self.consumers_lock = threading.Lock()
+        self.tracer = None  # TraceWriter recording read durations, if any
+
+        ttls = {**DEFAULT_SENSOR_TTLS, **(ttls or {})}
+        self.register('temperature', get_cpu_temperature, ttls['temperature'])
+        self.register('fan', get_fan_speed, ttls['fan'])
+        self.register('power', self.read_power, ttls['power'])
+        self.register('battery', psutil.sensors_battery, ttls['battery'])
+        self.register('cpu', lambda: psutil.cpu_percent(interval=None, percpu=True), ttls['cpu'])
+        self.register('cpu_freq', get_cpu_frequencies, ttls['cpu_freq'])
+        self.register('throttle', get_throttle_counts, ttls['throttle'])
+        self.register('pressure', get_pressure, ttls['pressure'])
+        self.register('memory', psutil.virtual_memory, ttls['memory'])
+        self.register('swap', psutil.swap_memory, ttls['swap'])
+        self.register('disk', lambda: psutil.disk_usage('/'), ttls['disk'])
+
+        # cpu_percent(interval=None) measures since the previous call, so prime it
+        psutil.cpu_percent(interval=None, percpu=True)
+
+        # RAPL power is measured between reads, so prime it too
+        self.rapl = RaplReader(powercap_root)
+        if self.rapl.available:
+            self.rapl.read()
+
+    def read_power(self):
+        """Read power from RAPL energy counters, falling back to powermetrics."""
+        if self.rapl.available:
+            rapl_power = self.rapl.read()
+            power_stats = {'rapl_power': rapl_power}
+            if 'package' in rapl_power:
+                power_stats['cpu_power'] = rapl_power['package']
+            return power_stats
+        return get_power_stats()
+
+    def register(self, name, read, ttl):
+        """Register (or replace) a sensor read function with its TTL."""
+        self.sensors[name] = Sensor(name, read, ttl)
+
+    def read(self, name, consumer='default'):
+        """Read a sensor, serving it from the cache while it is fresh."""
+        sensor = self.sensors[name]
+        # Holding the sensor lock during the read makes concurrent consumers
+        # share the in-flight read rather than issuing their own.
+        with sensor.lock:
+            now = time.monotonic()
+            saved = sensor.is_fresh(now)
+            if saved:
+                sensor.cache_hits += 1
+            else:
+                try:
+                    sensor.value = sensor.read()
+                except Exception as e:
+                    logger.debug(f"Could not read sensor {name}: {e}")
+                    sensor.value = None
+                sensor.timestamp = time.monotonic()
+                sensor.reads += 1
+                sensor.read_time += sensor.timestamp - now
+                if self.tracer:
+                    end = time.time()
+                    self.tracer.complete(f'read {name}', end - (sensor.timestamp - now), end,
+                                         track='sensors', cat='sensor', args={'consumer': consumer})
+            value = sensor.value
+
+        with self.consumers_lock:
+            counts = self.consumers.setdefault(consumer, {'requests': 0, 'saved': 0})
+            counts['requests'] += 1
+            counts['saved'] += saved
+        return value
+
+    def last_read_time(self, name):
+        """Get the time.monotonic() timestamp of the sensor's cached reading."""
+        return self.sensors[name].timestamp
+
+    def invalidate(self, name=None):
+        """Drop cached readings so the next read hits the sensor."""
+        for sensor in ([self.sensors[name]] if name else self.sensors.values()):
+            with sensor.lock:
+                sensor.timestamp = None
+
+    def get_stats(self):
+        """Get read counts per sensor and saved reads per consumer."""
+        with self.consumers_lock:
+            consumers = {name: dict(counts) for name, counts in self.consumers.items()}
+        sensors = {
+            name: {
+                'reads': sensor.reads,
+                'cache_hits': sensor.cache_hits,
+                'avg_read_ms': sensor.read_time / sensor.reads * 1000 if sensor.reads else 0.0,
+            }
+            for name, sensor in self.sensors.items()
+        }
+        return {'sensors': sensors, 'consumers': consumers}
@@ -0,0 +1,90 @@
+import math
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+def window_trend(samples):
+    """Get the least-squares slope (per second), mean and standard deviation of (time, value) samples."""
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_v = sum(v for _, v in samples) / n
+    var_t = sum((t - mean_t) ** 2 for t, _ in samples)
+    slope = sum((t - mean_t) * (v - mean_v) for t, v in samples) / var_t if var_t else 0.0
+    stdev = math.sqrt(sum((v - mean_v) ** 2 for _, v in samples) / n)
+    return slope, mean_v, stdev
+
+class SteadyStateDetector:
+    """Online thermal steady-state and change-point detection."""
+    def __init__(self, window=120, drift=0.03, cv=0.1, min_samples=5):
+        self.window = window  # Seconds of samples each series is judged over
+        self.drift = drift  # Largest fitted change across the window, relative to the mean
+        self.cv = cv  # Largest standard deviation, relative to the mean
+        self.min_samples = min_samples
+        self.series = {}
+        self.start_time = None
+        self.warmup_end = None  # Time steady state was first reached
+        self.steady_since = None
+        self.steady_time = 0.0
+        self.last_time = None
+        self.change_points = []
+
+    def add(self, name, value, now):
+        if value is None:
+            return
+        samples = self.series.setdefault(name, deque())
+        samples.append((now, value))
+        while samples and samples[0][0] < now - self.window:
+            samples.popleft()
+
+    def series_steady(self, samples):
+        if len(samples) < self.min_samples or samples[-1][0] - samples[0][0] < self.window * 0.9:
+            return False
+        slope, mean, stdev = window_trend(samples)
+        if mean == 0:
+            return False
+        return abs(slope * self.window / mean) <= self.drift and stdev / abs(mean) <= self.cv
+
+    def update(self, stats, now=None):
+        """Add a stats sample and return whether the run is in steady state."""
+        now = time.time() if now is None else now
+        if self.start_time is None:
+            self.start_time = now
+        self.add('temperature', stats.get('cpu_temp'), now)
+        self.add('power', stats.get('cpu_power'), now)
+        workloads = stats.get('workloads')
+        if workloads:
+            self.add('throughput', sum(w.get('ops_per_sec', 0.0) for w in workloads.values()), now)
+
+        was_steady = self.steady_since is not None
+        if was_steady and self.last_time is not None:
+            self.steady_time += now - self.last_time
+        self.last_time = now
+        steady = bool(self.series) and all(self.series_steady(s) for s in self.series.values())
+        if steady and not was_steady:
+            self.steady_since = now
+            if self.warmup_end is None:
+                self.warmup_end = now
+                logger.info(f"Steady state reached after {now - self.start_time:.0f}s warm-up")
+            else:
+                logger.info("Steady state reached again")
+        elif was_steady and not steady:
+            unsteady = [name for name, s in self.series.items() if not self.series_steady(s)]
+            self.change_points.append((now, unsteady))
+            self.steady_since = None
+            logger.info(f"Change point: {', '.join(unsteady)} no longer steady")
+        return steady
+
+    @property
+    def steady(self):
+        return self.steady_since is not None
+
+    def get_state(self):
+        """Get the warm-up, steady time and change points for stats and summaries."""
+        return {
+            'steady': self.steady,
+            'warmup': (self.warmup_end - self.start_time) if self.warmup_end is not None else None,
+            'steady_time': self.steady_time,
+            'change_points': len(self.change_points),
+        }
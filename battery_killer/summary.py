@@ -0,0 +1,159 @@
+import time
+
+SUMMARY_QUANTILES = (50, 95, 99)
+
+class P2Quantile:
+    """Streaming quantile estimate with the P-square algorithm (Jain & Chlamtac)."""
+    def __init__(self, p):
+        self.p = p / 100
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * self.p, 1 + 4 * self.p, 3 + 2 * self.p, 5]
+        self.increments = [0, self.p / 2, self.p, (1 + self.p) / 2, 1]
+
+    def add(self, x):
+        q, n = self.heights, self.positions
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        # Find the cell x falls in, stretching the extremes if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(1, 5) if x < q[i]) - 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move the middle markers one position towards where they should be
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self.parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def value(self):
+        """Get the current estimate, exact while there are fewer than five samples."""
+        if not self.heights:
+            return None
+        if len(self.heights) < 5:
+            return self.heights[min(len(self.heights) - 1, round(self.p * (len(self.heights) - 1)))]
+        return self.heights[2]
+
+class MetricSummary:
+    """Count, mean, max and streaming percentiles of one metric."""
+    def __init__(self, quantiles=SUMMARY_QUANTILES):
+        self.estimators = {p: P2Quantile(p) for p in quantiles}
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.max = value if self.max is None else max(self.max, value)
+        for estimator in self.estimators.values():
+            estimator.add(value)
+
+    def get_stats(self):
+        if not self.count:
+            return {}
+        stats = {'samples': self.count, 'mean': self.total / self.count}
+        stats.update({f'p{p}': estimator.value() for p, estimator in self.estimators.items()})
+        stats['max'] = self.max
+        return stats
+
+class RunSummary:
+    """End-of-run percentiles of temperature, CPU, power and battery drain."""
+    def __init__(self):
+        self.metrics = {}
+        self.duration = 0.0
+        self.last_time = None
+        self.throttled_time = 0.0
+        self.drain_anchor = None  # (time, percent) of the last battery level change
+
+    def add(self, name, value):
+        if value is None:
+            return
+        summary = self.metrics.get(name)
+        if summary is None:
+            summary = self.metrics[name] = MetricSummary()
+        summary.add(value)
+
+    def update(self, stats, now=None):
+        """Add a stats sample from SystemStresser.get_system_stats()."""
+        now = time.time() if now is None else now
+        if self.last_time is not None:
+            self.duration += now - self.last_time
+            if stats.get('throttling'):
+                self.throttled_time += now - self.last_time
+        self.last_time = now
+
+        self.add('temperature', stats.get('cpu_temp'))
+        cpu_percent = stats['cpu_percent']
+        self.add('cpu', sum(cpu_percent) / len(cpu_percent))
+        for core, usage in enumerate(cpu_percent):
+            self.add(f'cpu{core}', usage)
+        self.add('power', stats.get('cpu_power'))
+
+        battery = stats.get('battery')
+        if battery is None or battery.power_plugged:
+            self.drain_anchor = None
+        elif self.drain_anchor is None:
+            self.drain_anchor = (now, battery.percent)
+        elif battery.percent != self.drain_anchor[1] and now > self.drain_anchor[0]:
+            anchor_time, anchor_percent = self.drain_anchor
+            self.add('drain', (anchor_percent - battery.percent) / (now - anchor_time) * 3600)
+            self.drain_anchor = (now, battery.percent)
+
+    def skip(self):
+        """Leave a gap, e.g. outside the measurement window, so it isn't counted as run time or drain."""
+        self.last_time = None
+        self.drain_anchor = None
+
+    def get_summary(self):
+        """Get the metric percentiles and throttled time."""
+        return {
+            'duration': self.duration,
+            'throttled_time': self.throttled_time,
+            'metrics': {name: summary.get_stats() for name, summary in self.metrics.items()},
+        }
+
+# Table label and unit of each summarized metric
+METRIC_LABELS = {
+    'temperature': ('Temperature', '°C'),
+    'cpu': ('CPU average', '%'),
+    'power': ('Power', 'W'),
+    'drain': ('Battery drain', '%/h'),
+}
+
+def format_summary_table(metrics):
+    """Format summarized metrics as table lines, per-core CPU after the rest."""
+    columns = ['p50', 'p95', 'p99', 'max']
+    lines = [f"{'METRIC':<16s} {'UNIT':>5s} " + " ".join(f"{c.upper():>8s}" for c in columns)]
+    names = [name for name in METRIC_LABELS if name in metrics]
+    names += sorted((name for name in metrics if name not in METRIC_LABELS), key=lambda n: int(n[3:]))
+    for name in names:
+        stats = metrics[name]
+        if not stats:
+            continue
+        label, unit = METRIC_LABELS.get(name, (f'CPU core {name[3:]}', '%'))
+        lines.append(f"{label:<16s} {unit:>5s} " + " ".join(f"{stats[c]:>8.1f}" for c in columns))
+    return lines
@@ -0,0 +1,202 @@
+import asyncio
+import signal
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncSupervisor:
+    """Run a SystemStresser under an asyncio event loop."""
+    def __init__(self, stresser, interval=2.0, duration=0, render=None, stop_condition=None,
+                 cooldown_hysteresis=5):
+        self.stresser = stresser
+        self.interval = interval
+        self.duration = duration  # Seconds, 0 = run until stopped
+        self.render = render  # Called with (stats, state) after every poll
+        self.stop_condition = stop_condition  # Called with stats, returns a reason to stop
+        self.cooldown_hysteresis = cooldown_hysteresis
+
+        self.state = 'stopped'
+        self.stop_reason = None
+        self.start_time = None
+        self.paused_time = 0.0
+        self.thermal_pauses = 0
+        self.thermal_latencies = []  # Seconds from the hot sensor reading to workers stopped
+        self.pause_started = None
+        self.stopping = None
+        self.workers_lock = None
+
+    async def in_thread(self, func, *args):
+        """Run a blocking stresser call without stalling the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def traced(self, name, func, *args):
+        """Run a blocking stresser call in a thread, tracing how long it took."""
+        start = time.time()
+        result = await self.in_thread(func, *args)
+        if self.stresser.tracer:
+            self.stresser.tracer.complete(name, start, cat='supervisor')
+        return result
+
+    async def run(self):
+        """Start the workers and supervise them until a stop condition is met."""
+        self.stopping = asyncio.Event()
+        self.workers_lock = asyncio.Lock()
+        self.start_time = time.time()
+        
+        # Ctrl+C and SIGTERM shut down through the same bounded path
+        loop = asyncio.get_running_loop()
+        handled_signals = []
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop, 'interrupted')
+                handled_signals.append(sig)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass  # Not the main thread, or unsupported on this platform
+        
+        await self.traced('start', self.stresser.start_stress_tasks)
+        self.state = 'running'
+
+        tasks = [
+            asyncio.create_task(self.watch_workers()),
+            asyncio.create_task(self.watch_heartbeats()),
+            asyncio.create_task(self.poll_sensors()),
+        ]
+        if self.duration > 0:
+            tasks.append(asyncio.create_task(self.watch_duration()))
+        for task in tasks:
+            task.add_done_callback(self.task_done)
+        try:
+            await self.stopping.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            async with self.workers_lock:
+                await self.traced('stop', self.stresser.stop_stress_tasks)
+            if self.state == 'paused':
+                self.trace_cooldown()
+            self.state = 'stopped'
+            if self.stresser.tracer:
+                self.stresser.tracer.complete('supervised run', self.start_time, track='state',
+                                              args={'stop_reason': self.stop_reason})
+            for sig in handled_signals:
+                loop.remove_signal_handler(sig)
+        return self.stop_reason
+
+    def task_done(self, task):
+        """Stop the run when a supervision task dies, rather than stressing unsupervised."""
+        if task.cancelled() or task.exception() is None:
+            return
+        error = task.exception()
+        logger.error(f"Supervisor task {task.get_coro().__name__} failed: {error!r}",
+                     exc_info=(type(error), error, error.__traceback__))
+        self.stop('error')
+
+    def stop(self, reason):
+        """Ask the supervisor to shut down."""
+        if self.stop_reason is None:
+            self.stop_reason = reason
+        if self.stopping:
+            self.stopping.set()
+
+    async def watch_workers(self):
+        """Restart workers that exit while the stress test is running."""
+        while True:
+            await asyncio.sleep(0.5)
+            async with self.workers_lock:
+                if self.state != 'running':
+                    continue
+                for proc in self.stresser.find_dead_workers():
+                    logger.warning(f"Stress worker {proc.pid} exited with code {proc.returncode}")
+                    await self.in_thread(self.stresser.restart_worker, proc)
+
+    async def watch_heartbeats(self):
+        """Restart workers that stop publishing their heartbeat."""
+        timeout = self.stresser.config['heartbeat_timeout']
+        while True:
+            await asyncio.sleep(min(timeout / 3, 5))
+            async with self.workers_lock:
+                if self.state != 'running':
+                    continue
+                for proc in self.stresser.find_hung_workers(timeout):
+                    logger.warning(f"Stress worker {proc.pid} missed its heartbeat for {timeout}s, restarting")
+                    await self.in_thread(self.stresser.restart_worker, proc)
+
+    async def watch_duration(self):
+        await asyncio.sleep(self.duration)
+        self.stop('duration')
+
+    async def poll_sensors(self):
+        """Poll sensors, apply thermal pause/resume and render the stats."""
+        max_temp = self.stresser.config['max_temp_celsius']
+        while True:
+            stats = await self.in_thread(self.stresser.get_system_stats)
+            temp = stats.get('cpu_temp') if self.stresser.config['monitor_temp'] else None
+
+            if self.state == 'running' and temp is not None and temp > max_temp:
+                await self.thermal_pause(temp)
+            elif self.state == 'paused' and (temp is None or temp <= max_temp - self.cooldown_hysteresis):
+                logger.info(f"Temperature now {temp}°C, resuming stress test")
+                if self.stresser.tracer:
+                    self.stresser.tracer.instant('temperature below resume threshold', cat='thermal',
+                                                 args={'temp': temp, 'threshold': max_temp - self.cooldown_hysteresis})
+                self.trace_cooldown()
+                self.paused_time += time.time() - self.pause_started
+                async with self.workers_lock:
+                    await self.traced('resume', self.stresser.start_stress_tasks)
+                    self.state = 'running'
+
+            if self.state == 'running':
+                async with self.workers_lock:
+                    await self.in_thread(self.stresser.apply_backpressure, stats)
+
+            if self.render:
+                self.render(stats, self.state)
+            if self.stop_condition:
+                reason = self.stop_condition(stats)
+                if reason:
+                    self.stop(reason)
+            await asyncio.sleep(self.interval)
+
+    async def thermal_pause(self, temp):
+        """Stop the workers and record how long the reaction took."""
+        logger.warning(f"Temperature too high: {temp}°C, pausing stress test")
+        read_at = self.stresser.sensors.last_read_time('temperature')
+        if self.stresser.tracer:
+            self.stresser.tracer.instant('temperature above max', cat='thermal',
+                                         args={'temp': temp, 'threshold': self.stresser.config['max_temp_celsius']})
+        async with self.workers_lock:
+            self.state = 'paused'
+            self.pause_started = time.time()
+            await self.traced('pause', self.stresser.stop_stress_tasks)
+        if read_at is not None:
+            latency = time.monotonic() - read_at
+            self.thermal_latencies.append(latency)
+            logger.info(f"Thermal event to workers stopped: {latency * 1000:.0f} ms")
+        self.thermal_pauses += 1
+
+    def trace_cooldown(self):
+        """Record the thermal pause that is ending as a span on the state track."""
+        if self.stresser.tracer:
+            self.stresser.tracer.complete('cooldown', self.pause_started, track='state', cat='thermal')
+
+    def get_summary(self):
+        """Get supervision counters for the run summary."""
+        paused_time = self.paused_time
+        if self.state == 'paused':
+            paused_time += time.time() - self.pause_started
+        summary = {
+            'stop_reason': self.stop_reason,
+            'worker_restarts': self.stresser.worker_restarts,
+            'thermal_pauses': self.thermal_pauses,
+            'paused_time': paused_time,
+            'backpressure_events': dict(self.stresser.backpressure_events),
+        }
+        if self.thermal_latencies:
+            summary['thermal_latency_ms'] = {
+                'min': min(self.thermal_latencies) * 1000,
+                'avg': sum(self.thermal_latencies) / len(self.thermal_latencies) * 1000,
+                'max': max(self.thermal_latencies) * 1000,
+            }
+        return summary
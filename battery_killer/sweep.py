@@ -0,0 +1,114 @@
+import csv
+import time
+import logging
+from .steady import SteadyStateDetector
+
+logger = logging.getLogger(__name__)
+
+# Columns of the scaling table and CSV
+SWEEP_COLUMNS = ['step', 'cpus', 'workers', 'settled', 'ops_per_sec', 'mb_per_sec', 'ops_per_worker',
+                 'speedup', 'efficiency', 'temp', 'max_temp', 'power', 'ops_per_joule']
+
+def default_steps(num_cores):
+    """Get worker counts doubling from 1, always ending at num_cores."""
+    steps = []
+    cores = 1
+    while cores < num_cores:
+        steps.append(cores)
+        cores *= 2
+    return steps + [num_cores]
+
+class ScalingSweep:
+    """Measure how throughput and power scale with the number of CPU workers."""
+    def __init__(self, stresser, steps=None, settle=120, measure=30, interval=2.0, window=30):
+        self.stresser = stresser
+        self.steps = steps or default_steps(stresser.config['num_cores'])  # Core counts or CPU lists
+        self.settle = settle  # Longest wait for steady state per step, in seconds
+        self.measure = measure  # Seconds measured per step
+        self.interval = interval
+        self.window = window  # Steady-state window per step, in seconds
+        self.results = []
+
+    def run_step(self, step):
+        """Run the CPU workers for one step, let them settle and measure them."""
+        cpus = step if isinstance(step, list) else None
+        self.stresser.config.update({
+            'num_cores': len(cpus) if cpus else step,
+            'cpu_list': cpus,
+            'cpu_only': True,
+        })
+        self.stresser.start_stress_tasks()
+        try:
+            detector = SteadyStateDetector(self.window, self.stresser.config['steady_drift'],
+                                           self.stresser.config['steady_cv'])
+            start = time.time()
+            settled = False
+            while not settled and time.time() - start < self.settle:
+                time.sleep(self.interval)
+                settled = detector.update(self.stresser.get_system_stats('sweep'))
+            settle_time = time.time() - start
+
+            start_totals = {kind: dict(total) for kind, total in self.stresser.workload_totals.items()}
+            start = time.time()
+            temps = []
+            powers = []
+            while time.time() - start < self.measure:
+                time.sleep(self.interval)
+                stats = self.stresser.get_system_stats('sweep')
+                if 'cpu_temp' in stats:
+                    temps.append(stats['cpu_temp'])
+                if 'cpu_power' in stats:
+                    powers.append(stats['cpu_power'])
+            elapsed = time.time() - start
+            workers = len(self.stresser.cpu_processes)
+        finally:
+            self.stresser.stop_stress_tasks()
+
+        rates = {}
+        nbytes = 0
+        for kind, total in self.stresser.workload_totals.items():
+            before = start_totals.get(kind, {'ops': 0, 'bytes': 0})
+            rates[kind] = (total['ops'] - before['ops']) / elapsed
+            nbytes += total['bytes'] - before['bytes']
+        ops_per_sec = sum(rates.values())
+        power = sum(powers) / len(powers) if powers else None
+        result = {
+            'step': ','.join(map(str, cpus)) if cpus else str(step),
+            'cpus': self.stresser.config['num_cores'],
+            'workers': workers,
+            'settled': settled,
+            'settle_time': settle_time,
+            'duration': elapsed,
+            'rates': rates,
+            'ops_per_sec': ops_per_sec,
+            'mb_per_sec': nbytes / elapsed / (1024 * 1024),
+            'ops_per_worker': ops_per_sec / workers if workers else 0.0,
+            'temp': sum(temps) / len(temps) if temps else None,
+            'max_temp': max(temps) if temps else None,
+            'power': power,
+            'ops_per_joule': ops_per_sec / power if power else None,
+        }
+        self.results.append(result)
+        return result
+
+    def run(self):
+        """Run every step and return the results with speedup and efficiency."""
+        for number, step in enumerate(self.steps):
+            logger.info(f"Sweep step {number + 1}/{len(self.steps)}: "
+                        f"{'CPUs ' + ','.join(map(str, step)) if isinstance(step, list) else f'{step} cores'}")
+            self.run_step(step)
+
+        baseline = self.results[0]
+        for result in self.results:
+            ratios = [result['rates'].get(kind, 0.0) / rate for kind, rate in baseline['rates'].items() if rate > 0]
+            result['speedup'] = sum(ratios) / len(ratios) if ratios else None
+            scale = result['cpus'] / baseline['cpus']
+            result['efficiency'] = result['speedup'] / scale if result['speedup'] is not None else None
+        return self.results
+
+def write_csv(results, path):
+    """Write the sweep results as CSV, one row per step."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SWEEP_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
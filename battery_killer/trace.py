@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TraceWriter:
+    """Write a run's timeline as Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+    def __init__(self, path, flush_events=1000):
+        self.path = path
+        self.flush_events = flush_events  # Buffered events that trigger a write
+        self.pid = os.getpid()
+        self.origin = time.time()
+        self.buffer = []
+        self.tracks = {}
+        self.lock = threading.Lock()
+        self.events = 0
+        self.file = open(path, 'w')
+        self.file.write('[')
+        self.add({'ph': 'M', 'name': 'process_name', 'args': {'name': 'battery_killer'}})
+
+    def add(self, event, track=None):
+        """Buffer an event on a track, writing the buffer out once it is full."""
+        event['pid'] = self.pid
+        with self.lock:
+            if track is not None:
+                tid = self.tracks.get(track)
+                if tid is None:
+                    tid = self.tracks[track] = len(self.tracks) + 1
+                    self.buffer.append({'ph': 'M', 'name': 'thread_name', 'pid': self.pid, 'tid': tid,
+                                        'args': {'name': track}})
+                event['tid'] = tid
+            self.buffer.append(event)
+            if len(self.buffer) >= self.flush_events:
+                self._write()
+
+    def timestamp(self, t=None):
+        """Convert a time.time() timestamp to trace microseconds."""
+        return ((time.time() if t is None else t) - self.origin) * 1e6
+
+    def instant(self, name, track='supervisor', cat='event', args=None, t=None):
+        """Record a point in time, e.g. a threshold crossing."""
+        self.add({'ph': 'i', 's': 't', 'name': name, 'cat': cat, 'ts': self.timestamp(t), 'args': args or {}}, track)
+
+    def complete(self, name, start, end=None, track='supervisor', cat='span', args=None):
+        """Record a span from start to end (default: now) in time.time() seconds."""
+        end = time.time() if end is None else end
+        self.add({'ph': 'X', 'name': name, 'cat': cat, 'ts': self.timestamp(start),
+                  'dur': max(0.0, end - start) * 1e6, 'args': args or {}}, track)
+
+    def counter(self, name, values, t=None):
+        """Record the values of a counter track, e.g. {'package': 14.2}."""
+        self.add({'ph': 'C', 'name': name, 'ts': self.timestamp(t), 'args': values})
+
+    def _write(self):
+        # Called with the lock held
+        if not self.buffer or self.file is None:
+            return
+        separator = ',\n' if self.events else '\n'
+        self.file.write(separator + ',\n'.join(json.dumps(event) for event in self.buffer))
+        self.events += len(self.buffer)
+        self.buffer.clear()
+
+    def flush(self):
+        with self.lock:
+            self._write()
+            if self.file:
+                self.file.flush()
+
+    def close(self):
+        """Write the remaining events and close the trace."""
+        with self.lock:
+            if self.file is None:
+                return
+            self._write()
+            self.file.write('\n]\n')
+            self.file.close()
+            self.file = None
+        logger.info(f"Wrote {self.events} trace events to {self.path}")
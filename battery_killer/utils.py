@@ -1,8 +1,8 @@
 import psutil
 import time
+import glob
 import subprocess
 import logging
-import asciichartpy
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +85,102 @@ def get_power_stats():
         logger.debug(f"Could not get power stats: {e}")
     return {}
 
+def get_cpu_frequencies():
+    """Get current per-core CPU frequencies in MHz."""
+    try:
+        freqs = psutil.cpu_freq(percpu=True)
+        if freqs and any(f.current for f in freqs):
+            return [f.current for f in freqs]
+    except Exception as e:
+        logger.debug(f"Could not get CPU frequencies using psutil: {e}")
+
+    # Fallback to cpufreq sysfs (values are in kHz)
+    freqs = []
+    for path in sorted(glob.glob('/sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq'),
+                       key=lambda p: int(p.split('/')[5][3:])):
+        try:
+            with open(path) as f:
+                freqs.append(int(f.read().strip()) / 1000)
+        except Exception as e:
+            logger.debug(f"Could not read {path}: {e}")
+    return freqs or None
+
+def get_base_cpu_frequencies():
+    """Get per-core base (non-turbo) CPU frequencies in MHz from cpufreq sysfs."""
+    freqs = []
+    for path in sorted(glob.glob('/sys/devices/system/cpu/cpu[0-9]*/cpufreq/base_frequency'),
+                       key=lambda p: int(p.split('/')[5][3:])):
+        try:
+            with open(path) as f:
+                freqs.append(int(f.read().strip()) / 1000)
+        except Exception as e:
+            logger.debug(f"Could not read {path}: {e}")
+    return freqs or None
+
+def read_cpu_topology(cpu_dir, name):
+    try:
+        with open(f'{cpu_dir}/topology/{name}') as f:
+            return int(f.read().strip())
+    except Exception:
+        return None
+
+def get_throttle_counts():
+    """Get core and package thermal throttle event counts, each physical core and package counted once."""
+    counts = {}
+    for kind in ('core', 'package'):
+        paths = glob.glob(f'/sys/devices/system/cpu/cpu[0-9]*/thermal_throttle/{kind}_throttle_count')
+        if not paths:
+            continue
+        # Every CPU of a package shows the package counter, and SMT siblings share the core counter
+        seen = set()
+        total = 0
+        for path in paths:
+            cpu_dir = path.rsplit('/thermal_throttle/', 1)[0]
+            package = read_cpu_topology(cpu_dir, 'physical_package_id')
+            key = (package,) if kind == 'package' else (package, read_cpu_topology(cpu_dir, 'core_id'))
+            if None in key:
+                key = (cpu_dir,)
+            if key in seen:
+                continue
+            try:
+                with open(path) as f:
+                    total += int(f.read().strip())
+                seen.add(key)
+            except Exception as e:
+                logger.debug(f"Could not read {path}: {e}")
+        counts[kind] = total
+    return counts
+
+def get_pressure():
+    """Get PSI stall percentages (10 s average) per resource from /proc/pressure."""
+    pressure = {}
+    for resource in ('cpu', 'memory', 'io'):
+        try:
+            with open(f'/proc/pressure/{resource}') as f:
+                for line in f:
+                    kind, *fields = line.split()
+                    values = dict(field.split('=') for field in fields)
+                    pressure.setdefault(resource, {})[kind] = float(values['avg10'])
+        except Exception as e:
+            logger.debug(f"Could not read /proc/pressure/{resource}: {e}")  # Not Linux, or PSI disabled
+    return pressure
+
+def get_schedstat(pid):
+    """Get (run seconds, runqueue wait seconds) summed across a process's threads."""
+    run = wait = 0
+    paths = glob.glob(f'/proc/{pid}/task/*/schedstat')
+    if not paths:
+        return None
+    for path in paths:
+        try:
+            with open(path) as f:
+                fields = f.read().split()
+            run += int(fields[0])
+            wait += int(fields[1])
+        except Exception as e:
+            logger.debug(f"Could not read {path}: {e}")  # Thread exited
+    return run / 1e9, wait / 1e9
+
 def get_detailed_system_stats():
     """Get detailed system statistics."""
     # Calculate disk usage percentage
@@ -108,6 +204,14 @@ def get_detailed_system_stats():
     if temp is not None:
         stats['cpu_temp'] = temp
     
+    # Add per-core frequencies and throttle counters
+    cpu_freq = get_cpu_frequencies()
+    if cpu_freq:
+        stats['cpu_freq'] = cpu_freq
+    throttle_counts = get_throttle_counts()
+    if throttle_counts:
+        stats['throttle_counts'] = throttle_counts
+    
     # Try to get fan speed
     fan_speed = get_fan_speed()
     if fan_speed is not None:
@@ -126,6 +230,8 @@ def create_ascii_graph(data, title, width=60, height=15):
     if not data:
         return ""
     
+    import asciichartpy  # Chart backend, loaded on first use
+    
     config = {
         'height': height,
         'colors': [
@@ -162,3 +268,64 @@ def format_bytes(bytes, suffix="B"):
             return f"{bytes:.2f} {unit}{suffix}"
         bytes /= 1024.0
     return f"{bytes:.2f} E{suffix}"
+
+def parse_size(text):
+    """Parse a human readable size such as '4K', '16M' or '24G' into bytes."""
+    text = str(text).strip().upper().rstrip('B')
+    units = {'K': 1024, 'M': 1024**2, 'G': 1024**3, 'T': 1024**4}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def parse_memory_target(text):
+    """Parse a memory target such as '60%' of physical RAM or '24G' into bytes."""
+    text = str(text).strip()
+    if text.endswith('%'):
+        return int(psutil.virtual_memory().total * float(text[:-1]) / 100)
+    return parse_size(text)
+
+def parse_cpu_list(text):
+    """Parse a CPU list such as '0-3,8' into sorted CPU numbers."""
+    cpus = set()
+    for part in str(text).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+def get_numa_nodes():
+    """Get the CPUs of each NUMA node as {node: [cpus]}, one node without NUMA support."""
+    nodes = {}
+    for path in glob.glob('/sys/devices/system/node/node[0-9]*/cpulist'):
+        try:
+            with open(path) as f:
+                cpus = parse_cpu_list(f.read())
+        except (OSError, ValueError):
+            continue
+        if cpus:
+            nodes[int(path.split('/')[-2][4:])] = cpus
+    return nodes or {0: list(range(psutil.cpu_count()))}
+
+def get_numa_pages(pid):
+    """Get a process's resident memory per NUMA node in bytes from /proc/<pid>/numa_maps."""
+    nodes = {}
+    try:
+        with open(f'/proc/{pid}/numa_maps') as f:
+            for line in f:
+                fields = line.split()
+                page_size = 4096
+                for field in fields:
+                    if field.startswith('kernelpagesize_kB='):
+                        page_size = int(field.split('=')[1]) * 1024
+                for field in fields:
+                    if field.startswith('N') and '=' in field:
+                        node, pages = field[1:].split('=')
+                        nodes[int(node)] = nodes.get(int(node), 0) + int(pages) * page_size
+    except (OSError, ValueError):
+        return {}
+    return nodes
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Check that importing Battery Killer stays fast and side-effect free.
+
+Runs ``python -X importtime`` on each module in a clean temporary directory,
+takes the best import time over several runs and fails (exit 1) when a module
+exceeds its budget, pulls in a lazily loaded backend, or leaves files behind.
+Budgets cover the package's own import cost: the time spent importing the
+dependencies it cannot do without (psutil, logging, argparse...) is measured
+in the same run and subtracted, as it varies several-fold between hosts.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Module -> import time budget in milliseconds, on top of the required dependencies
+BUDGETS = {
+    'battery_killer': 5,
+    'battery_killer.core': 25,
+    'battery_killer.scripts.battery_killer': 40,
+}
+
+# Dependencies every entry point needs, not counted against the budgets
+REQUIRED_MODULES = {'psutil', 'logging', 'json', 'subprocess', 'signal', 'argparse'}
+
+# Backends that must only be loaded on first use
+LAZY_MODULES = ['asyncio', 'asciichartpy', 'numpy', 'tempfile', 'battery_killer.supervisor', 'battery_killer.fleet',
+                'battery_killer.sensors', 'battery_killer.energy', 'battery_killer.summary', 'battery_killer.steady']
+
+def measure(module, cwd):
+    """Get the import time (ms) of module, less its required dependencies, and every module it loaded."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, cwd=cwd, env=env, check=True)
+    elapsed = None
+    loaded = set()
+    # Imports are listed after the modules they import, indented by depth
+    pending = []  # (depth, required dependency time in the subtree)
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        if not cumulative_us.strip().isdigit():
+            continue
+        depth = len(name) - len(name.lstrip())
+        name = name.strip()
+        loaded.add(name)
+        cumulative = int(cumulative_us) / 1000
+        required = 0.0
+        while pending and pending[-1][0] > depth:
+            required += pending.pop()[1]
+        pending.append((depth, cumulative if name in REQUIRED_MODULES else required))
+        if name == module:
+            elapsed = cumulative - required
+    return elapsed, loaded
+
+def main():
+    parser = argparse.ArgumentParser(description='Battery Killer import time budget check')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per module, best one counts (default: 5)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget, e.g. for slow CI hosts')
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as cwd:
+        # Warm the bytecode cache so the first run isn't charged for compilation
+        measure('battery_killer.scripts.battery_killer', cwd)
+
+        for module, budget in BUDGETS.items():
+            budget *= args.scale
+            times = []
+            for _ in range(args.runs):
+                elapsed, loaded = measure(module, cwd)
+                times.append(elapsed)
+            best = min(times)
+            status = 'ok' if best <= budget else 'OVER BUDGET'
+            print(f"{module:<40s} {best:7.1f} ms (budget {budget:.0f} ms) {status}")
+            if best > budget:
+                failures.append(f"{module} took {best:.1f} ms")
+
+            eager = [name for name in LAZY_MODULES if name in loaded]
+            if eager:
+                failures.append(f"{module} eagerly imports {', '.join(eager)}")
+
+        leftovers = os.listdir(cwd)
+        if leftovers:
+            failures.append(f"importing created files: {', '.join(leftovers)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
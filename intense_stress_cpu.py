@@ -1,10 +1,154 @@
 
+import os
+import json
+import mmap
+import signal
+import threading
+import time
+
+WORKER_CONFIG = json.loads(os.environ.get('BATTERY_KILLER_WORKER_CONFIG', '{}'))
+_counters = {}
+_latency = {}
+_counters_lock = threading.Lock()
+_thread_cpu = threading.local()
+
+def record(kind, ops=1, nbytes=0):
+    """Count completed work and the thread CPU time spent on it"""
+    now = time.thread_time()
+    cpu = now - getattr(_thread_cpu, 'last', 0.0)
+    _thread_cpu.last = now
+    with _counters_lock:
+        counter = _counters.setdefault(kind, [0, 0, 0.0])
+        counter[0] += ops
+        counter[1] += nbytes
+        counter[2] += cpu
+
+def record_latency(kind, seconds):
+    """Count an operation latency in the kind's log-linear microsecond histogram"""
+    # Same buckets as battery_killer.latency: exact below 64 us, then 32 per power of two
+    value = int(seconds * 1e6)
+    if value < 64:
+        index = max(value, 0)
+    else:
+        shift = value.bit_length() - 6
+        index = 64 + (shift - 1) * 32 + (value >> shift) - 32
+    with _counters_lock:
+        histogram = _latency.setdefault(kind, {})
+        histogram[index] = histogram.get(index, 0) + 1
+
+def timed(kind, func, *args, nbytes=0):
+    """Run one operation, recording it and its latency"""
+    start = time.perf_counter()
+    result = func(*args)
+    record_latency(kind, time.perf_counter() - start)
+    record(kind, nbytes=nbytes)
+    return result
+
+def scratch_path(name):
+    """Get a per-process directory under the supervisor's scratch dir (removed on shutdown)"""
+    scratch_dir = WORKER_CONFIG.get('scratch_dir')
+    if not scratch_dir:
+        import tempfile
+        return tempfile.mkdtemp(prefix=f'battery_killer_{name}_')
+    path = os.path.join(scratch_dir, str(os.getpid()), name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def stats_reporter(interval=1.0):
+    """Publish work counters for the supervisor"""
+    stats_dir = WORKER_CONFIG.get('stats_dir')
+    if not stats_dir:
+        return
+    path = os.path.join(stats_dir, f'{os.getpid()}.json')
+    while True:
+        time.sleep(interval)
+        with _counters_lock:
+            counters = {kind: {'ops': c[0], 'bytes': c[1], 'cpu': c[2]} for kind, c in _counters.items()}
+            latency = {kind: dict(histogram) for kind, histogram in _latency.items()}
+        try:
+            with open(path + '.tmp', 'w') as f:
+                json.dump({'time': time.time(), 'counters': counters, 'latency': latency}, f)
+            os.replace(path + '.tmp', path)  # Atomic so readers never see partial files
+        except OSError:
+            pass
+
+def start_stats_reporter():
+    threading.Thread(target=stats_reporter, daemon=True).start()
+
+def apply_sched_policy():
+    """Lower this worker's CPU (and optionally I/O) priority for co-tenant runs"""
+    # Set before any thread starts so every thread and child inherits it
+    policy = WORKER_CONFIG.get('sched_policy')
+    nice = WORKER_CONFIG.get('nice', 19)
+    if policy == 'idle':
+        try:
+            os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        except (AttributeError, OSError):
+            policy, nice = 'nice', 19  # No SCHED_IDLE on this platform, lowest nice is closest
+    if policy == 'nice':
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+    if WORKER_CONFIG.get('io_idle'):
+        try:
+            import psutil
+            psutil.Process().ionice(psutil.IOPRIO_CLASS_IDLE)
+        except Exception:
+            pass  # No I/O priority classes on this platform
+
+def bind_numa_node():
+    """Run on the NUMA node's CPUs so first-touched memory lands on that node, or on a chosen one"""
+    # Set before any thread starts or allocates, like the scheduling policy
+    cpus = WORKER_CONFIG.get('numa_cpus')
+    if cpus:
+        try:
+            os.sched_setaffinity(0, cpus)
+        except (AttributeError, OSError):
+            pass
+    mem_node = WORKER_CONFIG.get('numa_mem_node')
+    if mem_node is not None:
+        # No set_mempolicy in the os module: MPOL_BIND through the raw syscall
+        try:
+            import ctypes
+            import platform
+            number = {'x86_64': 238, 'aarch64': 237}[platform.machine()]
+            mask = ctypes.c_ulong(1 << mem_node)
+            ctypes.CDLL(None, use_errno=True).syscall(number, 2, ctypes.byref(mask), ctypes.sizeof(mask) * 8 + 1)
+        except Exception:
+            pass  # Not Linux, or an architecture without a known syscall number
+
+def map_region(size):
+    """Map an anonymous region with the requested transparent huge page advice"""
+    region = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+    advice = {'huge': getattr(mmap, 'MADV_HUGEPAGE', None),
+              'nohuge': getattr(mmap, 'MADV_NOHUGEPAGE', None)}.get(WORKER_CONFIG.get('mem_hugepages'))
+    if advice is not None:
+        try:
+            region.madvise(advice)
+        except OSError:
+            pass
+    return region
+
+apply_sched_policy()
+bind_numa_node()
+
+# Set by the supervisor (SIGUSR1) when memory stalls show up in PSI
+memory_pressure = threading.Event()
+try:
+    signal.signal(signal.SIGUSR1, lambda signum, frame: memory_pressure.set())
+except (AttributeError, ValueError):
+    pass
+
 import multiprocessing
 import threading
 import math
 import random
 import hashlib
 import time
+import zlib
+import lzma
+import re
 
 def cpu_intensive_math():
     """Intensive mathematical operations"""
@@ -21,16 +165,18 @@ def cpu_intensive_math():
             for j in range(2, int(math.sqrt(n)) + 1):
                 if n % j == 0:
                     break
+        record('math')
 
-def cpu_intensive_crypto():
+def cpu_intensive_crypto(algorithm):
     """Intensive cryptographic operations"""
+    # Hash large buffers so hashlib releases the GIL and threads run in parallel
+    buffer_size = min(max(WORKER_CONFIG.get('hash_buffer_size', 1024 * 1024), 4 * 1024), 16 * 1024 * 1024)
+    data = memoryview(os.urandom(buffer_size))
     while True:
-        # Hash computations (CPU intensive)
-        data = str(random.random() * 1000000).encode()
-        for _ in range(10000):
-            data = hashlib.sha256(data).digest()
-            data = hashlib.md5(data).digest()
-            data = hashlib.sha1(data).digest()
+        digest = hashlib.new(algorithm)
+        digest.update(data)
+        digest.digest()
+        record(algorithm, nbytes=buffer_size)
 
 def cpu_intensive_loops():
     """Intensive nested loops"""
@@ -41,6 +187,7 @@ def cpu_intensive_loops():
             for j in range(1000):
                 total += (i * j) ** 0.5
                 total = total % 1000000
+        record('loops')
 
 def memory_intensive():
     """Memory allocation and operations"""
@@ -55,39 +202,142 @@ def memory_intensive():
             # Mathematical operations on arrays
             result = sum(x ** 2 for x in arr[:10000])
             arrays.append(arr[:1000])  # Keep some data in memory
+            nbytes = len(arr) * 8 * 3  # Pointer array written, sorted and reversed
             
             # Limit memory usage to prevent system crash
             if len(arrays) > 50:
                 arrays = arrays[-25:]  # Keep only recent arrays
+            if memory_pressure.is_set():
+                memory_pressure.clear()
+                arrays = []  # Shed before the OOM killer gets involved
+            record('memory', nbytes=nbytes)
         except MemoryError:
             arrays = arrays[-10:]  # Reduce memory if needed
 
+def build_corpus(size=1024 * 1024, seed=42):
+    """Build a synthetic service-log corpus shared by the application kernels"""
+    rng = random.Random(seed)
+    words = ['GET', 'POST', 'user', 'order', 'cart', 'checkout', 'payment', 'session',
+             'timeout', 'retry', 'cache', 'miss', 'hit', 'error', 'warning', 'ok']
+    records = []
+    total = 0
+    while total < size:
+        record = {
+            'id': rng.randrange(10**9),
+            'ts': 1700000000 + rng.randrange(10**6),
+            'level': rng.choice(['INFO', 'WARN', 'ERROR']),
+            'path': '/' + '/'.join(rng.choice(words) for _ in range(3)),
+            'latency_ms': round(rng.expovariate(0.05), 3),
+            'client': f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}",
+            'message': ' '.join(rng.choice(words) for _ in range(rng.randrange(5, 20))),
+        }
+        records.append(record)
+        total += len(record['message']) + 96
+    text = '\n'.join(json.dumps(r) for r in records).encode()
+    return records, text
+
+def app_zlib(text):
+    """zlib compress/decompress round trips"""
+    while True:
+        zlib.decompress(zlib.compress(text, 6))
+        record('zlib', nbytes=len(text))
+
+def app_lzma(text):
+    """lzma compress/decompress round trips"""
+    chunk = text[:256 * 1024]  # lzma is slow, keep iterations short
+    while True:
+        lzma.decompress(lzma.compress(chunk, preset=1))
+        record('lzma', nbytes=len(chunk))
+
+def app_json(records):
+    """JSON encode/decode of service records"""
+    while True:
+        encoded = json.dumps(records)
+        json.loads(encoded)
+        record('json', ops=len(records), nbytes=len(encoded))
+
+def app_regex(text):
+    """Regex scanning for errors, client addresses and slow requests"""
+    patterns = [
+        re.compile(rb'"level": "ERROR".*?"path": "([^"]+)"'),
+        re.compile(rb'\b10\.\d{1,3}\.\d{1,3}\.\d{1,3}\b'),
+        re.compile(rb'"latency_ms": (\d{3,}\.\d+)'),
+    ]
+    while True:
+        matches = 0
+        for pattern in patterns:
+            matches += sum(1 for _ in pattern.finditer(text))
+        record('regex', ops=matches, nbytes=len(text) * len(patterns))
+
+def app_sort(records):
+    """Large multi-key sorts of service records"""
+    latencies = [r['latency_ms'] for r in records]
+    while True:
+        sorted(records, key=lambda r: (r['level'], r['path'], -r['latency_ms']))
+        sorted(latencies * 8)
+        record('sort', ops=len(records) + len(latencies) * 8)
+
+APP_KERNELS = {
+    'zlib': (app_zlib, 'text'),
+    'lzma': (app_lzma, 'text'),
+    'json': (app_json, 'records'),
+    'regex': (app_regex, 'text'),
+    'sort': (app_sort, 'records'),
+}
+
 def stress_cpu_core():
     """Main stress function combining all intensive operations"""
+    # Pinned by scaling sweeps over CPU lists
+    cpu = WORKER_CONFIG.get('cpu')
+    if cpu is not None:
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except (AttributeError, OSError):
+            pass  # No affinity control on this platform
+    
     # Start multiple threads per core for maximum intensity
     threads = []
+    cpu_kernels = WORKER_CONFIG.get('cpu_kernels', ['math', 'crypto', 'loops', 'memory'])
     
-    # Math thread
-    t1 = threading.Thread(target=cpu_intensive_math, daemon=True)
-    threads.append(t1)
-    
-    # Crypto thread  
-    t2 = threading.Thread(target=cpu_intensive_crypto, daemon=True)
-    threads.append(t2)
-    
-    # Loops thread
-    t3 = threading.Thread(target=cpu_intensive_loops, daemon=True)
-    threads.append(t3)
+    for _ in range(WORKER_CONFIG.get('kernel_threads', 1)):
+        # Math thread
+        if 'math' in cpu_kernels:
+            t1 = threading.Thread(target=cpu_intensive_math, daemon=True)
+            threads.append(t1)
+        
+        # Crypto threads, one per hash algorithm
+        if 'crypto' in cpu_kernels:
+            for algorithm in WORKER_CONFIG.get('hash_algorithms', ['sha256', 'sha512', 'blake2b', 'sha3_256']):
+                t2 = threading.Thread(target=cpu_intensive_crypto, args=(algorithm,), daemon=True)
+                threads.append(t2)
+        
+        # Loops thread
+        if 'loops' in cpu_kernels:
+            t3 = threading.Thread(target=cpu_intensive_loops, daemon=True)
+            threads.append(t3)
+        
+        # Memory thread
+        if 'memory' in cpu_kernels:
+            t4 = threading.Thread(target=memory_intensive, daemon=True)
+            threads.append(t4)
     
-    # Memory thread
-    t4 = threading.Thread(target=memory_intensive, daemon=True)
-    threads.append(t4)
+    # Application kernels over a shared preallocated corpus
+    app_kernels = WORKER_CONFIG.get('app_kernels', [])
+    if app_kernels:
+        records, text = build_corpus()
+        corpus = {'records': records, 'text': text}
+        for name in app_kernels:
+            kernel, data = APP_KERNELS[name]
+            threads.append(threading.Thread(target=kernel, args=(corpus[data],), daemon=True))
     
     # Start all threads
     for t in threads:
         t.start()
+    start_stats_reporter()
     
-    # Keep main thread busy too
+    # Keep main thread busy too (FP work, so only in mixes that include math)
+    while 'math' not in cpu_kernels:
+        time.sleep(1)
     while True:
         x = random.random() * 1000
         for _ in range(100000):
@@ -1,13 +1,154 @@
 
+import os
+import json
+import mmap
+import signal
+import threading
+import time
+
+WORKER_CONFIG = json.loads(os.environ.get('BATTERY_KILLER_WORKER_CONFIG', '{}'))
+_counters = {}
+_latency = {}
+_counters_lock = threading.Lock()
+_thread_cpu = threading.local()
+
+def record(kind, ops=1, nbytes=0):
+    """Count completed work and the thread CPU time spent on it"""
+    now = time.thread_time()
+    cpu = now - getattr(_thread_cpu, 'last', 0.0)
+    _thread_cpu.last = now
+    with _counters_lock:
+        counter = _counters.setdefault(kind, [0, 0, 0.0])
+        counter[0] += ops
+        counter[1] += nbytes
+        counter[2] += cpu
+
+def record_latency(kind, seconds):
+    """Count an operation latency in the kind's log-linear microsecond histogram"""
+    # Same buckets as battery_killer.latency: exact below 64 us, then 32 per power of two
+    value = int(seconds * 1e6)
+    if value < 64:
+        index = max(value, 0)
+    else:
+        shift = value.bit_length() - 6
+        index = 64 + (shift - 1) * 32 + (value >> shift) - 32
+    with _counters_lock:
+        histogram = _latency.setdefault(kind, {})
+        histogram[index] = histogram.get(index, 0) + 1
+
+def timed(kind, func, *args, nbytes=0):
+    """Run one operation, recording it and its latency"""
+    start = time.perf_counter()
+    result = func(*args)
+    record_latency(kind, time.perf_counter() - start)
+    record(kind, nbytes=nbytes)
+    return result
+
+def scratch_path(name):
+    """Get a per-process directory under the supervisor's scratch dir (removed on shutdown)"""
+    scratch_dir = WORKER_CONFIG.get('scratch_dir')
+    if not scratch_dir:
+        import tempfile
+        return tempfile.mkdtemp(prefix=f'battery_killer_{name}_')
+    path = os.path.join(scratch_dir, str(os.getpid()), name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def stats_reporter(interval=1.0):
+    """Publish work counters for the supervisor"""
+    stats_dir = WORKER_CONFIG.get('stats_dir')
+    if not stats_dir:
+        return
+    path = os.path.join(stats_dir, f'{os.getpid()}.json')
+    while True:
+        time.sleep(interval)
+        with _counters_lock:
+            counters = {kind: {'ops': c[0], 'bytes': c[1], 'cpu': c[2]} for kind, c in _counters.items()}
+            latency = {kind: dict(histogram) for kind, histogram in _latency.items()}
+        try:
+            with open(path + '.tmp', 'w') as f:
+                json.dump({'time': time.time(), 'counters': counters, 'latency': latency}, f)
+            os.replace(path + '.tmp', path)  # Atomic so readers never see partial files
+        except OSError:
+            pass
+
+def start_stats_reporter():
+    threading.Thread(target=stats_reporter, daemon=True).start()
+
+def apply_sched_policy():
+    """Lower this worker's CPU (and optionally I/O) priority for co-tenant runs"""
+    # Set before any thread starts so every thread and child inherits it
+    policy = WORKER_CONFIG.get('sched_policy')
+    nice = WORKER_CONFIG.get('nice', 19)
+    if policy == 'idle':
+        try:
+            os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        except (AttributeError, OSError):
+            policy, nice = 'nice', 19  # No SCHED_IDLE on this platform, lowest nice is closest
+    if policy == 'nice':
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+    if WORKER_CONFIG.get('io_idle'):
+        try:
+            import psutil
+            psutil.Process().ionice(psutil.IOPRIO_CLASS_IDLE)
+        except Exception:
+            pass  # No I/O priority classes on this platform
+
+def bind_numa_node():
+    """Run on the NUMA node's CPUs so first-touched memory lands on that node, or on a chosen one"""
+    # Set before any thread starts or allocates, like the scheduling policy
+    cpus = WORKER_CONFIG.get('numa_cpus')
+    if cpus:
+        try:
+            os.sched_setaffinity(0, cpus)
+        except (AttributeError, OSError):
+            pass
+    mem_node = WORKER_CONFIG.get('numa_mem_node')
+    if mem_node is not None:
+        # No set_mempolicy in the os module: MPOL_BIND through the raw syscall
+        try:
+            import ctypes
+            import platform
+            number = {'x86_64': 238, 'aarch64': 237}[platform.machine()]
+            mask = ctypes.c_ulong(1 << mem_node)
+            ctypes.CDLL(None, use_errno=True).syscall(number, 2, ctypes.byref(mask), ctypes.sizeof(mask) * 8 + 1)
+        except Exception:
+            pass  # Not Linux, or an architecture without a known syscall number
+
+def map_region(size):
+    """Map an anonymous region with the requested transparent huge page advice"""
+    region = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+    advice = {'huge': getattr(mmap, 'MADV_HUGEPAGE', None),
+              'nohuge': getattr(mmap, 'MADV_NOHUGEPAGE', None)}.get(WORKER_CONFIG.get('mem_hugepages'))
+    if advice is not None:
+        try:
+            region.madvise(advice)
+        except OSError:
+            pass
+    return region
+
+apply_sched_policy()
+bind_numa_node()
+
+# Set by the supervisor (SIGUSR1) when memory stalls show up in PSI
+memory_pressure = threading.Event()
+try:
+    signal.signal(signal.SIGUSR1, lambda signum, frame: memory_pressure.set())
+except (AttributeError, ValueError):
+    pass
+
 import threading
 import time
 import random
 import os
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 def disk_write_stress():
     """Intensive disk write operations"""
-    temp_dir = tempfile.mkdtemp()
+    temp_dir = scratch_path('disk_write')
     file_count = 0
     
     while True:
@@ -20,6 +161,7 @@ def disk_write_stress():
                 f.write(data)
                 f.flush()
                 os.fsync(f.fileno())  # Force write to disk
+            record('disk_write', nbytes=len(data))
             
             file_count += 1
             
@@ -48,12 +190,42 @@ def disk_read_stress():
                             chunk = f.read(1024 * 1024)  # 1MB chunks
                             if not chunk:
                                 break
+                            record('disk_read', nbytes=len(chunk))
                 except:
                     pass
         except:
             time.sleep(0.1)
 
+def write_file(path, payload):
+    with open(path, 'wb') as f:
+        f.write(payload)
 
+def list_dir(path):
+    with os.scandir(path) as entries:
+        return sum(1 for _ in entries)
+
+def metadata_stress(root):
+    """Create/stat/rename/readdir/unlink storms over a directory of small files"""
+    os.makedirs(root, exist_ok=True)
+    payload = os.urandom(WORKER_CONFIG.get('metadata_file_size', 4096))
+    names = [os.path.join(root, f'file_{i}') for i in range(WORKER_CONFIG.get('metadata_files', 256))]
+    while True:
+        try:
+            for name in names:
+                timed('meta_create', write_file, name, payload, nbytes=len(payload))
+                timed('meta_stat', os.stat, name)
+                timed('meta_rename', os.rename, name, name + '.renamed')
+            timed('meta_readdir', list_dir, root)
+            for name in names:
+                timed('meta_unlink', os.unlink, name + '.renamed')
+        except OSError:
+            # Disk full or a half-finished cycle: start again from an empty directory
+            for entry in os.listdir(root):
+                try:
+                    os.unlink(os.path.join(root, entry))
+                except OSError:
+                    pass
+            time.sleep(0.1)
 
 if __name__ == '__main__':
     # Start I/O stress threads
@@ -70,6 +242,15 @@ if __name__ == '__main__':
     for t in threads:
         t.start()
     
+    # Metadata storms, one directory tree per pool thread
+    metadata_threads = WORKER_CONFIG.get('metadata_threads', 0)
+    if metadata_threads:
+        metadata_root = scratch_path('metadata')
+        pool = ThreadPoolExecutor(max_workers=metadata_threads, thread_name_prefix='metadata')
+        for i in range(metadata_threads):
+            pool.submit(metadata_stress, os.path.join(metadata_root, f'tree_{i}'))
+    start_stats_reporter()
+    
     # Keep main thread alive
     while True:
         time.sleep(1)
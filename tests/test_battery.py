@@ -0,0 +1,51 @@
+import types
+
+import pytest
+
+from battery_killer import battery
+from battery_killer.battery import VirtualBattery, curve_voltage, curve_energy
+
+FLAT_CURVE = ((0.0, 10.0), (1.0, 10.0))
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(battery, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+def make_battery(tmp_path, monkeypatch, watts, **kwargs):
+    # An empty powercap root leaves the pack without RAPL
+    pack = VirtualBattery(powercap_root=str(tmp_path), **kwargs)
+    monkeypatch.setattr(pack, 'measure_power', lambda: watts)
+    return pack
+
+def test_curve_helpers():
+    assert curve_voltage(battery.DEFAULT_VOLTAGE_CURVE, 0.2) == pytest.approx(3.65)
+    assert curve_energy(FLAT_CURVE, 0.5) == 5.0
+
+def test_drain_and_secsleft(tmp_path, monkeypatch, clock):
+    pack = make_battery(tmp_path, monkeypatch, 50.0, capacity_wh=100.0, voltage_curve=FLAT_CURVE, self_discharge=0)
+    assert pack.source == 'cpu model'
+    clock[0] += 3600
+    reading = pack.read()
+    assert reading.percent == 50.0
+    assert reading.secsleft == 3600
+    assert reading.power_plugged is False
+
+    stats = pack.get_stats()
+    assert stats['drained_wh'] == pytest.approx(50.0)
+    assert stats['avg_watts'] == pytest.approx(50.0)
+
+def test_time_scale_compresses_drain(tmp_path, monkeypatch, clock):
+    pack = make_battery(tmp_path, monkeypatch, 50.0, capacity_wh=100.0, voltage_curve=FLAT_CURVE,
+                        self_discharge=0, time_scale=60.0)
+    clock[0] += 30
+    assert pack.read().percent == 75.0
+    assert pack.get_stats()['virtual_time'] == 1800
+
+def test_drain_stops_at_empty(tmp_path, monkeypatch, clock):
+    pack = make_battery(tmp_path, monkeypatch, 50.0, capacity_wh=10.0, voltage_curve=FLAT_CURVE, start_percent=10.0)
+    clock[0] += 3600
+    reading = pack.read()
+    assert reading.percent == 0.0
+    assert reading.secsleft == 0
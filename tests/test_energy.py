@@ -0,0 +1,57 @@
+import types
+
+import pytest
+
+from battery_killer import energy
+from battery_killer.energy import RaplReader
+
+MAX_RANGE = 262143328850
+
+def write_zone(root, zone, name, energy_uj, max_range=MAX_RANGE):
+    path = root / zone
+    path.mkdir(exist_ok=True)
+    (path / 'name').write_text(f'{name}\n')
+    (path / 'max_energy_range_uj').write_text(f'{max_range}\n')
+    if energy_uj is not None:
+        (path / 'energy_uj').write_text(f'{energy_uj}\n')
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(energy, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+@pytest.fixture
+def powercap(tmp_path):
+    # Two sockets, core and dram subzones of the first, and a zone without a readable counter
+    write_zone(tmp_path, 'intel-rapl:0', 'package-0', MAX_RANGE - 1_000_000)
+    write_zone(tmp_path, 'intel-rapl:1', 'package-1', 5_000_000)
+    write_zone(tmp_path, 'intel-rapl:0:0', 'core', 1_000_000)
+    write_zone(tmp_path, 'intel-rapl:0:1', 'dram', 2_000_000)
+    write_zone(tmp_path, 'intel-rapl:2', 'psys', None)
+    return tmp_path
+
+def test_discover_groups_domains(powercap):
+    reader = RaplReader(str(powercap))
+    assert reader.available
+    domains = sorted(domain for _, domain, _ in reader.zones)
+    assert domains == ['core', 'dram', 'package', 'package']
+
+def test_read_sums_packages_and_corrects_wraparound(powercap, clock):
+    reader = RaplReader(str(powercap))
+    assert reader.read() == {}
+
+    clock[0] += 2.0
+    # package-0 wraps: 1 J up to the range and 3 J past zero
+    write_zone(powercap, 'intel-rapl:0', 'package-0', 3_000_000)
+    write_zone(powercap, 'intel-rapl:1', 'package-1', 9_000_000)
+    write_zone(powercap, 'intel-rapl:0:0', 'core', 3_000_000)
+    write_zone(powercap, 'intel-rapl:0:1', 'dram', 2_500_000)
+    power = reader.read()
+    assert power == pytest.approx({'package': 4.0, 'core': 1.0, 'dram': 0.25})
+    assert reader.total_joules == pytest.approx({'package': 8.0, 'core': 2.0, 'dram': 0.5})
+
+def test_missing_powercap_is_unavailable(tmp_path):
+    reader = RaplReader(str(tmp_path))
+    assert not reader.available
+    assert reader.read() == {}
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import time
+
+from battery_killer.fleet import (FleetController, MSG_CONFIG, MSG_DONE, MSG_START, MSG_STARTED, START_TIME,
+                                  encode_frame, encode_telemetry, read_frame)
+
+STATS = {
+    'cpu_percent': [50.0, 70.0],
+    'cpu_temp': 60.0,
+    'battery': None,
+    'workloads': {'math': {'mb_per_sec': 2.0, 'ops_per_sec': 10.0}},
+}
+
+async def start_agent(telemetry_frames):
+    """Serve the agent side of the protocol on a free localhost port."""
+    async def handle(reader, writer):
+        msg_type, payload = await read_frame(reader)
+        assert msg_type == MSG_CONFIG
+        assert json.loads(payload)['schedule'] == [{'duration': 1, 'cores': 1}]
+        msg_type, payload = await read_frame(reader)
+        assert msg_type == MSG_START
+        (start_at,) = START_TIME.unpack(payload)
+        await asyncio.sleep(max(0, start_at - time.time()))
+        writer.write(encode_frame(MSG_STARTED, START_TIME.pack(time.time())))
+        for _ in range(telemetry_frames):
+            writer.write(encode_telemetry(STATS, 2, False))
+        summary = {'worker_restarts': 1, 'thermal_pauses': 0, 'paused_time': 0.0}
+        writer.write(encode_frame(MSG_DONE, json.dumps(summary).encode()))
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    return server, server.sockets[0].getsockname()[1]
+
+async def run_fleet(telemetry_frames):
+    servers = [await start_agent(frames) for frames in telemetry_frames]
+    snapshots = []
+    controller = FleetController([('127.0.0.1', port) for _, port in servers],
+                                 schedule=[{'duration': 1, 'cores': 1}], start_delay=0.2, render=snapshots.append)
+    try:
+        summary = await asyncio.wait_for(controller.run(), 10)
+    finally:
+        for server, _ in servers:
+            server.close()
+    return controller, summary, snapshots
+
+def test_fleet_aggregates_agents():
+    controller, summary, snapshots = asyncio.run(run_fleet([3, 3]))
+    assert summary['agents'] == 2
+    assert summary['started'] == 2
+    assert summary['silent'] == []
+    assert summary['start_spread_ms'] < 1000
+    assert summary['ops_per_sec'] == 20.0
+    assert summary['mb_per_sec'] == 4.0
+    assert summary['worker_restarts'] == 2
+    assert snapshots[-1]['agents'] == 2
+    assert snapshots[-1]['workers'] == 4
+    assert snapshots[-1]['cpu_percent'] == 60.0
+
+def test_fleet_flags_agents_without_telemetry():
+    controller, summary, _ = asyncio.run(run_fleet([3, 0]))
+    silent_agent = controller.agent_name(1)
+    assert summary['started'] == 2
+    assert summary['silent'] == [silent_agent]
+    assert summary['ops_per_sec'] == 10.0
@@ -0,0 +1,56 @@
+import math
+
+from battery_killer.history import RollupHistory, lttb, minmax_downsample
+
+START = 1_000_000.0
+
+def filled_history(seconds, value=lambda t: 50.0, **kwargs):
+    history = RollupHistory(**kwargs)
+    for t in range(seconds):
+        history.append(value(t), timestamp=START + t)
+    return history
+
+def test_series_uses_finest_tier_covering_window():
+    history = filled_history(3 * 3600)
+    now = START + 3 * 3600
+
+    short = history.series(window=1800, now=now)
+    assert len(short) == 1800
+    assert short[1][0] - short[0][0] == 1
+
+    long = history.series(window=3 * 3600, now=now)
+    assert long[1][0] - long[0][0] == 10
+    assert len(long) == 3 * 3600 // 10
+
+def test_series_keeps_bucket_extremes():
+    history = filled_history(60, value=lambda t: 90.0 if t == 25 else 50.0, tiers=((10, 100),))
+    ((_, mean, low, high),) = [p for p in history.series(window=60, now=START + 60) if p[0] == START + 20]
+    assert (low, high) == (50.0, 90.0)
+    assert mean == 54.0
+
+def test_total_sums_window_samples():
+    history = filled_history(100, value=lambda t: 2.0)
+    assert history.total(window=10, now=START + 100) == 20.0
+    assert history.total(now=START + 100) == 200.0
+
+def test_lttb_keeps_endpoints_and_peak():
+    points = [(x, math.sin(x / 10)) for x in range(500)]
+    points[250] = (250, 10.0)
+    sampled = lttb(points, 50)
+    assert len(sampled) == 50
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert (250, 10.0) in sampled
+    assert [p[0] for p in sampled] == sorted(p[0] for p in sampled)
+
+def test_lttb_returns_short_input_unchanged():
+    points = [(0, 1), (1, 2), (2, 3)]
+    assert lttb(points, 10) == points
+
+def test_minmax_uses_rollup_extremes():
+    points = [(t, 50.0, 49.0, 51.0) for t in range(0, 1000, 10)]
+    points[40] = (400, 54.0, 50.0, 90.0)
+    sampled = minmax_downsample(points, 20)
+    assert all(len(p) == 2 for p in sampled)
+    assert max(y for _, y in sampled) == 90.0
+    assert min(y for _, y in sampled) == 49.0
+    assert len(sampled) <= 20
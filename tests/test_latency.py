@@ -0,0 +1,33 @@
+import pytest
+
+from battery_killer.latency import NUM_BUCKETS, bucket_index, bucket_value, histogram_percentile
+
+def test_small_latencies_are_exact():
+    for value in range(64):
+        assert bucket_index(value) == value
+        assert bucket_value(value) == value
+    assert bucket_index(-5) == 0
+
+@pytest.mark.parametrize('value', [64, 65, 100, 1000, 12345, 999_999, 2 ** 31])
+def test_bucket_round_trip_within_resolution(value):
+    index = bucket_index(value)
+    low = bucket_value(index)
+    high = bucket_value(index + 1)
+    assert low <= value < high
+    assert (high - low) / low <= 1 / 32
+
+def test_bucket_lower_bounds_map_back_to_their_bucket():
+    for index in range(NUM_BUCKETS):
+        assert bucket_index(bucket_value(index)) == index
+
+def test_buckets_are_monotonic():
+    indexes = [bucket_index(value) for value in range(0, 200_000, 7)]
+    assert indexes == sorted(indexes)
+    assert bucket_index(2 ** 40) == NUM_BUCKETS - 1
+
+def test_histogram_percentile():
+    histogram = {bucket_index(10): 90, bucket_index(500): 9, bucket_index(20_000): 1}
+    assert histogram_percentile(histogram, 50) == 10
+    assert histogram_percentile(histogram, 99) == bucket_value(bucket_index(500))
+    assert histogram_percentile(histogram, 100) == bucket_value(bucket_index(20_000))
+    assert histogram_percentile({}, 99) == 0
@@ -0,0 +1,39 @@
+from battery_killer.steady import SteadyStateDetector, window_trend
+
+def feed(detector, start, end, temp, power=20.0):
+    for now in range(start, end, 2):
+        detector.update({'cpu_temp': temp(now), 'cpu_power': power}, now=now)
+
+def test_window_trend_fits_slope():
+    slope, mean, stdev = window_trend([(t, 2.0 * t + 1) for t in range(11)])
+    assert slope == 2.0
+    assert mean == 11.0
+    assert stdev > 0
+
+def test_warmup_ends_once_ramp_flattens():
+    detector = SteadyStateDetector(window=60)
+    # Heats from 40°C to 80°C over two minutes, then holds
+    feed(detector, 0, 300, lambda now: min(40 + now / 3, 80.0))
+    assert detector.steady
+    assert 120 < detector.warmup_end < 200
+    assert detector.change_points == []
+
+def test_step_change_is_a_change_point():
+    detector = SteadyStateDetector(window=60)
+    feed(detector, 0, 120, lambda now: 70.0)
+    assert detector.warmup_end is not None
+    feed(detector, 120, 140, lambda now: 95.0)
+    assert not detector.steady
+    ((when, names),) = detector.change_points
+    assert when == 120
+    assert names == ['temperature']
+
+    # Settles again once the window only holds the new level
+    feed(detector, 140, 260, lambda now: 95.0)
+    assert detector.steady
+    assert detector.get_state()['change_points'] == 1
+
+def test_nothing_steady_without_samples():
+    detector = SteadyStateDetector()
+    assert not detector.update({}, now=0)
+    assert detector.get_state()['warmup'] is None
@@ -0,0 +1,50 @@
+import random
+from collections import namedtuple
+
+import pytest
+
+from battery_killer.summary import P2Quantile, MetricSummary, RunSummary
+
+Battery = namedtuple('Battery', ['percent', 'secsleft', 'power_plugged'])
+
+def exact_percentile(values, p):
+    ordered = sorted(values)
+    return ordered[round(p / 100 * (len(ordered) - 1))]
+
+@pytest.mark.parametrize('p', [50, 95, 99])
+def test_p2_quantile_tracks_exact_percentiles(p):
+    rng = random.Random(1)
+    values = [rng.gauss(60, 10) for _ in range(20000)]
+    estimator = P2Quantile(p)
+    for value in values:
+        estimator.add(value)
+    assert estimator.value() == pytest.approx(exact_percentile(values, p), abs=0.5)
+
+def test_p2_quantile_is_exact_below_five_samples():
+    estimator = P2Quantile(50)
+    assert estimator.value() is None
+    for value in (3, 1, 2):
+        estimator.add(value)
+    assert estimator.value() == 2
+
+def test_metric_summary_counts_mean_and_max():
+    summary = MetricSummary()
+    for value in range(1, 101):
+        summary.add(value)
+    stats = summary.get_stats()
+    assert stats['samples'] == 100
+    assert stats['mean'] == 50.5
+    assert stats['max'] == 100
+    assert stats['p50'] == pytest.approx(50.5, abs=2)
+
+def test_run_summary_drain_and_throttled_time():
+    summary = RunSummary()
+    for second, (percent, throttling) in enumerate([(80, False), (79, True), (78, True), (77, False)]):
+        stats = {'cpu_percent': [50.0, 70.0], 'battery': Battery(percent, 3600, False), 'throttling': throttling}
+        summary.update(stats, now=1000.0 + second * 60)
+    result = summary.get_summary()
+    assert result['duration'] == 180
+    assert result['throttled_time'] == 120
+    # One percent a minute is 60 %/h
+    assert result['metrics']['drain']['mean'] == pytest.approx(60.0)
+    assert result['metrics']['cpu']['mean'] == 60.0